@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# One record per row, next to the vector: the caller's key (a resume hash) and a
+# reference to what was indexed (an analysis id).
+KEY_DTYPE = np.dtype([("key", "S64"), ("ref", "S32")])
+
+_ASSIGN_CHUNK = 65536
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """The nearest centroid (largest dot product) of every row, in bounded chunks."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = np.asarray(vectors[start:start + _ASSIGN_CHUNK], dtype=np.float32)
+        out[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(sample: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit centroids of ``sample`` under cosine similarity (Lloyd's iterations)."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].astype(np.float32)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.stack(
+            [np.bincount(labels, weights=sample[:, d], minlength=clusters) for d in range(sample.shape[1])],
+            axis=1,
+        ).astype(np.float32)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        centroids[~empty] = sums[~empty] / norms[~empty, None]
+        if empty.any():
+            reseed = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            centroids[empty] = reseed / np.maximum(np.linalg.norm(reseed, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+class VectorIndex:
+    """
+    Approximate nearest-neighbour (maximum dot product) search over fixed-size float32
+    vectors, kept in ``directory`` and shared by every process that opens it.
+
+    An inverted file (IVF): the vectors are clustered with spherical k-means into about
+    ``sqrt(n)`` lists, and a query only scans the ``nprobe`` lists whose centroids are
+    closest to it, so a search touches a few percent of a large index. Below
+    ``min_train`` vectors, or with ``exact=True``, every vector is scanned.
+
+    Rows are only ever appended. The vectors, their keys and their list numbers live
+    in flat files that are memory-mapped for reading, so opening an index costs no
+    more than sorting its list numbers, and a process only pages in what it scans.
+    Appends from any process go through an ``flock``; other processes pick the new
+    rows up on their next search. When the index has grown ``retrain_growth``-fold
+    since the lists were built, they are rebuilt on a background thread and published
+    under a new version, so searches are never blocked by it.
+    """
+
+    def __init__(self, directory: str, dim: int, min_train: int = 4096, nprobe: int = 16,
+                 retrain_growth: float = 4.0, seed: int = 0):
+        self.directory = directory
+        self.dim = dim
+        self.min_train = min_train
+        self.nprobe = nprobe
+        self.retrain_growth = retrain_growth
+        self.seed = seed
+        self._row_bytes = dim * 4
+
+        self._lock = threading.Lock()
+        self._training = False
+        self._rows = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        self._meta: Dict[str, int] = {}
+        self._meta_mtime = 0.0
+        self._centroids: Optional[np.ndarray] = None
+        self._order = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._listed = 0
+
+    # Files
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _lists_path(self, version: int) -> str:
+        return self._path(f"lists.{version}.i32")
+
+    def _centroids_path(self, version: int) -> str:
+        return self._path(f"centroids.{version}.f32")
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(".lock"), "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> Dict[str, int]:
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"version": 0, "trained_rows": 0}
+
+    def _write_meta(self, meta: Dict[str, int]) -> None:
+        tmp = f"{self._path('meta.json')}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path("meta.json"))
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _stored_rows(self, version: int) -> int:
+        rows = min(
+            self._size(self._path("vectors.f32")) // self._row_bytes,
+            self._size(self._path("keys.bin")) // KEY_DTYPE.itemsize,
+        )
+        if version:
+            rows = min(rows, self._size(self._lists_path(version)) // 4)
+        return rows
+
+    # Reading
+
+    def _refresh(self) -> None:
+        """Map rows appended and lists rebuilt since the last call (by any process)."""
+        try:
+            meta_mtime = os.path.getmtime(self._path("meta.json"))
+        except FileNotFoundError:
+            meta_mtime = 0.0
+        try:
+            if meta_mtime != self._meta_mtime:
+                self._meta, self._meta_mtime = self._read_meta(), meta_mtime
+                self._centroids, self._listed = None, 0
+                self._order, self._offsets = np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64)
+                version = self._meta.get("version", 0)
+                if version:
+                    self._centroids = np.fromfile(self._centroids_path(version), dtype=np.float32)
+                    self._centroids = self._centroids.reshape(-1, self.dim)
+
+            version = self._meta.get("version", 0)
+            rows = self._stored_rows(version)
+            if rows != self._rows:
+                self._rows = rows
+                self._vectors = self._keys = None
+                if rows:
+                    shape = (rows, self.dim)
+                    self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=shape)
+                    self._keys = np.memmap(self._path("keys.bin"), dtype=KEY_DTYPE, mode="r", shape=(rows,))
+
+            # Rows past ``_listed`` are scanned exactly; fold them into the lists once
+            # there are enough of them to matter.
+            tail = self._rows - self._listed
+            if version and tail > 0 and (not self._listed or tail > max(1024, self._listed // 16)):
+                lists = np.memmap(self._lists_path(version), dtype=np.int32, mode="r", shape=(self._rows,))
+                self._order = np.argsort(lists, kind="stable")
+                counts = np.bincount(lists, minlength=len(self._centroids))
+                self._offsets = np.concatenate(([0], np.cumsum(counts)))
+                self._listed = self._rows
+        except (FileNotFoundError, ValueError):
+            # A retrain in another process replaced this version's files between our
+            # reads; scan exactly this time and pick up the new version next time.
+            self._meta_mtime, self._centroids, self._listed = 0.0, None, 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._rows
+
+    def search(self, query: np.ndarray, k: int = 50, nprobe: Optional[int] = None,
+               exact: bool = False) -> Tuple[List[Tuple[str, str, float]], int]:
+        """
+        The ``k`` rows with the largest dot product with ``query``, as ``(key, ref,
+        score)`` best first, one per key (the latest row of a key wins ties), and the
+        number of vectors scanned.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            self._refresh()
+            rows, vectors, keys = self._rows, self._vectors, self._keys
+            centroids, order, offsets, listed = self._centroids, self._order, self._offsets, self._listed
+        if not rows or k <= 0:
+            return [], 0
+
+        if exact or centroids is None:
+            candidates = None
+            scores = np.concatenate([
+                np.asarray(vectors[start:start + _ASSIGN_CHUNK]) @ query
+                for start in range(0, rows, _ASSIGN_CHUNK)
+            ])
+        else:
+            probe = min(nprobe or self.nprobe, len(centroids))
+            nearest = np.argpartition(-(centroids @ query), probe - 1)[:probe]
+            candidates = np.concatenate(
+                [order[offsets[i]:offsets[i + 1]] for i in nearest] + [np.arange(listed, rows)]
+            )
+            candidates.sort()  # sequential reads from the mapping
+            scores = np.asarray(vectors[candidates]) @ query
+
+        # Fetch a few extra in case some keys were indexed more than once.
+        take = min(len(scores), k * 2)
+        top = np.argpartition(-scores, take - 1)[:take] if take < len(scores) else np.arange(len(scores))
+        rows_top = top if candidates is None else candidates[top]
+        ranked = sorted(zip(scores[top].tolist(), rows_top.tolist()), key=lambda p: (-p[0], -p[1]))
+
+        results: List[Tuple[str, str, float]] = []
+        seen = set()
+        for score, row in ranked:
+            key, ref = keys[row]["key"].decode(), keys[row]["ref"].decode()
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append((key, ref, score))
+            if len(results) == k:
+                break
+        return results, len(scores)
+
+    # Writing
+
+    def add_many(self, items: Sequence[Tuple[str, str, np.ndarray]]) -> int:
+        """
+        Append ``(key, ref, vector)`` rows; zero vectors are skipped. Returns the number
+        appended.
+        """
+        items = [(key, ref, v) for key, ref, v in items if np.any(v)]
+        if not items:
+            return 0
+        vectors = np.ascontiguousarray([v for _, _, v in items], dtype=np.float32).reshape(len(items), self.dim)
+        records = np.array([(key.encode(), ref.encode()) for key, ref, _ in items], dtype=KEY_DTYPE)
+
+        with self._file_lock():
+            meta = self._read_meta()
+            version = meta.get("version", 0)
+            rows = self._stored_rows(version)
+            self._truncate(rows, version)  # drop a half-written row left by a crash
+            with open(self._path("vectors.f32"), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path("keys.bin"), "ab") as f:
+                f.write(records.tobytes())
+            if version:
+                centroids = np.fromfile(self._centroids_path(version), dtype=np.float32).reshape(-1, self.dim)
+                with open(self._lists_path(version), "ab") as f:
+                    f.write(_assign(vectors, centroids).tobytes())
+            total = rows + len(items)
+
+        if total >= self.min_train and total >= meta.get("trained_rows", 0) * self.retrain_growth:
+            self._train_in_background()
+        return len(items)
+
+    def add(self, key: str, ref: str, vector: np.ndarray) -> bool:
+        return self.add_many([(key, ref, vector)]) == 1
+
+    def _truncate(self, rows: int, version: int) -> None:
+        files = [(self._path("vectors.f32"), self._row_bytes), (self._path("keys.bin"), KEY_DTYPE.itemsize)]
+        if version:
+            files.append((self._lists_path(version), 4))
+        for path, size in files:
+            if self._size(path) > rows * size:
+                os.truncate(path, rows * size)
+
+    # Training
+
+    def _train_in_background(self) -> None:
+        with self._lock:
+            if self._training:
+                return
+            self._training = True
+        threading.Thread(target=self._train, name="vector-index-train", daemon=True).start()
+
+    def _train(self) -> None:
+        try:
+            self.train()
+        finally:
+            with self._lock:
+                self._training = False
+
+    def train(self) -> None:
+        """
+        Cluster the stored vectors into lists and publish them as a new version. The
+        clustering runs without the file lock; only rows appended meanwhile are assigned
+        under it.
+        """
+        meta = self._read_meta()
+        rows = self._stored_rows(meta.get("version", 0))
+        if rows < self.min_train or (meta.get("trained_rows") and rows < meta["trained_rows"] * self.retrain_growth):
+            return
+
+        vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, self.dim))
+        clusters = min(4096, max(16, int(math.sqrt(rows))))
+        rng = np.random.default_rng(self.seed)
+        sample = np.asarray(vectors[np.sort(rng.choice(rows, min(rows, clusters * 64), replace=False))])
+        centroids = spherical_kmeans(sample, clusters, seed=self.seed)
+        lists = _assign(vectors, centroids)
+
+        with self._file_lock():
+            current = self._read_meta()
+            if current.get("version", 0) != meta.get("version", 0):
+                return  # another process published lists meanwhile
+            now = self._stored_rows(current.get("version", 0))
+            if now > rows:
+                appended = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(now, self.dim))
+                lists = np.concatenate([lists, _assign(appended[rows:now], centroids)])
+
+            previous = current.get("version", 0)
+            version = previous + 1
+            centroids.tofile(self._centroids_path(version))
+            lists.astype(np.int32).tofile(self._lists_path(version))
+            self._write_meta({
+                "version": version, "trained_rows": int(now), "lists": clusters, "dim": self.dim,
+                "trained": time.time(),
+            })
+            # Processes still on the previous version keep their mappings of these.
+            if previous:
+                for stale in (self._centroids_path(previous), self._lists_path(previous)):
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict, field
-from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, asdict, field, fields as dataclass_fields, replace
+from typing import Any, Collection, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from .helpers import (
     clean_text,
-    extract_bullets,
+    extract_bullet_spans,
     coverage_score,
     keyword_match_score,
     starts_with_action_verb,
@@ -15,11 +17,16 @@ from .helpers import (
     passive_voice_ratio,
     first_person_ratio,
     estimate_experience_years,
-    skill_coverage_score,
 )
+from .incremental import AnalysisMemo, BulletFacts, bullet_quality_from_facts
+from .keywords import KeywordMatrix, keyword_match_scores
+from .semantic import project, semantic_match_score
+from .sections import SectionIndex, build_section_index
+from .skills import default_matcher
+from .timing import StageTimer, timed
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ATSWeights:
     section: float = 0.20
     keyword: float = 0.30
@@ -41,7 +48,7 @@ class ATSWeights:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LengthConfig:
     min_wc: int = 200
     optimal_min_wc: int = 200
@@ -54,13 +61,13 @@ class LengthConfig:
     too_long_score: float = 0.40
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BulletFallbackConfig:
     action_score_no_bullets: float = 0.30
     metric_score_no_bullets: float = 0.20
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ATSConfig:
     weights: ATSWeights = ATSWeights()
     length: LengthConfig = LengthConfig()
@@ -68,7 +75,7 @@ class ATSConfig:
     max_final_score: float = 100.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ATSScores:
     final_score: float
     section_score: float
@@ -87,12 +94,42 @@ class ATSScores:
     first_person_ratio: float = 0.0
     estimated_experience_years: float = 0.0
     skill_coverage: float = 0.0
+    section_scores: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    skills: List[Dict[str, Any]] = field(default_factory=list)
+    semantic_score: float = 0.0
+
+    def to_dict(self, include_explanation: bool = True, only: Optional[Collection[str]] = None) -> Dict[str, Any]:
+        # Shallow on purpose: ``asdict`` deep-copies every bullet list and flag map,
+        # and the scores object is discarded as soon as it has been converted.
+        return {
+            name: getattr(self, name)
+            for name in _ATS_SCORE_FIELDS
+            if (include_explanation or name != "explanation") and (only is None or name in only)
+        }
+
 
-    def to_dict(self, include_explanation: bool = True) -> Dict[str, Any]:
-        data = asdict(self)
-        if not include_explanation:
-            data.pop("explanation", None)
-        return data
+_ATS_SCORE_FIELDS = tuple(f.name for f in dataclass_fields(ATSScores))
+
+# Scores each ``analysis_level`` computes (``None``: all of them). Stages that only
+# feed scores outside the level are skipped: quick is structure only (length,
+# sections, bullets, action verbs and metrics), standard adds keyword and skill
+# matching against the JD, full adds readability and the other writing-style ratios.
+_QUICK_SCORES = frozenset({
+    "final_score", "section_score", "action_score", "metric_score", "length_score", "word_count",
+    "bullets_count", "section_found", "bullets", "bullet_quality", "section_scores",
+})
+ANALYSIS_LEVELS: Dict[str, Optional[FrozenSet[str]]] = {
+    "quick": _QUICK_SCORES,
+    "standard": _QUICK_SCORES | {"keyword_score", "semantic_score", "skill_coverage", "skills"},
+    "full": None,
+}
+
+# What the keyword component of ``final_score`` is built from. ``lexical`` is the TF-IDF
+# cosine (``keyword_score``), ``semantic`` the similarity in the latent space of
+# ``analyzer.semantic`` (``semantic_score``), which credits "PyTorch" against "deep
+# learning frameworks", and ``hybrid`` whichever of the two is higher. Both scores are
+# reported either way.
+KEYWORD_MATCHING = ("lexical", "semantic", "hybrid")
 
 
 def _compute_length_score(word_count: int, cfg: LengthConfig) -> float:
@@ -108,6 +145,7 @@ def _compute_length_score(word_count: int, cfg: LengthConfig) -> float:
 def _compute_bullet_based_scores(
     bullets: List[str],
     fallbacks: BulletFallbackConfig,
+    facts: Optional[List[BulletFacts]] = None,
 ) -> Tuple[float, float, Dict[str, Any]]:
     if not bullets:
         explanation = {
@@ -119,8 +157,12 @@ def _compute_bullet_based_scores(
 
     total_bullets = len(bullets)
 
-    action_flags = [bool(starts_with_action_verb(b)) for b in bullets]
-    metric_flags = [bool(contains_metric(b)) for b in bullets]
+    if facts is None:
+        action_flags = [bool(starts_with_action_verb(b)) for b in bullets]
+        metric_flags = [bool(contains_metric(b)) for b in bullets]
+    else:
+        action_flags = [f.starts_with_action_verb for f in facts]
+        metric_flags = [f.contains_metric for f in facts]
 
     action_score = sum(action_flags) / total_bullets
     metric_score = sum(metric_flags) / total_bullets
@@ -136,90 +178,463 @@ def _compute_bullet_based_scores(
     return action_score, metric_score, explanation
 
 
-def compute_ats_scores(
-    resume_text: str,
-    jd_text: str = "",
-    config: Optional[ATSConfig] = None,
-    include_explanation: bool = False,
-    required_skills: Optional[List[str]] = None,
-) -> Dict:
-    cfg = config or ATSConfig()
-    weights = cfg.weights.normalized()
+def _compute_section_scores(
+    cleaned_resume: str,
+    sections: SectionIndex,
+    bullet_spans: List[Tuple[int, int, str]],
+    action_flags: List[bool],
+    metric_flags: List[bool],
+) -> Dict[str, Dict[str, Any]]:
+    per_section: Dict[str, Dict[str, Any]] = {}
+
+    for span in sections.spans:
+        entry = per_section.setdefault(span.name, {"word_count": 0, "bullets": 0, "action": 0, "metric": 0})
+        entry["word_count"] += len(cleaned_resume[span.body_start:span.end].split())
+
+    for (start, _, _), action, metric in zip(bullet_spans, action_flags, metric_flags):
+        name = sections.section_at(start)
+        if name is None:
+            continue
+        entry = per_section[name]
+        entry["bullets"] += 1
+        entry["action"] += int(action)
+        entry["metric"] += int(metric)
+
+    return {
+        name: {
+            "word_count": e["word_count"],
+            "bullets_count": e["bullets"],
+            "action_score": round(e["action"] / e["bullets"] * 100, 1) if e["bullets"] else None,
+            "metric_score": round(e["metric"] / e["bullets"] * 100, 1) if e["bullets"] else None,
+        }
+        for name, e in per_section.items()
+    }
 
-    cleaned_resume = clean_text(resume_text or "")
-    bullets = extract_bullets(cleaned_resume) or []
 
-    word_count = len(cleaned_resume.split())
+def _needs(wanted: Optional[Set[str]], *names: str) -> bool:
+    return wanted is None or not wanted.isdisjoint(names)
 
-    section_score_raw, section_found = coverage_score(cleaned_resume)
-    keyword_score_raw = keyword_match_score(cleaned_resume, jd_text or "")
 
-    action_score_raw, metric_score_raw, bullets_explanation = _compute_bullet_based_scores(
-        bullets,
-        cfg.bullet_fallbacks,
-    )
-    length_score_raw = _compute_length_score(word_count, cfg.length)
-
-    readability = readability_scores(cleaned_resume)
-    bullet_quality = bullet_quality_stats(bullets)
-    pv_ratio = passive_voice_ratio(cleaned_resume)
-    fp_ratio = first_person_ratio(cleaned_resume)
-    exp_years = estimate_experience_years(cleaned_resume)
-    skill_cov = (
-        skill_coverage_score(cleaned_resume, required_skills or [])
-        if required_skills
-        else 0.0
-    )
+def _wanted_scores(
+    fields: Optional[Collection[str]], include_explanation: bool, analysis_level: str,
+) -> Optional[Set[str]]:
+    try:
+        level = ANALYSIS_LEVELS[analysis_level]
+    except KeyError:
+        raise ValueError(f"Unknown analysis_level: {analysis_level!r}") from None
 
-    final_raw = (
-        section_score_raw * weights.section +
-        min(max(keyword_score_raw * 3, 0), 1) * weights.keyword +
-        action_score_raw * weights.action +
-        metric_score_raw * weights.metric +
-        length_score_raw * weights.length
-    ) * 100
+    wanted = None if fields is None or include_explanation else set(fields)
+    if level is None:
+        return wanted
+    wanted = set(level) if wanted is None else wanted & level
+    if include_explanation:
+        wanted.add("explanation")
+    return wanted
+
+
+def _level_weights(weights: ATSWeights, analysis_level: str) -> ATSWeights:
+    # Without keyword matching the final score is spread over the remaining components
+    # rather than counting an unmeasured keyword score as zero.
+    level = ANALYSIS_LEVELS[analysis_level]
+    if level is not None and "keyword_score" not in level:
+        weights = replace(weights, keyword=0.0)
+    return weights.normalized()
+
+
+def _keyword_inputs(
+    wanted: Optional[Set[str]], weights: ATSWeights, keyword_matching: str,
+) -> Tuple[bool, bool]:
+    """Whether the lexical and the semantic similarity have to be computed."""
+    if keyword_matching not in KEYWORD_MATCHING:
+        raise ValueError(f"Unknown keyword_matching: {keyword_matching!r}")
+    in_final = bool(weights.keyword) and _needs(wanted, "final_score")
+    lexical = _needs(wanted, "keyword_score") or (in_final and keyword_matching != "semantic")
+    semantic = _needs(wanted, "semantic_score") or (in_final and keyword_matching != "lexical")
+    return lexical, semantic
+
+
+def _keyword_component(keyword_raw: float, semantic_raw: float, keyword_matching: str) -> float:
+    # Like the lexical cosine, the semantic similarity rarely gets near 1 (unknown words
+    # shorten a projection), so both are stretched before capping.
+    lexical = min(max(keyword_raw * 3, 0), 1)
+    semantic = min(semantic_raw * 2, 1)
+    if keyword_matching == "semantic":
+        return semantic
+    if keyword_matching == "hybrid":
+        return max(lexical, semantic)
+    return lexical
+
+
+def _keyword_components(keyword_raw: np.ndarray, semantic_raw: np.ndarray, keyword_matching: str) -> np.ndarray:
+    """Vectorised ``_keyword_component``."""
+    lexical = np.minimum(np.maximum(keyword_raw * 3, 0), 1)
+    semantic = np.minimum(semantic_raw * 2, 1)
+    if keyword_matching == "semantic":
+        return semantic
+    if keyword_matching == "hybrid":
+        return np.maximum(lexical, semantic)
+    return lexical
+
+
+@dataclass(slots=True)
+class _DocumentFeatures:
+    """Everything ``compute_ats_scores`` derives from the resume alone (no JD)."""
+
+    word_count: int = 0
+    bullets: List[str] = field(default_factory=list)
+    section_score_raw: float = 0.0
+    section_found: Dict[str, bool] = field(default_factory=dict)
+    action_score_raw: float = 0.0
+    metric_score_raw: float = 0.0
+    bullets_explanation: Dict[str, Any] = field(default_factory=dict)
+    bullet_quality: Dict[str, float] = field(default_factory=dict)
+    section_scores: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    readability: Dict[str, float] = field(default_factory=dict)
+    passive_voice_ratio: float = 0.0
+    first_person_ratio: float = 0.0
+    estimated_experience_years: float = 0.0
+    skill_coverage: float = 0.0
+    skills: List[Dict[str, Any]] = field(default_factory=list)
 
-    final_capped = min(final_raw, cfg.max_final_score)
 
+def _document_features(
+    cleaned_resume: str,
+    cfg: ATSConfig,
+    wanted: Optional[Set[str]],
+    required_skills: Optional[List[str]] = None,
+    timer: Optional[StageTimer] = None,
+    memo: Optional[AnalysisMemo] = None,
+    sections: Optional[SectionIndex] = None,
+    lined_resume: Optional[str] = None,
+) -> _DocumentFeatures:
+    feats = _DocumentFeatures(word_count=len(cleaned_resume.split()))
+
+    bullet_spans: List[Tuple[int, int, str]] = []
+    if _needs(wanted, "final_score", "action_score", "metric_score", "bullets_count", "bullets",
+              "bullet_quality", "section_scores"):
+        with timed(timer, "bullets"):
+            bullet_spans = extract_bullet_spans(cleaned_resume)
+            feats.bullets = [item for _, _, item in bullet_spans]
+
+    if _needs(wanted, "final_score", "section_score", "section_found", "section_scores"):
+        with timed(timer, "sections"):
+            if sections is None:
+                # Headings are only recognised at line starts, which ``cleaned_resume`` has lost.
+                sections = build_section_index(lined_resume or cleaned_resume)
+            feats.section_score_raw, feats.section_found = coverage_score(cleaned_resume, sections)
+
+    if _needs(wanted, "final_score", "action_score", "metric_score", "bullet_quality", "section_scores"):
+        with timed(timer, "bullet_scores"):
+            bullets = feats.bullets
+            facts = [memo.bullet_facts(b) for b in bullets] if memo is not None else None
+            feats.action_score_raw, feats.metric_score_raw, feats.bullets_explanation = _compute_bullet_based_scores(
+                bullets,
+                cfg.bullet_fallbacks,
+                facts,
+            )
+            if _needs(wanted, "bullet_quality"):
+                feats.bullet_quality = (
+                    bullet_quality_from_facts(facts) if facts is not None else bullet_quality_stats(bullets)
+                )
+            if _needs(wanted, "section_scores"):
+                feats.section_scores = _compute_section_scores(
+                    cleaned_resume,
+                    sections,
+                    bullet_spans,
+                    feats.bullets_explanation.get("action_flags", []),
+                    feats.bullets_explanation.get("metric_flags", []),
+                )
+
+    if _needs(wanted, "readability", "passive_voice_ratio", "first_person_ratio", "estimated_experience_years"):
+        with timed(timer, "readability"):
+            if _needs(wanted, "readability"):
+                feats.readability = readability_scores(cleaned_resume)
+            if _needs(wanted, "passive_voice_ratio"):
+                feats.passive_voice_ratio = passive_voice_ratio(cleaned_resume)
+            if _needs(wanted, "first_person_ratio"):
+                feats.first_person_ratio = first_person_ratio(cleaned_resume)
+            if _needs(wanted, "estimated_experience_years"):
+                feats.estimated_experience_years = estimate_experience_years(cleaned_resume)
+    wants_coverage = bool(required_skills) and _needs(wanted, "skill_coverage")
+    if wants_coverage or _needs(wanted, "skills"):
+        with timed(timer, "skills"):
+            matcher = default_matcher()
+            matches = matcher.find(cleaned_resume)
+            feats.skills = [m.to_dict() for m in matches]
+            if wants_coverage:
+                feats.skill_coverage = matcher.coverage(cleaned_resume, required_skills, matches)
+
+    return feats
+
+
+def _assemble_scores(
+    feats: _DocumentFeatures,
+    keyword_score_raw: float,
+    semantic_score_raw: float,
+    length_score_raw: float,
+    final_capped: float,
+    cfg: ATSConfig,
+    weights: ATSWeights,
+    include_explanation: bool,
+    wanted: Optional[Set[str]],
+) -> Dict:
     explanation: Optional[Dict[str, Any]] = None
     if include_explanation:
         explanation = {
             "weights_used": asdict(weights),
             "raw_scores": {
-                "section_score_raw": section_score_raw,
+                "section_score_raw": feats.section_score_raw,
                 "keyword_score_raw": keyword_score_raw,
-                "action_score_raw": action_score_raw,
-                "metric_score_raw": metric_score_raw,
+                "action_score_raw": feats.action_score_raw,
+                "metric_score_raw": feats.metric_score_raw,
                 "length_score_raw": length_score_raw,
             },
             "length_config": asdict(cfg.length),
-            "bullet_analysis": bullets_explanation,
-            "readability": readability,
-            "bullet_quality": bullet_quality,
-            "passive_voice_ratio": pv_ratio,
-            "first_person_ratio": fp_ratio,
-            "estimated_experience_years": exp_years,
-            "skill_coverage": skill_cov,
+            "bullet_analysis": feats.bullets_explanation,
+            "readability": feats.readability,
+            "bullet_quality": feats.bullet_quality,
+            "passive_voice_ratio": feats.passive_voice_ratio,
+            "first_person_ratio": feats.first_person_ratio,
+            "estimated_experience_years": feats.estimated_experience_years,
+            "skill_coverage": feats.skill_coverage,
         }
 
     scores = ATSScores(
         final_score=round(final_capped, 1),
-        section_score=round(section_score_raw * 100, 1),
+        section_score=round(feats.section_score_raw * 100, 1),
         keyword_score=round(keyword_score_raw * 100, 1),
-        action_score=round(action_score_raw * 100, 1),
-        metric_score=round(metric_score_raw * 100, 1),
+        action_score=round(feats.action_score_raw * 100, 1),
+        metric_score=round(feats.metric_score_raw * 100, 1),
         length_score=round(length_score_raw * 100, 1),
-        word_count=word_count,
-        bullets_count=len(bullets),
-        section_found=section_found,
-        bullets=bullets,
+        word_count=feats.word_count,
+        bullets_count=len(feats.bullets),
+        section_found=feats.section_found,
+        bullets=feats.bullets,
         explanation=explanation,
-        readability=readability,
-        bullet_quality=bullet_quality,
-        passive_voice_ratio=pv_ratio,
-        first_person_ratio=fp_ratio,
-        estimated_experience_years=exp_years,
-        skill_coverage=skill_cov,
+        readability=feats.readability,
+        bullet_quality=feats.bullet_quality,
+        passive_voice_ratio=feats.passive_voice_ratio,
+        first_person_ratio=feats.first_person_ratio,
+        estimated_experience_years=feats.estimated_experience_years,
+        skill_coverage=feats.skill_coverage,
+        section_scores=feats.section_scores,
+        skills=feats.skills,
+        semantic_score=round(semantic_score_raw * 100, 1),
     )
 
-    return scores.to_dict(include_explanation=include_explanation)
+    return scores.to_dict(include_explanation=include_explanation, only=wanted)
+
+
+def compute_ats_scores(
+    resume_text: str,
+    jd_text: str = "",
+    config: Optional[ATSConfig] = None,
+    include_explanation: bool = False,
+    required_skills: Optional[List[str]] = None,
+    timer: Optional[StageTimer] = None,
+    memo: Optional[AnalysisMemo] = None,
+    sections: Optional[SectionIndex] = None,
+    fields: Optional[Collection[str]] = None,
+    jd_matrix: Optional[KeywordMatrix] = None,
+    analysis_level: str = "full",
+    keyword_matching: str = "lexical",
+) -> Dict:
+    """
+    ``fields`` restricts the result to those ``ATSScores`` keys, and only the stages
+    they depend on are run. ``include_explanation`` always computes everything.
+
+    ``analysis_level`` (``quick``, ``standard`` or ``full``, see ``ANALYSIS_LEVELS``)
+    caps what is computed regardless of ``fields``. Below ``standard`` the keyword
+    weight is left out of ``final_score`` and the other weights renormalised.
+
+    ``keyword_matching`` (see ``KEYWORD_MATCHING``) picks the similarity behind the
+    keyword part of ``final_score``.
+
+    ``jd_matrix`` is a prebuilt single-row ``KeywordMatrix`` of ``jd_text``; keyword
+    similarity then only has to vectorise the resume, and the JD's semantic
+    projection is reused.
+    """
+    cfg = config or ATSConfig()
+    wanted = _wanted_scores(fields, include_explanation, analysis_level)
+    weights = _level_weights(cfg.weights, analysis_level)
+    needs_lexical, needs_semantic = _keyword_inputs(wanted, weights, keyword_matching)
+
+    lined_resume = clean_text(resume_text or "", keep_lines=True)
+    cleaned_resume = lined_resume.replace("\n", " ")
+    feats = _document_features(cleaned_resume, cfg, wanted, required_skills, timer, memo, sections, lined_resume)
+
+    keyword_score_raw = 0.0
+    if needs_lexical:
+        with timed(timer, "tfidf"):
+            if jd_matrix is not None:
+                keyword_score_raw = float(jd_matrix.scores(cleaned_resume)[0])
+            else:
+                keyword_score_raw = keyword_match_score(cleaned_resume, jd_text or "")
+
+    semantic_score_raw = 0.0
+    if needs_semantic:
+        with timed(timer, "semantic"):
+            if jd_matrix is not None and len(jd_matrix):
+                semantic_score_raw = float(jd_matrix.semantic_scores(cleaned_resume)[0])
+            else:
+                semantic_score_raw = semantic_match_score(cleaned_resume, clean_text(jd_text or ""))
+
+    length_score_raw = _compute_length_score(feats.word_count, cfg.length)
+
+    final_raw = (
+        feats.section_score_raw * weights.section +
+        _keyword_component(keyword_score_raw, semantic_score_raw, keyword_matching) * weights.keyword +
+        feats.action_score_raw * weights.action +
+        feats.metric_score_raw * weights.metric +
+        length_score_raw * weights.length
+    ) * 100
+
+    final_capped = min(final_raw, cfg.max_final_score)
+
+    return _assemble_scores(
+        feats, keyword_score_raw, semantic_score_raw, length_score_raw, final_capped, cfg, weights,
+        include_explanation, wanted,
+    )
+
+
+def _compute_length_scores(word_counts: np.ndarray, cfg: LengthConfig) -> np.ndarray:
+    """Vectorised ``_compute_length_score``; conditions are tested in the same order."""
+    return np.select(
+        [
+            word_counts < cfg.min_wc,
+            (cfg.optimal_min_wc <= word_counts) & (word_counts <= cfg.optimal_max_wc),
+            (cfg.optimal_max_wc < word_counts) & (word_counts <= cfg.acceptable_max_wc),
+        ],
+        [cfg.too_short_score, cfg.optimal_score, cfg.slightly_long_score],
+        default=cfg.too_long_score,
+    )
+
+
+def compute_ats_scores_batch(
+    resumes: Sequence[str],
+    jd_text: str = "",
+    config: Optional[ATSConfig] = None,
+    include_explanation: bool = False,
+    required_skills: Optional[List[str]] = None,
+    timer: Optional[StageTimer] = None,
+    fields: Optional[Collection[str]] = None,
+    analysis_level: str = "full",
+    keyword_matching: str = "lexical",
+) -> List[Dict]:
+    """
+    ``compute_ats_scores`` for many resumes against one JD. Per-document features are
+    still extracted one resume at a time; keyword similarities come from a single
+    vectorizer pass over the batch (see ``keywords.keyword_match_scores``), the JD is
+    projected into the semantic space once, and length and final scores are computed
+    as array operations over the whole batch.
+
+    Returns the same dicts, in the same order, as calling ``compute_ats_scores`` on
+    each resume.
+    """
+    cfg = config or ATSConfig()
+    wanted = _wanted_scores(fields, include_explanation, analysis_level)
+    weights = _level_weights(cfg.weights, analysis_level)
+    needs_lexical, needs_semantic = _keyword_inputs(wanted, weights, keyword_matching)
+
+    lined = [clean_text(r or "", keep_lines=True) for r in resumes]
+    cleaned = [text.replace("\n", " ") for text in lined]
+    feats = [
+        _document_features(c, cfg, wanted, required_skills, timer, lined_resume=text)
+        for c, text in zip(cleaned, lined)
+    ]
+    if not feats:
+        return []
+
+    keyword_raw = np.zeros(len(cleaned))
+    if needs_lexical:
+        with timed(timer, "tfidf"):
+            keyword_raw = keyword_match_scores(cleaned, jd_text or "")
+
+    semantic_raw = np.zeros(len(cleaned))
+    if needs_semantic:
+        with timed(timer, "semantic"):
+            cleaned_jd = clean_text(jd_text or "")
+            semantic_raw = np.array([semantic_match_score(c, cleaned_jd) for c in cleaned])
+
+    length_raw = _compute_length_scores(np.array([f.word_count for f in feats]), cfg.length)
+
+    final_raw = (
+        np.array([f.section_score_raw for f in feats]) * weights.section +
+        _keyword_components(keyword_raw, semantic_raw, keyword_matching) * weights.keyword +
+        np.array([f.action_score_raw for f in feats]) * weights.action +
+        np.array([f.metric_score_raw for f in feats]) * weights.metric +
+        length_raw * weights.length
+    ) * 100
+
+    final_capped = np.minimum(final_raw, cfg.max_final_score)
+
+    # Python floats from here on: ``round`` on them matches the scalar path exactly,
+    # whereas ``np.round`` rounds half to even on the scaled value.
+    return [
+        _assemble_scores(f, kw, sem, length, final, cfg, weights, include_explanation, wanted)
+        for f, kw, sem, length, final in zip(
+            feats, keyword_raw.tolist(), semantic_raw.tolist(), length_raw.tolist(), final_capped.tolist()
+        )
+    ]
+
+
+def rank_job_descriptions(
+    resume_text: str,
+    jds: KeywordMatrix,
+    config: Optional[ATSConfig] = None,
+    timer: Optional[StageTimer] = None,
+    keyword_matching: str = "lexical",
+) -> Dict[str, Any]:
+    """
+    Score one resume against every job description in ``jds``.
+
+    The resume is analysed once; only the keyword similarities depend on the JD, and
+    they come from ``KeywordMatrix.scores`` and ``KeywordMatrix.semantic_scores`` for
+    all of them at once. Each role's ``final_score`` / ``keyword_score`` /
+    ``semantic_score`` equal those of ``compute_ats_scores(resume, jd)``. Roles are
+    ranked by final score, then keyword score, then input order.
+    """
+    cfg = config or ATSConfig()
+    weights = cfg.weights.normalized()
+    _keyword_inputs(None, weights, keyword_matching)
+
+    lined_resume = clean_text(resume_text or "", keep_lines=True)
+    cleaned_resume = lined_resume.replace("\n", " ")
+    feats = _document_features(cleaned_resume, cfg, {"final_score"}, timer=timer, lined_resume=lined_resume)
+
+    with timed(timer, "tfidf"):
+        keyword_raw = jds.scores(cleaned_resume)
+    with timed(timer, "semantic"):
+        semantic_raw = jds.semantic_scores(cleaned_resume)
+    length_score_raw = _compute_length_score(feats.word_count, cfg.length)
+
+    final_raw = (
+        feats.section_score_raw * weights.section +
+        _keyword_components(keyword_raw, semantic_raw, keyword_matching) * weights.keyword +
+        feats.action_score_raw * weights.action +
+        feats.metric_score_raw * weights.metric +
+        length_score_raw * weights.length
+    ) * 100
+    final_capped = np.minimum(final_raw, cfg.max_final_score)
+
+    roles = [
+        {
+            "index": i,
+            "final_score": round(final, 1),
+            "keyword_score": round(kw * 100, 1),
+            "semantic_score": round(sem * 100, 1),
+        }
+        for i, (final, kw, sem) in enumerate(
+            zip(final_capped.tolist(), keyword_raw.tolist(), semantic_raw.tolist())
+        )
+    ]
+    roles.sort(key=lambda r: (-r["final_score"], -r["keyword_score"], r["index"]))
+
+    return {
+        "section_score": round(feats.section_score_raw * 100, 1),
+        "action_score": round(feats.action_score_raw * 100, 1),
+        "metric_score": round(feats.metric_score_raw * 100, 1),
+        "length_score": round(length_score_raw * 100, 1),
+        "word_count": feats.word_count,
+        "roles": roles,
+    }
@@ -19,4 +19,4 @@ EXPECTED_SECTIONS = [
     "summary", "objective", "experience", "work experience",
     "professional experience", "education", "skills", "projects",
     "certifications", "achievements", "publications", "awards",
-]
\ No newline at end of file
+]
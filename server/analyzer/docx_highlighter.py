@@ -1,15 +1,25 @@
-from docx.enum.text import WD_COLOR_INDEX
+from __future__ import annotations
+
+import functools
+
 from .utils import HighlightSeverity, _build_highlight_rules
 
-from typing import Dict, Sequence, Any
-from docx import Document
+from typing import TYPE_CHECKING, Dict, Sequence, Any
+
+if TYPE_CHECKING:
+    from docx.enum.text import WD_COLOR_INDEX
 
 
-WORD_COLOR_MAP = {
-    HighlightSeverity.WEAK_PHRASE: WD_COLOR_INDEX.RED,       # red background
-    HighlightSeverity.ACTION_MISSING: WD_COLOR_INDEX.YELLOW, # yellow
-    HighlightSeverity.METRIC_MISSING: WD_COLOR_INDEX.TURQUOISE,  # cyan-ish
-}
+# python-docx is only imported once a DOCX is actually highlighted.
+@functools.lru_cache(maxsize=1)
+def _word_color_map() -> Dict[HighlightSeverity, WD_COLOR_INDEX]:
+    from docx.enum.text import WD_COLOR_INDEX
+
+    return {
+        HighlightSeverity.WEAK_PHRASE: WD_COLOR_INDEX.RED,       # red background
+        HighlightSeverity.ACTION_MISSING: WD_COLOR_INDEX.YELLOW, # yellow
+        HighlightSeverity.METRIC_MISSING: WD_COLOR_INDEX.TURQUOISE,  # cyan-ish
+    }
 
 
 def _highlight_run_text(run, start: int, end: int, color: WD_COLOR_INDEX):
@@ -82,14 +92,17 @@ def highlight_docx(
     if not rules:
         return input_path
 
+    from docx import Document
+
     doc = Document(input_path)
+    color_map = _word_color_map()
 
     for rule in rules:
         phrase = rule.phrase
         if not phrase:
             continue
 
-        color = WORD_COLOR_MAP.get(rule.severity, WD_COLOR_INDEX.RED)
+        color = color_map.get(rule.severity, color_map[HighlightSeverity.WEAK_PHRASE])
 
         # paragraphs
         for paragraph in doc.paragraphs:
@@ -4,33 +4,60 @@ import re
 import typing as t
 
 from .config import ACTION_VERBS, EXPECTED_SECTIONS, WEAK_PHRASES
+from .sections import LINE_BREAKS, SectionIndex, build_section_index
+from .skills import SkillMatcher, default_matcher
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 
 BULLET_CHARS = "•‣▪●◦–—·*+-"
 _WHITESPACE_RE = re.compile(r"\s+")
 _CONTROL_CHARS_RE = re.compile(r"[\u0000-\u001F\u007F]")
+# Line breaks are whitespace, so with ``keep_lines`` they are left for the collapse.
+_LINE_BREAK_RE = re.compile(f"[{LINE_BREAKS}]")
+_CONTROL_CHARS_KEEP_LINES_RE = re.compile(rf"(?![{LINE_BREAKS}])[\u0000-\u001F\u007F]")
 _SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+# The scanners below run on raw uploads, so none of them may backtrack more than a
+# bounded distance. Runs that can never be given back profitably (a digit run that
+# must be followed by a non-digit, a whole word) are matched possessively (``++``,
+# ``*+``, ``{m,n}+``); the few repeats that do backtrack can only give back within
+# a single number or word. ``bench/adversarial.py`` checks that each stays linear.
 _METRIC_RE = re.compile(
     r"""
     (
-        \b\d{1,3}(?:,\d{3})*(?:\.\d+)?\s*(?:%|percent|pts?|x)?\b      
+        \b\d{1,3}+(?:,\d{3})*(?:\.\d++)?\s*(?:%|percent|pts?|x)?\b
         |
-        \b\d+(?:\.\d+)?\s*(?:k|m|b)\b                            
+        \b\d++(?:\.\d++)?+\s*+(?:k|m|b)\b
         |
-        \$\s*\d{1,3}(?:,\d{3})*(?:\.\d+)?                          
+        \$\s*+\d{1,3}(?:,\d{3})*(?:\.\d+)?
     )
     """,
     re.IGNORECASE | re.VERBOSE,
 )
+# "was" + a whole word ending in "ed": the word is taken possessively and its ending
+# checked with a lookbehind, instead of backtracking through it looking for "ed".
 _PASSIVE_VOICE_RE = re.compile(
-    r"\b(?:was|were|is|are|been|be|being)\s+\w+ed\b", re.IGNORECASE
+    r"\b(?:was|were|is|are|been|be|being)\s++\w++(?<=\wed)", re.IGNORECASE
 )
 _FIRST_PERSON_RE = re.compile(r"\b(I|me|my|we|our|us)\b", re.IGNORECASE)
+# A bullet glyph at the start of the text or after whitespace, and everything up to
+# the next glyph. A glyph followed only by whitespace yields a blank item, which
+# ``extract_bullet_spans`` skips.
+_BULLET_RE = re.compile(
+    r"(?<!\S)[•\u2022\u2023\u25CF\u25AA\u25E6\u00B7]\s*(?P<item>[^•\u2022\u2023\u25CF\u25AA\u25E6\u00B7]++)"
+)
+
+def _collapse_keeping_lines(match: t.Match) -> str:
+    return "\n" if _LINE_BREAK_RE.search(match.group()) else " "
 
-def clean_text(text: str) -> str:
+
+def clean_text(text: str, keep_lines: bool = False) -> str:
+    """
+    ``text`` with typographic dashes and quotes made plain and every run of whitespace
+    and control characters collapsed to one space. With ``keep_lines`` a run that
+    contains a line break becomes ``"\n"`` instead, so headings can still be found at
+    line starts; the result has the same length and offsets as without it.
+    """
     if text is None:
         return ""
 
@@ -45,8 +72,12 @@ def clean_text(text: str) -> str:
             .replace("\u201d", '"')
     )
 
-    text = _CONTROL_CHARS_RE.sub(" ", text)
-    text = _WHITESPACE_RE.sub(" ", text)
+    if keep_lines:
+        text = _CONTROL_CHARS_KEEP_LINES_RE.sub(" ", text)
+        text = _WHITESPACE_RE.sub(_collapse_keeping_lines, text)
+    else:
+        text = _CONTROL_CHARS_RE.sub(" ", text)
+        text = _WHITESPACE_RE.sub(" ", text)
 
     return text.strip()
 
@@ -60,36 +91,30 @@ def split_into_sentences(text: str) -> t.List[str]:
     return [s.strip() for s in sentences if s.strip()]
 
 
-def extract_bullets(text: str) -> t.List[str]:
-    pattern = re.compile(
-        r"""
-        (?:^| )
-        (?:
-            ^[ \t]*  
-            |
-            (?<=\s)
-        )            
-        [•\u2022\u2023\u25CF\u25AA\u25E6\u00B7] 
-        \s*
-        (?P<item>[^•\u2022\u2023\u25CF\u25AA\u25E6\u00B7]+)
-        """,
-        re.VERBOSE | re.MULTILINE
-    )
-
-    bullets: t.List[str] = []
-    for match in pattern.finditer(text):
-        item = match.group("item").strip()
+def extract_bullet_spans(text: str) -> t.List[t.Tuple[int, int, str]]:
+    spans: t.List[t.Tuple[int, int, str]] = []
+    for match in _BULLET_RE.finditer(text):
+        raw = match.group("item")
+        item = raw.strip()
         item = _WHITESPACE_RE.sub(" ", item)
         if item:
-            bullets.append(item)
+            start = match.start("item") + (len(raw) - len(raw.lstrip()))
+            spans.append((start, match.end("item"), item))
 
-    if not bullets:
-        for line in text.splitlines():
+    if not spans:
+        offset = 0
+        for line in text.splitlines(keepends=True):
             stripped = line.strip()
             if stripped and stripped[0] in BULLET_CHARS:
-                bullets.append(stripped.lstrip(BULLET_CHARS).strip())
+                start = offset + (len(line) - len(line.lstrip()))
+                spans.append((start, offset + len(line.rstrip()), stripped.lstrip(BULLET_CHARS).strip()))
+            offset += len(line)
+
+    return spans
 
-    return bullets
+
+def extract_bullets(text: str) -> t.List[str]:
+    return [item for _, _, item in extract_bullet_spans(text)]
 
 
 def contains_metric(text: str) -> bool:
@@ -114,19 +139,16 @@ def starts_with_action_verb(text: str) -> bool:
     return first_token in {v.lower() for v in ACTION_VERBS}
 
 
-def coverage_score(text: str) -> t.Tuple[float, t.Dict[str, bool]]:
+def coverage_score(
+    text: str,
+    sections: t.Optional[SectionIndex] = None,
+) -> t.Tuple[float, t.Dict[str, bool]]:
     if not text:
         found = {s: False for s in EXPECTED_SECTIONS}
         return 0.0, found
 
-    lower_lines = [l.strip().lower() for l in text.splitlines() if l.strip()]
-    found: t.Dict[str, bool] = {}
-
-    for section in EXPECTED_SECTIONS:
-        sec = section.lower()
-        pattern = re.compile(rf"^{re.escape(sec)}\b[:\-]?", re.IGNORECASE)
-        is_present = any(pattern.search(line) for line in lower_lines)
-        found[section] = is_present
+    index = sections if sections is not None else build_section_index(text)
+    found = index.found
 
     score = sum(found.values()) / len(found) if found else 0.0
     return float(score), found
@@ -139,6 +161,10 @@ def keyword_match_score(resume: str, jd: str) -> float:
     if not jd or len(jd.split()) < 5 or not resume:
         return 0.0
 
+    # scikit-learn is imported on first use; it dominates startup time otherwise.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
     try:
         vector = TfidfVectorizer(
             stop_words="english",
@@ -176,7 +202,11 @@ def compile_phrase_patterns(phrases: t.Iterable[str]) -> t.List[t.Tuple[str, re.
     return patterns
 
 
-def weak_phrases(text: str) -> t.List[t.Dict[str, t.Any]]:
+def weak_phrases(
+    text: str,
+    sections: t.Optional[SectionIndex] = None,
+    snippets: bool = True,
+) -> t.List[t.Dict[str, t.Any]]:
     if not text:
         return []
 
@@ -193,16 +223,16 @@ def weak_phrases(text: str) -> t.List[t.Dict[str, t.Any]]:
                 continue
             seen.add(key)
 
-            snippet = text[max(0, start - 40): min(len(text), end + 40)].strip()
-
-            out.append(
-                {
-                    "phrase": raw_phrase,
-                    "start": start,
-                    "end": end,
-                    "snippet": snippet,
-                }
-            )
+            hit = {
+                "phrase": raw_phrase,
+                "start": start,
+                "end": end,
+            }
+            if snippets:
+                hit["snippet"] = text[max(0, start - 40): min(len(text), end + 40)].strip()
+            if sections is not None:
+                hit["section"] = sections.section_at(start)
+            out.append(hit)
 
     return out
 
@@ -316,19 +346,14 @@ def estimate_experience_years(text: str) -> float:
     return float(max_year - min_year)
 
 
-def skill_coverage_score(resume: str, required_skills: t.Iterable[str]) -> float:
-    resume_lower = resume.lower()
-    skills = [s.strip().lower() for s in required_skills if s.strip()]
-
-    if not skills:
-        return 0.0
+def extract_skills(text: str, skills: t.Optional[t.Sequence[str]] = None) -> t.List[str]:
+    """
+    Canonical skills mentioned in ``text``, in order of first mention. Uses the
+    taxonomy in ``analyzer/data/skills.txt`` unless an explicit ``skills`` list is given.
+    """
+    matcher = default_matcher() if skills is None else SkillMatcher({s: [] for s in skills})
+    return list(dict.fromkeys(m.skill for m in matcher.find(text)))
 
-    found = 0
-    for skill in skills:
-        escaped = re.escape(skill)
-        flexible = re.sub(r"\\ ", r"\\s+", escaped)
-        pattern = re.compile(flexible, re.IGNORECASE)
-        if pattern.search(resume_lower):
-            found += 1
 
-    return found / len(skills)
+def skill_coverage_score(resume: str, required_skills: t.Iterable[str]) -> float:
+    return default_matcher().coverage(resume, required_skills)
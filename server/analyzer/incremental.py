@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import WEAK_PHRASES
+from .helpers import compile_phrase_patterns, contains_metric, starts_with_action_verb
+from .sections import SectionIndex
+
+
+# Weak phrases never contain bullet glyphs or sentence punctuation, so no match can
+# cross these boundaries and each segment can be scanned (and memoized) on its own.
+_SEGMENT_BOUNDARY_RE = re.compile(r"[•\u2022\u2023\u25CF\u25AA\u25E6\u00B7]|(?<=[.!?])(?=\s)")
+
+_WEAK_PHRASE_PATTERNS: Optional[List[Tuple[str, re.Pattern]]] = None
+
+
+def _weak_phrase_patterns() -> List[Tuple[str, re.Pattern]]:
+    global _WEAK_PHRASE_PATTERNS
+    if _WEAK_PHRASE_PATTERNS is None:
+        _WEAK_PHRASE_PATTERNS = compile_phrase_patterns(WEAK_PHRASES)
+    return _WEAK_PHRASE_PATTERNS
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def split_segments(text: str) -> List[Tuple[int, int]]:
+    bounds = [0]
+    for match in _SEGMENT_BOUNDARY_RE.finditer(text):
+        if match.start() > bounds[-1]:
+            bounds.append(match.start())
+    bounds.append(len(text))
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i + 1] > bounds[i]]
+
+
+@dataclass(frozen=True)
+class BulletFacts:
+    starts_with_action_verb: bool
+    contains_metric: bool
+    word_count: int
+
+
+# (phrase index in WEAK_PHRASES, start, end) relative to the segment
+SegmentHits = Tuple[Tuple[int, int, int], ...]
+
+
+class AnalysisMemo:
+    """
+    Per-bullet and per-segment results of one analysis, keyed by content hash.
+
+    A memo seeded with the memo of a previous revision only recomputes bullets and
+    segments whose text changed; entries that are not reused are not carried over, so
+    memos never grow beyond the size of the current document.
+    """
+
+    def __init__(self, previous: Optional["AnalysisMemo"] = None):
+        self._previous = previous
+        self.bullets: Dict[bytes, BulletFacts] = {}
+        self.segments: Dict[bytes, SegmentHits] = {}
+        self.reused = 0
+        self.computed = 0
+
+    def _lookup(self, table: str, key: bytes):
+        own = getattr(self, table)
+        if key in own:
+            return own[key]
+        if self._previous is not None:
+            value = getattr(self._previous, table).get(key)
+            if value is not None:
+                own[key] = value
+                self.reused += 1
+                return value
+        return None
+
+    def bullet_facts(self, bullet: str) -> BulletFacts:
+        key = content_hash(bullet)
+        facts = self._lookup("bullets", key)
+        if facts is None:
+            facts = BulletFacts(
+                starts_with_action_verb=bool(starts_with_action_verb(bullet)),
+                contains_metric=bool(contains_metric(bullet)),
+                word_count=len(bullet.split()),
+            )
+            self.bullets[key] = facts
+            self.computed += 1
+        return facts
+
+    def segment_hits(self, segment: str) -> SegmentHits:
+        key = content_hash(segment)
+        hits = self._lookup("segments", key)
+        if hits is None:
+            found = []
+            for idx, (_, pattern) in enumerate(_weak_phrase_patterns()):
+                for match in pattern.finditer(segment):
+                    found.append((idx, match.start(), match.end()))
+            hits = tuple(found)
+            self.segments[key] = hits
+            self.computed += 1
+        return hits
+
+    def weak_phrases(
+        self,
+        text: str,
+        sections: Optional[SectionIndex] = None,
+        snippets: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Same output as ``helpers.weak_phrases`` but assembled from memoized segments."""
+        if not text:
+            return []
+
+        patterns = _weak_phrase_patterns()
+        hits: List[Tuple[int, int, int]] = []
+        for seg_start, seg_end in split_segments(text):
+            for idx, start, end in self.segment_hits(text[seg_start:seg_end]):
+                hits.append((idx, seg_start + start, seg_start + end))
+        hits.sort()
+
+        out: List[Dict[str, Any]] = []
+        for idx, start, end in hits:
+            hit = {
+                "phrase": patterns[idx][0],
+                "start": start,
+                "end": end,
+            }
+            if snippets:
+                hit["snippet"] = text[max(0, start - 40): min(len(text), end + 40)].strip()
+            if sections is not None:
+                hit["section"] = sections.section_at(start)
+            out.append(hit)
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {"reused": self.reused, "computed": self.computed}
+
+
+def bullet_quality_from_facts(facts: Sequence[BulletFacts]) -> Dict[str, float]:
+    """Same output as ``helpers.bullet_quality_stats`` from precomputed per-bullet facts."""
+    if not facts:
+        return {
+            "avg_length_words": 0.0,
+            "pct_with_action_verb": 0.0,
+            "pct_with_metric": 0.0,
+            "pct_too_long": 0.0,
+            "pct_too_short": 0.0,
+        }
+
+    total = len(facts)
+    return {
+        "avg_length_words": sum(f.word_count for f in facts) / total,
+        "pct_with_action_verb": sum(f.starts_with_action_verb for f in facts) / total,
+        "pct_with_metric": sum(f.contains_metric for f in facts) / total,
+        "pct_too_long": sum(f.word_count > 40 for f in facts) / total,
+        "pct_too_short": sum(f.word_count < 5 for f in facts) / total,
+    }
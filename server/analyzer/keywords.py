@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .helpers import clean_text, keyword_match_score
+from .semantic import default_model, project
+
+
+# ``keyword_match_score`` fits a TfidfVectorizer on just [resume, jd]: smooth idf over
+# two documents gives 1 to terms both contain and ln(3/2) + 1 to terms only one does.
+_UNIQUE_IDF = math.log(3 / 2) + 1
+_MAX_FEATURES = 5000
+
+
+def _column(m) -> np.ndarray:
+    return np.asarray(m.todense()).ravel()
+
+
+def _pair_cosines(dot, a_shared_sq, a_sq, a_terms, b_shared_sq, b_sq, b_terms, shared_terms):
+    """
+    Two-document TF-IDF cosines from raw term counts of each pair: ``dot`` over shared
+    terms, sums of squared counts over shared / all terms and distinct term counts.
+    Returns the scores and a mask of pairs that must go through the scalar path.
+    """
+    c2 = _UNIQUE_IDF * _UNIQUE_IDF
+    a_norm = np.sqrt(a_shared_sq + c2 * (a_sq - a_shared_sq))
+    b_norm = np.sqrt(b_shared_sq + c2 * (b_sq - b_shared_sq))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(dot > 0, dot / (a_norm * b_norm), 0.0)
+
+    vocab = a_terms + b_terms - shared_terms
+    return scores, (vocab == 0) | (vocab > _MAX_FEATURES)
+
+
+def keyword_match_scores(resumes: Sequence[str], jd: str) -> np.ndarray:
+    """
+    ``keyword_match_score(resume, jd)`` for every resume, from one vectorizer pass.
+
+    Term counts for the whole batch are extracted once. Each pair's TF-IDF cosine is
+    then assembled from sparse products: only shared terms contribute to the dot
+    product (with idf 1), and each norm splits into shared and unshared terms.
+    Pairs the closed form does not cover, an empty pair vocabulary (the scalar
+    function's overlap fallback) or one over ``max_features`` terms, are delegated to
+    ``keyword_match_score``. Results agree with it to floating-point rounding.
+    """
+    resumes = [clean_text(r) for r in resumes]
+    jd = clean_text(jd)
+    scores = np.zeros(len(resumes))
+
+    if not resumes or not jd or len(jd.split()) < 5:
+        return scores
+
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    vectorizer = CountVectorizer(stop_words="english", ngram_range=(1, 2))
+    try:
+        counts = vectorizer.fit_transform(list(resumes) + [jd]).astype(np.float64).tocsr()
+    except ValueError:
+        # No term survives in any document; every pair takes the fallback.
+        counts = None
+
+    if counts is not None:
+        R, J = counts[:-1], counts[-1]
+        R_bin, J_bin = R.sign(), J.sign()
+        R_sq, J_sq = R.multiply(R), J.multiply(J)
+
+        scores, fallback = _pair_cosines(
+            dot=_column(R @ J.T),
+            a_shared_sq=_column(R_sq @ J_bin.T),
+            a_sq=np.asarray(R_sq.sum(axis=1)).ravel(),
+            a_terms=np.diff(R.indptr),
+            b_shared_sq=_column(R_bin @ J_sq.T),
+            b_sq=float(J_sq.sum()),
+            b_terms=J.nnz,
+            shared_terms=_column(R_bin @ J_bin.T),
+        )
+    else:
+        fallback = np.ones(len(resumes), dtype=bool)
+
+    for i in np.flatnonzero(fallback):
+        scores[i] = keyword_match_score(resumes[i], jd)
+
+    empty = np.array([not r for r in resumes])
+    scores[empty] = 0.0
+    return scores
+
+
+class KeywordMatrix:
+    """
+    Term counts of a fixed set of job descriptions, vectorised once so that a resume
+    can be scored against all of them with a handful of sparse products.
+
+    ``scores(resume)[i]`` equals ``keyword_match_score(resume, jds[i])`` (to
+    floating-point rounding), with the same delegation rules as ``keyword_match_scores``.
+    """
+
+    def __init__(self, jds: Sequence[str]):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.jds = [clean_text(jd) for jd in jds]
+        self.vectorizer = CountVectorizer(stop_words="english", ngram_range=(1, 2))
+        try:
+            counts = self.vectorizer.fit_transform(self.jds).astype(np.float64).tocsr()
+        except ValueError:
+            counts = None
+
+        self.counts = counts
+        self.short = np.array([len(jd.split()) < 5 for jd in self.jds], dtype=bool)
+        self._semantic: Optional[np.ndarray] = None
+        if counts is not None:
+            self._analyzer = self.vectorizer.build_analyzer()
+            self._binary = counts.sign()
+            self._sq = counts.multiply(counts).tocsr()
+            self._row_sq = np.asarray(self._sq.sum(axis=1)).ravel()
+            self._row_terms = np.diff(counts.indptr)
+
+    def __len__(self) -> int:
+        return len(self.jds)
+
+    def top_terms(self, index: int, n: int = 20) -> List[str]:
+        """
+        The ``n`` highest-weighted terms of JD ``index``. Within one document every term
+        shares the same idf, so this is its most frequent terms (ties alphabetically).
+        """
+        if self.counts is None:
+            return []
+        names = self.vectorizer.get_feature_names_out()
+        row = self.counts.getrow(index)
+        ranked = sorted(zip(row.indices.tolist(), row.data.tolist()), key=lambda p: (-p[1], names[p[0]]))
+        return [str(names[i]) for i, _ in ranked[:n]]
+
+    def semantic_vectors(self) -> np.ndarray:
+        """The JDs projected into the semantic space, one row each; computed on first use."""
+        if self._semantic is None:
+            self._semantic = default_model().project_many(self.jds)
+        return self._semantic
+
+    def semantic_scores(self, resume: str) -> np.ndarray:
+        """``semantic_match_score(resume, jds[i])`` for every JD, as one matrix-vector product."""
+        resume = clean_text(resume)
+        if not resume or not self.jds:
+            return np.zeros(len(self.jds))
+        scores = self.semantic_vectors() @ project(resume)
+        return np.maximum(scores.astype(np.float64), 0.0)
+
+    def scores(self, resume: str) -> np.ndarray:
+        resume = clean_text(resume)
+        scores = np.zeros(len(self.jds))
+        if not resume or not self.jds:
+            return scores
+
+        if self.counts is not None:
+            # The resume's own terms, including those no JD contains: they only
+            # enter its norm, with the unshared idf.
+            own: Dict[str, int] = {}
+            for term in self._analyzer(resume):
+                own[term] = own.get(term, 0) + 1
+            r = self.vectorizer.transform([resume]).astype(np.float64).tocsr()
+            r_bin, r_sq = r.sign(), r.multiply(r)
+
+            scores, fallback = _pair_cosines(
+                dot=_column(self.counts @ r.T),
+                a_shared_sq=_column(self._binary @ r_sq.T),
+                a_sq=float(sum(c * c for c in own.values())),
+                a_terms=len(own),
+                b_shared_sq=_column(self._sq @ r_bin.T),
+                b_sq=self._row_sq,
+                b_terms=self._row_terms,
+                shared_terms=_column(self._binary @ r_bin.T),
+            )
+        else:
+            fallback = np.ones(len(self.jds), dtype=bool)
+
+        for i in np.flatnonzero(fallback & ~self.short):
+            scores[i] = keyword_match_score(resume, self.jds[i])
+
+        scores[self.short] = 0.0
+        return scores
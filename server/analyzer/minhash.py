@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles, for estimating how much two documents overlap.
+
+    A document is reduced to the set of its ``shingle_size``-word runs (lower-cased),
+    and its signature is the minimum of ``num_perm`` random hash functions over that
+    set. The share of positions where two signatures agree estimates the Jaccard
+    similarity of the two sets. A fixed typo changes only a handful of shingles, so
+    resubmissions score close to 1. Different resumes share very few five-word runs.
+
+    Token hashes come from BLAKE2b rather than ``hash()``, so every worker process
+    computes the same signature for the same text.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a < 2**31 and shingle hashes < 2**32 keep a * h + b below 2**64.
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self._weights = np.array(
+            [pow(0x100000001B3, i, 1 << 64) for i in range(shingle_size)][::-1], dtype=np.uint64
+        )
+
+    def shingles(self, text: str) -> np.ndarray:
+        """32-bit hashes of the distinct word shingles of ``text``."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        if not tokens:
+            return np.zeros(0, dtype=np.uint64)
+        cache = {}
+        hashes = np.fromiter(
+            (cache[t] if t in cache else cache.setdefault(t, _token_hash(t)) for t in tokens),
+            dtype=np.uint64, count=len(tokens),
+        )
+        k = min(self.shingle_size, len(hashes))
+        windows = np.lib.stride_tricks.sliding_window_view(hashes, k)
+        with np.errstate(over="ignore"):
+            combined = (windows * self._weights[-k:]).sum(axis=1, dtype=np.uint64)  # wraps mod 2**64
+        folded = (combined >> np.uint64(32)) ^ (combined & _MAX_HASH)
+        return np.unique(folded)
+
+    def signature(self, text: str) -> np.ndarray:
+        """``num_perm`` uint32 minima; all ``0xFFFFFFFF`` for a text without words."""
+        shingles = self.shingles(text)
+        if not len(shingles):
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        permuted = (shingles[:, None] * self._a + self._b) % _MERSENNE_61 & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.mean(a == b))
+
+
+def band_keys(signature: np.ndarray, bands: int) -> List[int]:
+    """
+    One signed 64-bit key per band of ``signature`` (LSH banding). Two documents share
+    at least one key with probability ``1 - (1 - s**r)**bands`` at similarity ``s``,
+    ``r`` being the rows per band; with 16 bands of 8 that is over 0.9999 at 0.9 and
+    under 0.02 at 0.4.
+    """
+    rows = len(signature) // bands
+    return [
+        int.from_bytes(
+            hashlib.blake2b(signature[i * rows:(i + 1) * rows].tobytes(), digest_size=8, person=bytes([i])).digest(),
+            "little", signed=True,
+        )
+        for i in range(bands)
+    ]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+from .config import EXPECTED_SECTIONS
+
+
+# Everything ``str.splitlines`` treats as a line boundary.
+LINE_BREAKS = r"\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _compile_heading_pattern(sections: Sequence[str]) -> re.Pattern:
+    # Longest first so that no heading can shadow a longer one sharing its prefix;
+    # one group per section so ``lastgroup`` names the canonical heading.
+    ordered = sorted(range(len(sections)), key=lambda i: len(sections[i]), reverse=True)
+    alternation = "|".join(f"(?P<s{i}>{re.escape(sections[i].lower())})" for i in ordered)
+    return re.compile(
+        rf"(?:^|(?<=[{LINE_BREAKS}]))[^\S{LINE_BREAKS}]*(?:{alternation})\b",
+        re.IGNORECASE,
+    )
+
+
+_HEADING_RE = _compile_heading_pattern(EXPECTED_SECTIONS)
+
+
+@dataclass(frozen=True)
+class SectionSpan:
+    name: str
+    start: int
+    body_start: int
+    end: int
+
+
+class SectionIndex:
+    """
+    Spans of the ``EXPECTED_SECTIONS`` headings found at line starts, built in a single
+    pass over the text. A section runs from its heading to the next heading (or the end
+    of the text); offsets before the first heading belong to no section.
+    """
+
+    __slots__ = ("text_length", "spans", "_starts")
+
+    def __init__(self, spans: Sequence[SectionSpan], text_length: int):
+        self.text_length = text_length
+        self.spans: Tuple[SectionSpan, ...] = tuple(spans)
+        self._starts = [s.start for s in self.spans]
+
+    @property
+    def found(self) -> Dict[str, bool]:
+        present = {s.name for s in self.spans}
+        return {s: s in present for s in EXPECTED_SECTIONS}
+
+    def section_at(self, offset: int) -> Optional[str]:
+        idx = bisect.bisect_right(self._starts, offset) - 1
+        if idx < 0:
+            return None
+        return self.spans[idx].name
+
+    def spans_for(self, name: str) -> List[SectionSpan]:
+        return [s for s in self.spans if s.name == name]
+
+    def filter_offsets(
+        self,
+        items: Sequence[Dict[str, Any]],
+        sections: Collection[str],
+        key: str = "start",
+    ) -> List[Dict[str, Any]]:
+        wanted = {s.lower() for s in sections}
+        return [i for i in items if (self.section_at(i[key]) or "") in wanted]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": s.name, "start": s.start, "body_start": s.body_start, "end": s.end}
+            for s in self.spans
+        ]
+
+
+def build_section_index(text: str) -> SectionIndex:
+    if not text:
+        return SectionIndex((), 0)
+
+    heads = [
+        (m.start(m.lastgroup), m.end(), EXPECTED_SECTIONS[int(m.lastgroup[1:])])
+        for m in _HEADING_RE.finditer(text)
+    ]
+
+    spans = [
+        SectionSpan(
+            name=name,
+            start=start,
+            body_start=body_start,
+            end=heads[i + 1][0] if i + 1 < len(heads) else len(text),
+        )
+        for i, (start, body_start, name) in enumerate(heads)
+    ]
+    return SectionIndex(spans, len(text))
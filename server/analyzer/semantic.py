@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "data", "semantic_lsa.npz")
+
+# Tokens keep "+" and "#" so that "c++" and "c#" survive; everything else (dots,
+# slashes, hyphens) separates tokens, as in "node.js" or "scikit-learn".
+TOKEN_PATTERN = r"[a-z0-9][a-z0-9+#]*"
+
+
+class SemanticModel:
+    """
+    A latent semantic (LSA) space: TF-IDF weights over a fixed vocabulary followed by
+    a truncated-SVD projection to a few dozen dimensions, trained offline by
+    ``analyzer/train_semantic.py``.
+
+    Terms that occur in the same kinds of documents end up close together, so
+    "pytorch" in a resume lands near "deep learning frameworks" in a job description
+    even though they share no word. ``project`` maps a text to a vector in that space
+    and the similarity of two texts is the dot product of their projections.
+    Inference needs only NumPy.
+
+    A projection is a unit direction scaled by how much of the text's TF-IDF weight
+    the vocabulary covers (unknown words count with the highest idf). A JD whose only
+    known word is "experience" would otherwise point straight along "experience" and
+    match any resume.
+    """
+
+    def __init__(self, vocabulary: Sequence[str], idf: np.ndarray, components: np.ndarray,
+                 stop_words: Iterable[str] = (), token_pattern: str = TOKEN_PATTERN):
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(vocabulary)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)  # (dimensions, terms)
+        self.stop_words = frozenset(stop_words)
+        self.token_pattern = token_pattern
+        self._token_re = re.compile(token_pattern)
+        self._unknown_idf = float(self.idf.max()) if len(self.idf) else 1.0
+
+    @property
+    def dimensions(self) -> int:
+        return self.components.shape[0]
+
+    def fingerprint(self) -> str:
+        """A short digest of the space: projections are only comparable under the same one."""
+        digest = hashlib.blake2b(self.components.tobytes(), digest_size=8)
+        digest.update(self.idf.tobytes())
+        return digest.hexdigest()
+
+    def analyze(self, text: str) -> List[str]:
+        """Unigrams and bigrams of ``text``, exactly as the training vectorizer saw them."""
+        tokens = [t for t in self._token_re.findall(text.lower()) if t not in self.stop_words]
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def direction(self, text: str) -> Tuple[np.ndarray, float]:
+        """
+        The unit LSA vector of ``text`` (what the trained vectorizer and SVD give, once
+        normalised) and the share of its TF-IDF norm that falls on known terms.
+        """
+        counts: Dict[int, int] = {}
+        unknown: Dict[str, int] = {}
+        for term in self.analyze(text or ""):
+            index = self.vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+            elif " " not in term:  # most bigrams are unseen; only unknown words count
+                unknown[term] = unknown.get(term, 0) + 1
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if not counts:
+            return vector, 0.0
+
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        weights = (1.0 + np.log(tf)) * self.idf[indices]  # sublinear tf, as trained
+        known_sq = float(weights @ weights)
+        unknown_sq = sum(((1.0 + math.log(c)) * self._unknown_idf) ** 2 for c in unknown.values())
+
+        vector = self.components[:, indices] @ (weights / math.sqrt(known_sq))
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return vector, 0.0
+        return vector / norm, math.sqrt(known_sq / (known_sq + unknown_sq))
+
+    def project(self, text: str) -> np.ndarray:
+        vector, coverage = self.direction(text)
+        return vector * np.float32(coverage)
+
+    def project_many(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.vstack([self.project(text) for text in texts])
+
+    def save(self, path: str) -> None:
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez_compressed(
+            path,
+            vocabulary=np.array(terms),
+            idf=self.idf,
+            components=self.components,
+            stop_words=np.array(sorted(self.stop_words)),
+            token_pattern=np.array(self.token_pattern),
+        )
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "SemanticModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["vocabulary"].tolist(),
+                data["idf"],
+                data["components"],
+                data["stop_words"].tolist(),
+                str(data["token_pattern"]),
+            )
+
+
+class ProjectionCache:
+    """
+    Bounded LRU of text digest -> projection, so a JD or resume seen again (retries,
+    revisions, one JD against many resumes) is projected only once.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def project(self, model: SemanticModel, text: str) -> np.ndarray:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                return vector
+
+        vector = model.project(text)
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[key] = vector
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+
+_projections = ProjectionCache()
+
+
+@functools.lru_cache(maxsize=1)
+def default_model() -> SemanticModel:
+    return SemanticModel.load()
+
+
+def project(text: str) -> np.ndarray:
+    """The cached projection of ``text`` in the default model's space."""
+    return _projections.project(default_model(), text)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Dot product of two projections, floored at 0 like the lexical score."""
+    score = float(a @ b)
+    return score if score > 0 and math.isfinite(score) else 0.0
+
+
+def semantic_match_score(resume: str, jd: str) -> float:
+    if not resume or not jd:
+        return 0.0
+    return similarity(project(resume), project(jd))
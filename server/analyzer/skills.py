@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import functools
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "skills.txt")
+
+# Text is cut into units at whitespace and list punctuation; a unit that is not a
+# taxonomy token as a whole ("python/django", "python-based") is split again at
+# slashes and hyphens. Trailing sentence punctuation never belongs to a skill.
+_UNIT_RE = re.compile(r"[^\s,;:()\[\]{}<>\"'|]+")
+_PIECE_RE = re.compile(r"[^/\-]+")
+_TRAILING = ".!?"
+
+_END = None  # trie key marking a complete skill
+
+
+@dataclass(frozen=True, slots=True)
+class SkillMatch:
+    skill: str
+    start: int
+    end: int
+    text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"skill": self.skill, "start": self.start, "end": self.end, "text": self.text}
+
+
+def load_taxonomy(path: str = TAXONOMY_PATH) -> Dict[str, List[str]]:
+    """Read ``canonical | alias | alias`` lines; blank lines and ``#`` comments are skipped."""
+    taxonomy: Dict[str, List[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [n.strip() for n in line.split("|") if n.strip()]
+            taxonomy.setdefault(names[0], []).extend(names[1:])
+    return taxonomy
+
+
+class SkillMatcher:
+    """
+    Every skill and alias of a taxonomy compiled into one token trie.
+
+    ``find`` tokenises the text once and walks the trie from each token, keeping the
+    leftmost-longest match, so the cost grows with the text and the longest skill (in
+    tokens), not with the size of the taxonomy.
+    """
+
+    def __init__(self, taxonomy: Mapping[str, Sequence[str]]):
+        self._root: Dict[Any, Any] = {}
+        self._vocab = set()
+        for canonical, aliases in taxonomy.items():
+            for name in (canonical, *aliases):
+                self._insert(name, canonical)
+
+    def _insert(self, name: str, canonical: str) -> None:
+        tokens = name.lower().split()
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            self._vocab.add(token)
+            node = node.setdefault(token, {})
+        node.setdefault(_END, canonical)
+
+    def _tokens(self, text: str) -> List[Tuple[str, int, int]]:
+        tokens: List[Tuple[str, int, int]] = []
+        for unit in _UNIT_RE.finditer(text):
+            start, end = unit.span()
+            while end > start and text[end - 1] in _TRAILING:
+                end -= 1
+            if end == start:
+                continue
+
+            word = text[start:end].lower()
+            if word in self._vocab:
+                tokens.append((word, start, end))
+                continue
+            for piece in _PIECE_RE.finditer(text, start, end):
+                tokens.append((piece.group().lower(), piece.start(), piece.end()))
+        return tokens
+
+    def find(self, text: str) -> List[SkillMatch]:
+        if not text:
+            return []
+
+        tokens = self._tokens(text)
+        matches: List[SkillMatch] = []
+        i = 0
+        while i < len(tokens):
+            node = self._root
+            best: Optional[Tuple[int, str]] = None
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+
+            if best is None:
+                i += 1
+                continue
+
+            j, canonical = best
+            start, end = tokens[i][1], tokens[j - 1][2]
+            matches.append(SkillMatch(canonical, start, end, text[start:end]))
+            i = j
+        return matches
+
+    def canonical(self, name: str) -> Optional[str]:
+        """The taxonomy entry ``name`` (a skill or one of its aliases) resolves to."""
+        node = self._root
+        for token in name.lower().split():
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(_END)
+
+    def coverage(
+        self,
+        text: str,
+        required_skills: Iterable[str],
+        matches: Optional[List[SkillMatch]] = None,
+    ) -> float:
+        """
+        Share of ``required_skills`` found in ``text``. Required skills are resolved
+        through the taxonomy, so an alias in either place counts; skills the taxonomy
+        does not know are matched with a throwaway matcher of their own.
+        """
+        required = list(dict.fromkeys(s.strip().lower() for s in required_skills if s.strip()))
+        if not required:
+            return 0.0
+
+        found = {m.skill for m in (matches if matches is not None else self.find(text))}
+        unknown = tuple(s for s in required if self.canonical(s) is None)
+        if unknown:
+            found.update(m.skill for m in _adhoc_matcher(unknown).find(text))
+
+        hits = sum(1 for s in required if (self.canonical(s) or s) in found)
+        return hits / len(required)
+
+
+@functools.lru_cache(maxsize=64)
+def _adhoc_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher({s: [] for s in skills})
+
+
+@functools.lru_cache(maxsize=1)
+def default_matcher() -> SkillMatcher:
+    return SkillMatcher(load_taxonomy())
@@ -1,4 +1,5 @@
-def generate_suggestions(analysis: dict, weak_phrases, has_jd: bool, model=None, mlb=None, threshold=0.5):
+def generate_suggestions(analysis: dict, weak_phrases, has_jd: bool, model=None, mlb=None, threshold=0.5,
+                         include_scores: bool = True):
     suggestions = []
 
     missing = [s for s, p in analysis["section_found"].items() if not p]
@@ -34,10 +35,12 @@ def generate_suggestions(analysis: dict, weak_phrases, has_jd: bool, model=None,
         mask = probs >= threshold
         labels = mlb.classes_[mask]
 
-        results.append({
+        result = {
             "suggestion": text,
             "categories": list(labels),
-            "scores": {cls: float(prob) for cls, prob in zip(mlb.classes_, probs)}
-        })
+        }
+        if include_scores:
+            result["scores"] = {cls: float(prob) for cls, prob in zip(mlb.classes_, probs)}
+        results.append(result)
 
     return results
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, Optional
+
+
+class CpuBudgetExceeded(RuntimeError):
+    """Raised at a stage boundary once an analysis has used more CPU time than allowed."""
+
+    def __init__(self, stage: str, used: float, budget: float):
+        super().__init__(f"Analysis used {used:.2f}s of CPU time (at stage {stage!r}); the limit is {budget:.2f}s")
+        self.stage = stage
+        self.used = used
+        self.budget = budget
+
+
+class StageTimer:
+    """Wall-clock durations (seconds) of the named pipeline stages of one analysis."""
+
+    __slots__ = ("stages", "_started", "_cpu_budget", "_cpu_thread", "_cpu_started")
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._cpu_budget: Optional[float] = None
+        self._cpu_thread: Optional[int] = None
+        self._cpu_started = 0.0
+
+    def limit_cpu(self, seconds: Optional[float]) -> None:
+        """
+        From now on, raise ``CpuBudgetExceeded`` at the next stage boundary once the
+        calling thread has spent more than ``seconds`` of CPU time. Stages can not be
+        interrupted, so this bounds an analysis only because every stage is linear in
+        its (capped) input. Stages timed on other threads are not counted.
+        """
+        self._cpu_budget = seconds or None
+        self._cpu_thread = threading.get_ident()
+        self._cpu_started = time.thread_time()
+
+    def _check_cpu(self, name: str) -> None:
+        if self._cpu_budget is None or threading.get_ident() != self._cpu_thread:
+            return
+        used = time.thread_time() - self._cpu_started
+        if used > self._cpu_budget:
+            raise CpuBudgetExceeded(name, used, self._cpu_budget)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._check_cpu(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+        self._check_cpu(name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._started
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def timed(timer: Optional[StageTimer], name: str) -> ContextManager[None]:
+    if timer is None:
+        return nullcontext()
+    return timer.stage(name)
@@ -0,0 +1,157 @@
+"""
+Train the latent semantic model used for ``semantic_score`` (``analyzer/semantic.py``).
+
+TF-IDF over a local corpus followed by truncated SVD; the vocabulary, idf weights and
+projection matrix are written to ``analyzer/data/semantic_lsa.npz``. The corpus is:
+
+- documents sampled from the skills taxonomy, one category at a time (a random subset
+  of the skills and aliases under a heading such as "# Machine learning and data
+  science", in a line of resume or JD boilerplate), so skills of one family co-occur
+  the way they do in real resumes;
+- every ``.txt`` file under ``--corpus`` (by default the benchmark resumes and job
+  descriptions). Point it at a directory of real resumes and JDs for a better space.
+
+    cd server
+    python -m analyzer.train_semantic --dimensions 48
+    python -m analyzer.train_semantic --corpus /data/resumes --corpus /data/jds --out /tmp/lsa.npz
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .semantic import MODEL_PATH, TOKEN_PATTERN, SemanticModel
+from .skills import TAXONOMY_PATH
+
+SERVER_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def taxonomy_categories(path: str = TAXONOMY_PATH) -> List[Tuple[str, List[List[str]]]]:
+    """``(heading, [[canonical, *aliases], ...])`` for each ``# heading`` block of the taxonomy."""
+    categories: List[Tuple[str, List[List[str]]]] = []
+    comment: Optional[str] = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                comment = None
+            elif line.startswith("#"):
+                comment = line.lstrip("#").strip()
+            else:
+                names = [n.strip() for n in line.split("|") if n.strip()]
+                if comment is not None:
+                    categories.append((comment, []))
+                    comment = None
+                if categories:
+                    categories[-1][1].append(names)
+    return categories
+
+
+# Resume and JD boilerplate wrapped around the sampled skills. Spread evenly over every
+# category, words like "experience" or "team" end up with a low idf and no direction of
+# their own, as they would in a large real corpus; otherwise a JD that is mostly
+# boilerplate lands close to any resume.
+FRAMES = (
+    "{heading}. Experience with {skills}.",
+    "Skills: {skills}",
+    "Built and maintained production systems using {skills}.",
+    "We are looking for an engineer with {years}+ years of experience in {skills}.",
+    "Worked with {skills} across several teams and projects.",
+    "Requirements: {skills}. Strong communication and ownership.",
+    "Responsible for {skills}; developed, designed and delivered features with the team.",
+    "Senior engineer, {years} years. Led work on {skills} and improved the product for customers.",
+)
+
+
+def taxonomy_documents(per_category: int, seed: int, path: str = TAXONOMY_PATH) -> List[str]:
+    rng = random.Random(seed)
+    documents: List[str] = []
+    for heading, skills in taxonomy_categories(path):
+        documents.append(heading + "\n" + "\n".join(" ".join(names) for names in skills))
+        for _ in range(per_category):
+            picked = rng.sample(skills, min(len(skills), rng.randint(6, 14)))
+            documents.append(rng.choice(FRAMES).format(
+                heading=heading,
+                skills=", ".join(rng.choice(names) for names in picked),
+                years=rng.randint(2, 10),
+            ))
+    return documents
+
+
+def corpus_documents(directories: Sequence[str]) -> List[str]:
+    documents: List[str] = []
+    for directory in directories:
+        for entry in sorted(pathlib.Path(directory).rglob("*.txt")):
+            text = entry.read_text(encoding="utf-8", errors="ignore").strip()
+            if text:
+                documents.append(text)
+    return documents
+
+
+def train(documents: Sequence[str], dimensions: int, min_df: int = 2, max_features: int = 20000,
+          seed: int = 0) -> SemanticModel:
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(
+        token_pattern=TOKEN_PATTERN,
+        stop_words=sorted(ENGLISH_STOP_WORDS),
+        ngram_range=(1, 2),
+        min_df=min_df,
+        max_features=max_features,
+        sublinear_tf=True,
+    )
+    tfidf = vectorizer.fit_transform(documents)
+    dimensions = min(dimensions, tfidf.shape[1] - 1)
+    svd = TruncatedSVD(n_components=dimensions, random_state=seed).fit(tfidf)
+
+    model = SemanticModel(
+        vectorizer.get_feature_names_out().tolist(),
+        vectorizer.idf_,
+        svd.components_,
+        ENGLISH_STOP_WORDS,
+    )
+
+    # The model re-implements the vectorizer without scikit-learn; check they agree.
+    analyzer = vectorizer.build_analyzer()
+    reference = svd.transform(tfidf[:50])
+    for document, expected in zip(documents[:50], reference):
+        assert analyzer(document) == model.analyze(document)
+        norm = np.linalg.norm(expected)
+        if norm > 0:
+            assert np.allclose(model.direction(document)[0], expected / norm, atol=1e-4)
+    return model
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", action="append", default=None, metavar="DIR",
+                        help="directory of .txt documents, may be repeated (default: bench/corpus and bench/jds)")
+    parser.add_argument("--per-category", type=int, default=60, help="documents sampled per taxonomy category")
+    parser.add_argument("--dimensions", type=int, default=48, help="latent dimensions to keep")
+    parser.add_argument("--min-df", type=int, default=2, help="drop terms in fewer documents than this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=MODEL_PATH)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    corpus = args.corpus or [str(SERVER_DIR / "bench" / "corpus"), str(SERVER_DIR / "bench" / "jds")]
+
+    documents = taxonomy_documents(args.per_category, args.seed) + corpus_documents(corpus)
+    model = train(documents, args.dimensions, args.min_df, seed=args.seed)
+    model.save(args.out)
+
+    size = pathlib.Path(args.out).stat().st_size
+    print(f"{len(documents)} documents, {len(model.vocabulary)} terms, {model.dimensions} dimensions "
+          f"-> {args.out} ({size / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,37 +1,140 @@
 from __future__ import annotations
 
 import io
+import mmap
+import threading
+import zipfile
+from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, Sequence, Tuple
-
-from PyPDF2 import PdfReader
-import fitz
-from docx import Document
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 from .helpers import starts_with_action_verb, contains_metric
 
-def _detect_text_encoding(data: bytes, fallback: str = "latin-1") -> str:
+# The format readers (PyPDF2, PyMuPDF, python-docx) are imported inside the functions
+# that use them, so a process that only ever sees text never loads them.
+
+# MuPDF contexts are not safe to share between threads; batch analyses run in a
+# thread pool, so every PyMuPDF call goes through this lock.
+_FITZ_LOCK = threading.Lock()
+
+class _MappedFile(mmap.mmap):
+    # ``zipfile`` (python-docx) asks its file object whether it is seekable, which
+    # ``mmap`` only answers from Python 3.13.
+    def seekable(self) -> bool:
+        return True
+
+
+# What the readers accept: the bytes of an upload, or a read-only map of a file on disk.
+Buffer = Union[bytes, mmap.mmap]
+
+
+@contextmanager
+def _mapped(path: str) -> Iterator[Buffer]:
+    """
+    The contents of ``path`` as a read-only memory map, unmapped on exit. The readers
+    parse it in place: pages are faulted in from the page cache as they are read and
+    can be dropped again under memory pressure, instead of the whole file being
+    copied into the process first (and again for each wrapper around it).
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files cannot be mapped, nor can pipes and some special files.
+            yield f.read()
+            return
+        with mapped:
+            yield mapped
+
+
+def _stream(data: Buffer):
+    """A seekable file object over ``data``, without copying it."""
+    if isinstance(data, mmap.mmap):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+
+def _detect_text_encoding(data: Buffer, fallback: str = "latin-1") -> str:
     for enc in ("utf-8", "utf-16", fallback):
         try:
-            return data.decode(enc)
+            return str(data, enc)
         except UnicodeDecodeError:
             continue
 
-    return data.decode(fallback, errors="ignore")
+    return str(data, fallback, errors="ignore")
+
+
+class DocumentTooLarge(ValueError):
+    """Raised by ``extract_document`` in strict mode for a PDF with more pages than allowed."""
+
+    def __init__(self, total_pages: int, max_pages: int):
+        super().__init__(f"Document has {total_pages} pages; at most {max_pages} are accepted")
+        self.total_pages = total_pages
+        self.max_pages = max_pages
+
+
+class DocumentExpandsTooFar(DocumentTooLarge):
+    """Raised by ``extract_document`` for a DOCX whose parts decompress past the limit."""
+
+    def __init__(self, expanded_bytes: int, max_expanded_bytes: int):
+        ValueError.__init__(
+            self, f"Document expands to {expanded_bytes} bytes; at most {max_expanded_bytes} are accepted"
+        )
+        self.total_pages = self.max_pages = None
+        self.expanded_bytes = expanded_bytes
+        self.max_expanded_bytes = max_expanded_bytes
+
+
+def _check_expanded_size(file_bytes: Buffer, max_expanded_bytes: Optional[int]) -> None:
+    # A DOCX is a ZIP archive: a few kilobytes can declare gigabytes of XML, which the
+    # parser would inflate and build a tree for before any limit on the text applies.
+    # The sizes in the central directory are what ``zipfile`` will inflate up to.
+    if not max_expanded_bytes:
+        return
+    try:
+        with zipfile.ZipFile(_stream(file_bytes)) as archive:
+            expanded = sum(info.file_size for info in archive.infolist())
+    except zipfile.BadZipFile:
+        return  # not an archive: ``read_docx`` returns no text for it
+    if expanded > max_expanded_bytes:
+        raise DocumentExpandsTooFar(expanded, max_expanded_bytes)
+
+
+@dataclass(frozen=True)
+class ExtractedDocument:
+    text: str
+    pages: Optional[int] = None        # pages extracted (PDF only)
+    total_pages: Optional[int] = None  # pages in the document (PDF only)
+
+    @property
+    def truncated(self) -> bool:
+        return self.pages is not None and self.total_pages is not None and self.pages < self.total_pages
+
 
+def _page_limit(total_pages: int, max_pages: Optional[int], strict: bool) -> int:
+    if max_pages is None or total_pages <= max_pages:
+        return total_pages
+    if strict:
+        raise DocumentTooLarge(total_pages, max_pages)
+    return max_pages
 
-def read_pdf(file_bytes: bytes, max_pages: Optional[int] = None) -> str:
+
+def _read_pdf(file_bytes: Buffer, max_pages: Optional[int] = None, strict: bool = False) -> Tuple[str, int, int]:
+    """Text of the first ``max_pages`` pages, the number of pages read and the page count."""
     if not file_bytes:
-        return ""
+        return "", 0, 0
+
+    from PyPDF2 import PdfReader
 
     pages: List[str] = []
 
     try:
-        reader = PdfReader(io.BytesIO(file_bytes))
+        reader = PdfReader(_stream(file_bytes))
 
         total_pages = len(reader.pages)
-        limit = total_pages if max_pages is None else min(max_pages, total_pages)
+        limit = _page_limit(total_pages, max_pages, strict)
 
         for idx in range(limit):
             page = reader.pages[idx]
@@ -40,30 +143,45 @@ def read_pdf(file_bytes: bytes, max_pages: Optional[int] = None) -> str:
             if text:
                 pages.append(text)
 
+    except DocumentTooLarge:
+        raise
+
     except Exception:
         # If PyPDF2 fails completely, fall back to PyMuPDF
+        import fitz
+
+        pages = []
         try:
-            with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            # A memoryview is opened by MuPDF in place; bytes(...) would copy the file.
+            with memoryview(file_bytes) as view, _FITZ_LOCK, fitz.open(stream=view, filetype="pdf") as doc:
                 total_pages = doc.page_count
-                limit = total_pages if max_pages is None else min(max_pages, total_pages)
+                limit = _page_limit(total_pages, max_pages, strict)
                 for i in range(limit):
                     page = doc.load_page(i)
                     text = page.get_text("text") or ""
                     text = text.strip()
                     if text:
                         pages.append(text)
+        except DocumentTooLarge:
+            raise
         except Exception:
-            return ""
+            return "", 0, 0
 
-    return "\n\n".join(pages)
+    return "\n\n".join(pages), limit, total_pages
 
-def read_docx(file_bytes: bytes) -> str:
+
+def read_pdf(file_bytes: Buffer, max_pages: Optional[int] = None) -> str:
+    return _read_pdf(file_bytes, max_pages)[0]
+
+def read_docx(file_bytes: Buffer) -> str:
     if not file_bytes:
         return ""
 
 
+    from docx import Document
+
     try:
-        doc = Document(io.BytesIO(file_bytes))
+        doc = Document(_stream(file_bytes))
     except Exception:
         return ""
 
@@ -91,37 +209,48 @@ def read_docx(file_bytes: bytes) -> str:
     return "\n\n".join(paragraphs)
 
 
-def read_text(file_bytes: bytes) -> str:
+def read_text(file_bytes: Buffer) -> str:
     if not file_bytes:
         return ""
 
     try:
-        return file_bytes.decode("utf-8")
+        return str(file_bytes, "utf-8")
     except UnicodeDecodeError:
         pass
 
     return _detect_text_encoding(file_bytes)
 
 
-def extract_texts(path: str) -> str:
+def extract_document(path: str, max_pages: Optional[int] = None, strict: bool = False,
+                     max_expanded_bytes: Optional[int] = None) -> ExtractedDocument:
+    """
+    Extract the text of ``path``. PDFs are read up to ``max_pages`` pages; with
+    ``strict`` a longer PDF raises ``DocumentTooLarge`` before any text is extracted,
+    otherwise the result records how many of its pages were read. A DOCX that would
+    decompress to more than ``max_expanded_bytes`` raises ``DocumentExpandsTooFar``
+    before it is parsed. The file is memory-mapped rather than read into memory.
+    """
     if not path:
         raise ValueError("Path must be a non-empty string.")
 
     ext = path.lower().strip()
+    if not ext.endswith((".pdf", ".txt", ".docx")):
+        raise ValueError(f"File type not supported for path: {path!r}")
 
-    with open(path, "rb") as f:
-        data = f.read()
+    with _mapped(path) as data:
+        if ext.endswith(".pdf"):
+            text, pages, total_pages = _read_pdf(data, max_pages, strict)
+            return ExtractedDocument(text, pages, total_pages)
 
-    if ext.endswith(".pdf"):
-        return read_pdf(data)
+        if ext.endswith(".txt"):
+            return ExtractedDocument(read_text(data))
 
-    if ext.endswith(".txt"):
-        return read_text(data)
-    
-    if ext.endswith(".docx"):
-        return read_docx(data)
+        _check_expanded_size(data, max_expanded_bytes)
+        return ExtractedDocument(read_docx(data))
 
-    raise ValueError(f"File type not supported for path: {path!r}")
+
+def extract_texts(path: str) -> str:
+    return extract_document(path).text
 
 class HighlightSeverity(int, Enum):
     METRIC_MISSING = 1   # cyan
@@ -193,6 +322,7 @@ def highlight_pdf(
     output_path: str,
     weak_phrases: Sequence[Dict[str, Any]],
     bullets: Sequence[str],
+    max_pages: Optional[int] = None,
 ) -> str:
     if not input_path.lower().endswith(".pdf"):
         raise ValueError(f"highlight_pdf only supports PDF files, got: {input_path!r}")
@@ -202,32 +332,37 @@ def highlight_pdf(
     if not rules:
         return input_path
 
-    doc = fitz.open(input_path)
+    import fitz
 
-    try:
-        for page in doc:
-            for rule in rules:
-                phrase = rule.phrase
-                if not phrase:
-                    continue
-
-                rects = page.search_for(
-                    phrase,
-                    flags=fitz.TEXT_DEHYPHENATE,
-                )
-
-                if not rects:
-                    continue
-
-                color = COLOR_MAP.get(rule.severity, (1.0, 0.0, 0.0))  
-
-                for rect in rects:
-                    highlight = page.add_highlight_annot(rect)
-                    highlight.set_colors({"stroke": color})
-                    highlight.update()
-
-        doc.save(output_path, incremental=False)
-    finally:
-        doc.close()
+    with _FITZ_LOCK:
+        doc = fitz.open(input_path)
+
+        try:
+            limit = doc.page_count if max_pages is None else min(max_pages, doc.page_count)
+            for page_no in range(limit):
+                page = doc.load_page(page_no)
+                for rule in rules:
+                    phrase = rule.phrase
+                    if not phrase:
+                        continue
+
+                    rects = page.search_for(
+                        phrase,
+                        flags=fitz.TEXT_DEHYPHENATE,
+                    )
+
+                    if not rects:
+                        continue
+
+                    color = COLOR_MAP.get(rule.severity, (1.0, 0.0, 0.0))  
+
+                    for rect in rects:
+                        highlight = page.add_highlight_annot(rect)
+                        highlight.set_colors({"stroke": color})
+                        highlight.update()
+
+            doc.save(output_path, incremental=False)
+        finally:
+            doc.close()
 
     return output_path
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from aquilify.settings import settings
+
+from .exceptions import ApiResponseError
+from .metrics import ADMISSION_BYTES, ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_QUEUED, ADMISSION_REJECTED
+
+
+class Admitted:
+    """
+    A request let in by ``AdmissionController.reserve``. It waits in the queue until
+    ``acquire`` gets it a slot, and holds its bytes until ``release``, which may be
+    called any number of times and from whichever step finishes the request last.
+    ``async with`` does both.
+    """
+
+    __slots__ = ("_controller", "nbytes", "_state")
+
+    def __init__(self, controller: "AdmissionController", nbytes: int):
+        self._controller = controller
+        self.nbytes = nbytes
+        self._state = "queued"
+
+    async def acquire(self) -> None:
+        controller = self._controller
+        if self._state != "queued":
+            return
+        if controller._slots is not None:
+            try:
+                await controller._slots.acquire()
+            except BaseException:
+                self.release()
+                raise
+        controller.queued -= 1
+        controller.in_flight += 1
+        self._state = "running"
+        controller._publish()
+
+    def release(self) -> None:
+        controller = self._controller
+        if self._state == "queued":
+            controller.queued -= 1
+        elif self._state == "running":
+            controller.in_flight -= 1
+            if controller._slots is not None:
+                controller._slots.release()
+        else:
+            return
+        controller.bytes_in_flight -= self.nbytes
+        self._state = "released"
+        controller._publish()
+
+    async def __aenter__(self) -> "Admitted":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """
+    Bounds the analyses one process takes on: at most ``max_in_flight`` run at once,
+    at most ``max_queued`` wait for a slot, and the request bodies admitted together
+    stay under ``max_bytes``. A request over any limit is refused with a 429 straight
+    away instead of waiting on the event loop. A limit of 0 disables it.
+
+    The counters are only touched from the event loop, so they need no lock.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_queued: int = 32, max_bytes: int = 0, retry_after: int = 1):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_bytes = max_bytes
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+        self.queued = 0
+        self.bytes_in_flight = 0
+        self._apply_limits()
+
+    def _apply_limits(self) -> None:
+        self._slots = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight else None
+        ADMISSION_LIMIT.set(self.max_in_flight, "in_flight")
+        ADMISSION_LIMIT.set(self.max_queued, "queued")
+        ADMISSION_LIMIT.set(self.max_bytes, "bytes")
+        self._publish()
+
+    def split(self, workers: int) -> None:
+        """
+        Share the limits between ``workers`` processes that each run a controller, so
+        together they admit what one would (each limit rounded up). Called by
+        ``serve.py`` before it forks, while nothing is admitted.
+        """
+        workers = max(1, int(workers))
+        self.max_in_flight = math.ceil(self.max_in_flight / workers)
+        self.max_queued = math.ceil(self.max_queued / workers)
+        self.max_bytes = math.ceil(self.max_bytes / workers)
+        self._apply_limits()
+
+    def _publish(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        ADMISSION_QUEUED.set(self.queued)
+        ADMISSION_BYTES.set(self.bytes_in_flight)
+
+    def _reject(self, reason: str) -> None:
+        ADMISSION_REJECTED.inc(1, reason)
+        raise ApiResponseError(
+            details="Server is busy, retry later",
+            status=429,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def reserve(self, nbytes: int = 0) -> Admitted:
+        """
+        Lets a request in or refuses it with a 429, without waiting. Until it is
+        acquired, the returned ``Admitted`` counts as queued.
+        """
+        # A lone request larger than the byte budget is still let through; capping
+        # the size of a single upload is not this controller's job.
+        if self.max_bytes and self.bytes_in_flight and self.bytes_in_flight + nbytes > self.max_bytes:
+            self._reject("bytes")
+        if self.max_queued and self._slots is not None and self._slots.locked() \
+                and self.queued >= self.max_queued:
+            self._reject("queue")
+
+        self.bytes_in_flight += nbytes
+        self.queued += 1
+        self._publish()
+        return Admitted(self, nbytes)
+
+    @asynccontextmanager
+    async def admit(self, nbytes: int = 0) -> AsyncIterator[Admitted]:
+        async with self.reserve(nbytes) as admitted:
+            yield admitted
+
+
+admission = AdmissionController(
+    int(getattr(settings, "ADMISSION_MAX_IN_FLIGHT", 8) or 0),
+    int(getattr(settings, "ADMISSION_MAX_QUEUED", 32) or 0),
+    int(getattr(settings, "ADMISSION_MAX_BYTES", 0) or 0),
+    int(getattr(settings, "ADMISSION_RETRY_AFTER", 1)),
+)
@@ -1,122 +1,596 @@
 from aquilify.wrappers import Request, Response
-from aquilify.shortcuts import render
 from aquilify.responses import JsonResponse
 
-from .db import collection
+from .admission import admission
+from .duplicates import near_duplicates
+from .history import history
 from .exceptions import ApiResponseError
+from .jdstore import jd_store
+from .metrics import record_analysis, server_timing_enabled
+from .profiling import profiled, profiling_requested
+from .projection import FieldSelection, keyword_matching_from_form
+from .resumeindex import resume_index
+from .progress import format_event, progress
+from .revisions import revisions
+from .roles import jd_matrices
+from .serialization import FastJsonResponse, dumps
+from .sharedcache import shared_cache
+from .singleflight import flight_key, flights
+from .streaming import StreamingResponse
 
-from analyzer.utils import extract_texts, highlight_pdf
-from analyzer.helpers import clean_text, extract_bullets, weak_phrases
-from analyzer.compute import compute_ats_scores
+from analyzer.utils import DocumentTooLarge, ExtractedDocument, extract_document, highlight_pdf
+from analyzer.helpers import clean_text, extract_bullet_spans
+from analyzer.semantic import project
+from analyzer.compute import compute_ats_scores, rank_job_descriptions
 from analyzer.suggestions import generate_suggestions
 from analyzer.docx_highlighter import highlight_docx
+from analyzer.incremental import AnalysisMemo
+from analyzer.sections import build_section_index
+from analyzer.timing import CpuBudgetExceeded, StageTimer, timed
 
+from aquilify.settings import settings
+
+import asyncio
+import functools
+import hashlib
+import json
 import pathlib
 import uuid
 import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Room left in a request body next to the resume file for the JD text and other
+# form fields when rejecting oversized uploads by Content-Length.
+FORM_FIELDS_ALLOWANCE = 1024 * 1024
+# ... and, on /analyze/roles, for each of the job descriptions sent with it.
+JD_FIELD_ALLOWANCE = 16 * 1024
 
-from pprint import pprint
+# Analyses started by /analyze/start, until they finish. The event loop only holds weak
+# references to tasks, and a channel evicted from ``progress`` drops its own.
+_jobs = set()
 
 
 class ApiResponsev1:
     def __init__(self):
         self.output_path: pathlib.Path = pathlib.Path("tmp")
         self.UPLOAD_DIR = "tmp"
+        self.executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "ANALYSIS_WORKERS", None),
+            thread_name_prefix="analysis",
+        )
+        self.max_upload_bytes = int(getattr(settings, "UPLOAD_MAX_BYTES", 0) or 0)
+        self.max_pages = int(getattr(settings, "EXTRACT_MAX_PAGES", 0) or 0) or None
+        self.max_expanded_bytes = int(getattr(settings, "EXTRACT_MAX_EXPANDED_BYTES", 0) or 0) or None
+        self.max_chars = int(getattr(settings, "ANALYSIS_MAX_CHARS", 0) or 0)
+        self.cpu_budget = float(getattr(settings, "ANALYSIS_CPU_BUDGET", 0) or 0) or None
+        self.reject_oversize = str(getattr(settings, "OVERSIZE_MODE", "truncate")).lower() == "reject"
+        self.reuse_duplicates = str(getattr(settings, "NEAR_DUPLICATE_MODE", "reuse")).lower() == "reuse"
 
-    async def _process_file(self, file):
+    async def _process_file(self, file, digest=None):
+        """Save an upload under ``tmp``, feeding its bytes to ``digest`` (a hashlib object) if given."""
         file_id = str(uuid.uuid4())
         ext = os.path.splitext(file.filename)[1]
         save_name = file_id + ext
         save_path = os.path.join(self.UPLOAD_DIR, save_name)
 
+        written = 0
         with open(save_path, "wb") as buffer:
             while chunk := await file.read(1024 * 1024):
+                written += len(chunk)
+                if self.max_upload_bytes and written > self.max_upload_bytes:
+                    break
                 buffer.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+
+        if self.max_upload_bytes and written > self.max_upload_bytes:
+            os.remove(save_path)
+            raise ApiResponseError(
+                details=f"Upload exceeds the {self.max_upload_bytes} byte limit",
+                status=413
+            )
 
         return file_id, save_path, save_name
 
-    def _build_result(self, resume_text: str, jd_text: str, file_path: str = None, file_name: str = None):
-        resume_text_clean = clean_text(resume_text)
-        bullets = extract_bullets(resume_text_clean)
-        weak_phrase = weak_phrases(resume_text_clean)
+    def _check_content_length(self, request: Request, documents: int = 1, extra: int = 0) -> int:
+        """
+        The request's Content-Length, refused with a 413 before the body is read when it
+        cannot be ``documents`` uploads of at most ``UPLOAD_MAX_BYTES`` plus form fields
+        (``extra`` more bytes of them). ``_process_file`` still checks every file.
+        """
+        try:
+            content_length = max(int(request.headers.get("content-length") or 0), 0)
+        except ValueError:
+            content_length = 0
+
+        limit = self.max_upload_bytes * documents + FORM_FIELDS_ALLOWANCE + extra
+        if self.max_upload_bytes and content_length > limit:
+            raise ApiResponseError(
+                details=f"Upload exceeds the {self.max_upload_bytes} byte limit",
+                status=413
+            )
+        return content_length
+
+    def _extract(self, file_path: str):
+        """
+        ``extract_document`` behind the cross-worker cache, keyed by the file's
+        content, so a document any worker has already read is not parsed again.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        key = f"{digest.hexdigest()}{pathlib.Path(file_path).suffix.lower()}:{self.max_pages}"
+
+        try:
+            cached = shared_cache.get("extract", key)
+            if cached is not None:
+                document = ExtractedDocument(**json.loads(cached))
+                if self.reject_oversize and document.truncated:
+                    raise DocumentTooLarge(document.total_pages, self.max_pages)
+                return document
+
+            document = extract_document(
+                file_path, max_pages=self.max_pages, strict=self.reject_oversize,
+                max_expanded_bytes=self.max_expanded_bytes,
+            )
+        except DocumentTooLarge as e:
+            raise ApiResponseError(details=str(e), status=413)
+
+        shared_cache.set("extract", key, dumps({
+            "text": document.text, "pages": document.pages, "total_pages": document.total_pages,
+        }))
+        return document
+
+    def _truncate(self, resume_text: str, document=None):
+        """
+        ``resume_text`` cut to ``ANALYSIS_MAX_CHARS``, and what to report as ``truncated``
+        for it and the PDF ``document`` it came from (empty if nothing was cut).
+        """
+        truncated = {}
+        if document is not None and document.truncated:
+            truncated.update(pages=document.pages, total_pages=document.total_pages)
+        if self.max_chars and len(resume_text) > self.max_chars:
+            if self.reject_oversize:
+                raise ApiResponseError(
+                    details=f"Resume has {len(resume_text)} characters; at most {self.max_chars} are accepted",
+                    status=413
+                )
+            truncated.update(characters=self.max_chars, total_characters=len(resume_text))
+            resume_text = resume_text[:self.max_chars]
+        return resume_text, truncated
+
+    def _build_result(self, resume_text: str, jd_text: str, file_path: str = None, file_name: str = None,
+                      timer: StageTimer = None, previous_id: str = None, highlight_sections=None,
+                      analysis_id: str = None, on_progress=None, selection: FieldSelection = None,
+                      jd_matrix=None, required_skills=None, seed: AnalysisMemo = None):
+        selection = selection or FieldSelection()
+        # ``seed`` (a near-duplicate's memo) is reused like a previous revision, but
+        # only a requested ``previous_id`` is reported in the response.
+        previous = revisions.get(previous_id) if previous_id else seed
+        memo = AnalysisMemo(previous)
+        wants_highlight = selection.wants("file_out")
+
+        with timed(timer, "clean"):
+            # Same offsets as the cleaned text, but headings still start their own lines.
+            resume_text_lines = clean_text(resume_text, keep_lines=True)
+            resume_text_clean = resume_text_lines.replace("\n", " ")
+            bullet_spans = []
+            if selection.wants("bullets") or wants_highlight:
+                bullet_spans = extract_bullet_spans(resume_text_clean)
+            bullets = [item for _, _, item in bullet_spans]
+        with timed(timer, "sections"):
+            sections = build_section_index(resume_text_lines)
+        weak_phrase = []
+        if selection.needs_weak_phrases:
+            with timed(timer, "weak_phrases"):
+                weak_phrase = memo.weak_phrases(resume_text_clean, sections, snippets=not selection.compact)
 
         compute = compute_ats_scores(
             resume_text=resume_text_clean,
-            jd_text=jd_text or ""
+            jd_text=jd_text or "",
+            timer=timer,
+            memo=memo,
+            sections=sections,
+            fields=selection.score_fields(),
+            jd_matrix=jd_matrix,
+            required_skills=required_skills,
+            analysis_level=selection.level,
+            keyword_matching=selection.matching,
         )
+        if on_progress:
+            on_progress("scored", {"compute": selection.project_scores(compute)})
 
-        classified = generate_suggestions(
-            analysis=compute,
-            weak_phrases=weak_phrase,
-            has_jd=True if jd_text else False,
-        )
+        classified = None
+        if selection.wants("suggestions"):
+            with timed(timer, "classification"):
+                classified = generate_suggestions(
+                    analysis=compute,
+                    weak_phrases=weak_phrase,
+                    has_jd=True if jd_text else False,
+                    include_scores=not selection.compact,
+                )
+            if on_progress:
+                on_progress("classified", {"suggestions": classified, "weak_phrases": weak_phrase})
 
         file_out = None
-        if file_path and file_name and file_name.lower().endswith(".pdf"):
+        if wants_highlight and file_path and file_name and file_name.lower().endswith(".pdf"):
             ext = pathlib.Path(file_name).suffix  # ".pdf"
             file_out = f"{pathlib.Path(file_name).stem}_highlighted{ext}"
 
-            if ext == ".pdf":
-                highlight_pdf(
-                    input_path=file_path,
-                    output_path=os.path.join(self.UPLOAD_DIR, file_out),
-                    weak_phrases=weak_phrase,
-                    bullets=bullets
-                )
-            elif ext == ".docx":
-                highlight_docx(
-                    input_path=file_path,
-                    output_path=os.path.join(self.UPLOAD_DIR, file_out),
-                    weak_phrases=weak_phrase,
-                    bullets=bullets
-                )
+            highlight_phrases, highlight_bullets = weak_phrase, bullets
+            if highlight_sections:
+                highlight_phrases = sections.filter_offsets(weak_phrase, highlight_sections)
+                highlight_bullets = [
+                    item for start, _, item in bullet_spans
+                    if sections.section_at(start) in highlight_sections
+                ]
 
-        return {
-            "compute": compute,
+            with timed(timer, "highlight"):
+                if ext == ".pdf":
+                    highlight_pdf(
+                        input_path=file_path,
+                        output_path=os.path.join(self.UPLOAD_DIR, file_out),
+                        weak_phrases=highlight_phrases,
+                        bullets=highlight_bullets,
+                        max_pages=self.max_pages,
+                    )
+                elif ext == ".docx":
+                    highlight_docx(
+                        input_path=file_path,
+                        output_path=os.path.join(self.UPLOAD_DIR, file_out),
+                        weak_phrases=highlight_phrases,
+                        bullets=highlight_bullets
+                    )
+            if on_progress:
+                on_progress("highlighted", {"file_out": file_out})
+
+        analysis_id = analysis_id or uuid.uuid4().hex
+        if selection.wants("analysis_id"):
+            revisions.put(analysis_id, memo)
+
+        output = {
+            "analysis_id": analysis_id,
+            "compute": selection.project_scores(compute),
             "suggestions": classified,
             "weak_phrases": weak_phrase,
             "bullets": bullets,
+            "sections": sections.to_list(),
             "file_out": file_out,
         }
 
-    async def analyse(self, request: Request) -> Response:
+        if previous_id:
+            output["revision"] = {
+                "previous_analysis_id": previous_id,
+                "previous_found": previous is not None,
+                **memo.stats(),
+            }
+
+        return selection.project(output)
+
+    def _resolve_jd(self, form):
+        """
+        The JD text for a request plus the ``_build_result`` options derived from it:
+        a stored ``jd_id`` brings its prebuilt term vector and required skills, and an
+        explicit ``required_skills`` list overrides the latter.
+        """
+        required_skills = [
+            s.strip() for s in (form.get("required_skills") or "").split(",") if s.strip()
+        ] or None
+
+        jd_id = form.get("jd_id") or None
+        if jd_id:
+            jd = jd_store.get(jd_id)
+            if jd is None:
+                raise ApiResponseError(details="Unknown jd_id", status=404)
+            return jd.text, {"jd_matrix": jd.matrix, "required_skills": required_skills or jd.required_skills}
+
+        return form.get("jd_text") or "", {"required_skills": required_skills}
+
+    def _analyse_document(self, jd_text: str, resume_text: str = "", file_path: str = None,
+                          file_name: str = None, timer: StageTimer = None, on_progress=None,
+                          resume_sha256: str = None, user_id: str = None, **options):
+        if timer is not None:
+            timer.limit_cpu(self.cpu_budget)
+
         try:
-            if request.method != "POST":
-                raise ApiResponseError(details="Method Not Allowed", status=404)
+            document = None
+            if file_path:
+                with timed(timer, "extract"):
+                    document = self._extract(file_path)
+                resume_text = document.text
+            resume_text, truncated = self._truncate(resume_text, document)
+            if on_progress:
+                on_progress("extracted", {"characters": len(resume_text)})
+
+            # Every endpoint stores its analyses, and stored analyses become searchable
+            # through ``/candidates`` and as near duplicates. Rows refer to the analysis,
+            # so one whose id is left out of the response is not stored.
+            selection = options.get("selection") or FieldSelection()
+            analysis_id = options.pop("analysis_id", None) or uuid.uuid4().hex
+            stored = bool(resume_sha256 and history.enabled and selection.wants("analysis_id"))
+
+            # A resubmission with a typo fixed, or a copy from a template mill, is
+            # re-analysed incrementally from the memo of the same user's stored
+            # duplicate and flagged in the response. The signature goes in before the
+            # analysis runs, so documents of the same batch analysed alongside this
+            # one are compared with it too.
+            with timed(timer, "near_duplicates"):
+                signature = near_duplicates.signature(clean_text(resume_text))
+                duplicate = near_duplicates.find(signature, user_id)
+                if stored:
+                    near_duplicates.add(analysis_id, signature, user_id)
+            seed = None
+            if duplicate and self.reuse_duplicates and not options.get("previous_id"):
+                seed = revisions.get(duplicate.analysis_id)
+
+            output = self._build_result(
+                resume_text=resume_text,
+                jd_text=jd_text,
+                file_path=file_path,
+                file_name=file_name,
+                timer=timer,
+                on_progress=on_progress,
+                analysis_id=analysis_id,
+                seed=seed,
+                **options,
+            )
+        except CpuBudgetExceeded as e:
+            raise ApiResponseError(details=str(e), status=422)
+
+        if stored:
+            with timed(timer, "index"):
+                resume_index.add(resume_sha256, analysis_id, clean_text(resume_text), user_id)
+
+        if duplicate and selection.wants("near_duplicate"):
+            output["near_duplicate"] = duplicate.to_dict(seed is not None)
+        if truncated and selection.wants("truncated"):
+            output["truncated"] = truncated
+
+        if stored:
+            history.record({
+                "analysis_id": analysis_id,
+                "resume_sha256": resume_sha256,
+                "user_id": user_id,
+                "doc_format": pathlib.Path(file_name).suffix.lstrip(".").lower() if file_path else "text",
+                "final_score": output.get("compute", {}).get("final_score"),
+                "created": time.time(),
+                "result": output,
+            })
+        return output
+
+    async def _analyse_item(self, endpoint: str, item, jd_text: str, resume_sha256: str = None,
+                            **options) -> dict:
+        """
+        Analyse one document on the executor. ``item`` is resume text, an upload, or an
+        already saved ``(file_path, file_name)`` pair whose ``resume_sha256`` is given.
+        """
+        timer = StageTimer()
+        status = 500
+        doc_format, doc_bytes, doc_words = None, 0, 0
+        loop = asyncio.get_running_loop()
+
+        try:
+            if isinstance(item, str):
+                doc_format = "text"
+                doc_bytes = len(item.encode("utf-8"))
+                resume_sha256 = resume_sha256 or hashlib.sha256(item.encode("utf-8")).hexdigest()
+                task = functools.partial(
+                    self._analyse_document, jd_text, resume_text=item, timer=timer,
+                    resume_sha256=resume_sha256, **options
+                )
+            else:
+                if isinstance(item, tuple):
+                    file_path, file_name = item
+                else:
+                    resume_digest = hashlib.sha256()
+                    with timed(timer, "upload"):
+                        file_id, file_path, file_name = await self._process_file(item, digest=resume_digest)
+                    resume_sha256 = resume_digest.hexdigest()
+                doc_format = pathlib.Path(file_name).suffix.lstrip(".").lower()
+                doc_bytes = os.path.getsize(file_path)
+                task = functools.partial(
+                    self._analyse_document, jd_text, file_path=file_path, file_name=file_name,
+                    timer=timer, resume_sha256=resume_sha256, **options
+                )
+
+            output = await loop.run_in_executor(self.executor, task)
+            status = 200
+            doc_words = output.get("compute", {}).get("word_count", 0)
+            return {"status": 200, "result": output}
+
+        except ApiResponseError as e:
+            status = e.status
+            return {"status": e.status, "error": e.details}
+
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return {"status": 500, "error": "Internal Server Error"}
+
+        finally:
+            record_analysis(
+                endpoint, status, timer.total, timer.stages,
+                doc_format=doc_format, doc_bytes=doc_bytes, doc_words=doc_words,
+            )
+
+    async def _analyse_batch_entry(self, index: int, item, jd_text: str, **options) -> dict:
+        return {"index": index, **await self._analyse_item("analyze_batch", item, jd_text, **options)}
 
+    async def _iter_batch(self, items: list, jd_text: str, **options):
+        """
+        Yields one record per item in completion order, with at most
+        ``BATCH_CONCURRENCY`` documents in flight at any time.
+        """
+        limit = max(1, int(getattr(settings, "BATCH_CONCURRENCY", 4)))
+        pending = set()
+        queue = iter(enumerate(items))
+
+        try:
+            while True:
+                for index, item in queue:
+                    pending.add(asyncio.ensure_future(self._analyse_batch_entry(index, item, jd_text, **options)))
+                    if len(pending) >= limit:
+                        break
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _stream_batch(self, items: list, jd_text: str, **options):
+        async for record in self._iter_batch(items, jd_text, **options):
+            yield dumps(record) + b"\n"
+
+    def _wants_stream(self, request: Request, form) -> bool:
+        if (form.get("stream") or "").strip().lower() in ("1", "true", "yes"):
+            return True
+        return "application/x-ndjson" in request.headers.get("accept", "")
+
+    async def analyse_batch(self, request: Request) -> Response:
+        # Held for the whole batch, until the last record is sent when streaming.
+        admitted = None
+        try:
+            max_documents = getattr(settings, "BATCH_MAX_DOCUMENTS", 50)
+            content_length = self._check_content_length(request, documents=max_documents)
+            # The whole multipart body is parsed (files over 1 MiB spooled to temporary
+            # files) before the first document is scheduled, so it is capped up front.
+            max_bytes = int(getattr(settings, "BATCH_MAX_BYTES", 0) or 0)
+            if max_bytes and not content_length:
+                raise ApiResponseError(details="Content-Length required", status=411)
+            if max_bytes and content_length > max_bytes:
+                raise ApiResponseError(
+                    details=f"A batch request may be at most {max_bytes} bytes",
+                    status=413,
+                )
+            admitted = admission.reserve(content_length)
+            await admitted.acquire()
             form = await request.form()
 
-            resume_text = form.get("resume_text") or ""
-            jd_text = form.get("jd_text") or ""
-            file = form.get("resume_file")
+            jd_text, jd_options = self._resolve_jd(form)
+            items = [
+                value for key, value in form.multi_items()
+                if (key == "resume_text" and isinstance(value, str) and value.strip())
+                or (key == "resume_file" and getattr(value, "filename", None))
+            ]
 
-            if file and hasattr(file, "filename") and file.filename:
-                file_id, file_path, file_name = await self._process_file(file)
-                extracted_text = extract_texts(file_path)
-                resume_text = extracted_text
-
-                output = self._build_result(
-                    resume_text=resume_text,
-                    jd_text=jd_text,
-                    file_path=file_path,
-                    file_name=file_name
+            if not items:
+                raise ApiResponseError(details="No resume text or file provided", status=400)
+
+            if len(items) > max_documents:
+                raise ApiResponseError(
+                    details=f"A batch may contain at most {max_documents} documents",
+                    status=413,
                 )
 
-            elif resume_text.strip():
-                output = self._build_result(
-                    resume_text=resume_text,
-                    jd_text=jd_text,
-                    file_path=None,
-                    file_name=None
+            selection = FieldSelection.from_form(form)
+            user_id = form.get("user_id") or None
+
+            if self._wants_stream(request, form):
+                response = StreamingResponse(
+                    self._stream_batch(items, jd_text, selection=selection, user_id=user_id, **jd_options),
+                    on_close=admitted.release,
+                )
+                admitted = None
+                return response
+
+            results = [
+                record async for record in self._iter_batch(
+                    items, jd_text, selection=selection, user_id=user_id, **jd_options
                 )
+            ]
+            results.sort(key=lambda record: record["index"])
+            return FastJsonResponse(content={"results": results}, status=200)
 
+        except ApiResponseError as e:
+            return JsonResponse(
+                content={"error": e.details},
+                status=e.status,
+                headers=e.headers
+            )
+
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse(
+                content={"error": "Internal Server Error"},
+                status=500
+            )
+
+        finally:
+            if admitted is not None:
+                admitted.release()
+
+    async def _run_job(self, channel, admitted, analysis_id: str, item, jd_text: str, **options) -> None:
+        async with admitted:
+            record = await self._analyse_item(
+                "analyze_async", item, jd_text,
+                analysis_id=analysis_id, on_progress=channel.publish_threadsafe, **options,
+            )
+        if "result" in record:
+            channel.publish("complete", record["result"], final=True)
+        else:
+            channel.publish("error", record, final=True)
+
+    async def analyse_start(self, request: Request) -> Response:
+        # Refused here when the worker is busy; otherwise the job waits for its slot.
+        admitted = None
+        try:
+            content_length = self._check_content_length(request)
+            admitted = admission.reserve(content_length)
+            form = await request.form()
+
+            resume_text = form.get("resume_text") or ""
+            jd_text, jd_options = self._resolve_jd(form)
+            file = form.get("resume_file")
+            previous_id = form.get("previous_analysis_id") or None
+            highlight_sections = [
+                s.strip().lower() for s in (form.get("highlight_sections") or "").split(",") if s.strip()
+            ]
+            selection = FieldSelection.from_form(form)
+
+            resume_sha256 = None
+            if file and hasattr(file, "filename") and file.filename:
+                resume_digest = hashlib.sha256()
+                file_id, file_path, file_name = await self._process_file(file, digest=resume_digest)
+                item = (file_path, file_name)
+                resume_sha256 = resume_digest.hexdigest()
+            elif resume_text.strip():
+                item = resume_text
             else:
                 raise ApiResponseError(
                     details="No resume text or file provided",
                     status=400
                 )
 
-            return JsonResponse(content=output, status=200)
+            analysis_id = uuid.uuid4().hex
+            channel = progress.open(analysis_id, asyncio.get_running_loop())
+            channel.task = asyncio.ensure_future(self._run_job(
+                channel, admitted, analysis_id, item, jd_text,
+                previous_id=previous_id, highlight_sections=highlight_sections, selection=selection,
+                resume_sha256=resume_sha256, user_id=form.get("user_id") or None, **jd_options,
+            ))
+            _jobs.add(channel.task)
+            channel.task.add_done_callback(_jobs.discard)
+            # Also when the task is cancelled before it starts.
+            channel.task.add_done_callback(lambda task, admitted=admitted: admitted.release())
+            admitted = None
+
+            return JsonResponse(
+                content={
+                    "analysis_id": analysis_id,
+                    "events": f"/api/v1/analyze/events?analysis_id={analysis_id}",
+                },
+                status=202,
+            )
 
         except ApiResponseError as e:
             return JsonResponse(
@@ -125,6 +599,414 @@ class ApiResponsev1:
                 headers=e.headers
             )
 
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse(
+                content={"error": "Internal Server Error"},
+                status=500
+            )
+
+        finally:
+            if admitted is not None:
+                admitted.release()
+
+    async def _stream_events(self, channel, after: int):
+        async for index, event, data in channel.subscribe(after):
+            yield format_event(index, event, data)
+
+    async def analyse_events(self, request: Request) -> Response:
+        channel = progress.get(request.args.get("analysis_id"))
+        if channel is None:
+            return JsonResponse(content={"error": "Unknown analysis id"}, status=404)
+
+        try:
+            after = int(request.headers.get("last-event-id", "-1"))
+        except ValueError:
+            after = -1
+
+        return StreamingResponse(
+            self._stream_events(channel, after),
+            content_type="text/event-stream",
+            headers={"X-Accel-Buffering": "no"},
+        )
+
+    def _rank_roles(self, jds: list, resume_text: str = "", file_path: str = None, timer: StageTimer = None,
+                    keyword_matching: str = "lexical"):
+        if timer is not None:
+            timer.limit_cpu(self.cpu_budget)
+
+        try:
+            document = None
+            if file_path:
+                with timed(timer, "extract"):
+                    document = self._extract(file_path)
+                resume_text = document.text
+            resume_text, truncated = self._truncate(resume_text, document)
+            with timed(timer, "jd_matrix"):
+                matrix = jd_matrices.get(jds)
+            output = rank_job_descriptions(resume_text, matrix, timer=timer, keyword_matching=keyword_matching)
+        except CpuBudgetExceeded as e:
+            raise ApiResponseError(details=str(e), status=422)
+
+        if truncated:
+            output["truncated"] = truncated
+        return output
+
+    async def analyse_roles(self, request: Request) -> Response:
+        timer = StageTimer()
+        status = 500
+        doc_format, doc_bytes, doc_words = None, 0, 0
+
+        try:
+            max_jds = getattr(settings, "ROLE_MATCH_MAX_JDS", 2000)
+            content_length = self._check_content_length(request, extra=max_jds * JD_FIELD_ALLOWANCE)
+            async with admission.admit(content_length):
+                form = await request.form()
+
+                resume_text = form.get("resume_text") or ""
+                file = form.get("resume_file")
+                jds = [jd if isinstance(jd, str) else "" for jd in form.getlist("jd_text")]
+                titles = form.getlist("jd_title")
+
+                if not any(jd.strip() for jd in jds):
+                    raise ApiResponseError(details="No job descriptions provided", status=400)
+
+                if len(jds) > max_jds:
+                    raise ApiResponseError(
+                        details=f"At most {max_jds} job descriptions can be matched at once",
+                        status=413,
+                    )
+
+                try:
+                    top = int(form.get("top") or 0)
+                except ValueError:
+                    raise ApiResponseError(details="top must be an integer", status=400)
+                keyword_matching = keyword_matching_from_form(form)
+
+                if file and hasattr(file, "filename") and file.filename:
+                    with timed(timer, "upload"):
+                        file_id, file_path, file_name = await self._process_file(file)
+                    doc_format = pathlib.Path(file_name).suffix.lstrip(".").lower()
+                    doc_bytes = os.path.getsize(file_path)
+                    task = functools.partial(
+                        self._rank_roles, jds, file_path=file_path, timer=timer, keyword_matching=keyword_matching
+                    )
+                elif resume_text.strip():
+                    doc_format = "text"
+                    doc_bytes = len(resume_text.encode("utf-8"))
+                    task = functools.partial(
+                        self._rank_roles, jds, resume_text=resume_text, timer=timer, keyword_matching=keyword_matching
+                    )
+                else:
+                    raise ApiResponseError(
+                        details="No resume text or file provided",
+                        status=400
+                    )
+
+                output = await asyncio.get_running_loop().run_in_executor(self.executor, task)
+
+            roles = output["roles"][:top] if top > 0 else output["roles"]
+            for role in roles:
+                if role["index"] < len(titles):
+                    role["title"] = titles[role["index"]]
+            output["roles"] = roles
+
+            status = 200
+            doc_words = output["word_count"]
+            return FastJsonResponse(content=output, status=200, headers=self._timing_headers(timer))
+
+        except ApiResponseError as e:
+            status = e.status
+            return JsonResponse(
+                content={"error": e.details},
+                status=e.status,
+                headers=e.headers
+            )
+
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse(
+                content={"error": "Internal Server Error"},
+                status=500
+            )
+
+        finally:
+            record_analysis(
+                "analyze_roles", status, timer.total, timer.stages,
+                doc_format=doc_format, doc_bytes=doc_bytes, doc_words=doc_words,
+            )
+
+    async def jds(self, request: Request) -> Response:
+        try:
+            if request.method == "GET":
+                jd = jd_store.get(request.args.get("jd_id"))
+                if jd is None:
+                    raise ApiResponseError(details="Unknown jd_id", status=404)
+                return JsonResponse(content=jd.to_dict(), status=200)
+
+            async with admission.admit(self._check_content_length(request)):
+                form = await request.form()
+                loop = asyncio.get_running_loop()
+                jd, created = await loop.run_in_executor(
+                    self.executor, jd_store.create, form.get("jd_text") or "", form.get("title") or ""
+                )
+            if jd is None:
+                raise ApiResponseError(details="No job description text provided", status=400)
+            return JsonResponse(content=jd.to_dict(), status=201 if created else 200)
+
+        except ApiResponseError as e:
+            return JsonResponse(
+                content={"error": e.details},
+                status=e.status,
+                headers=e.headers
+            )
+
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse(
+                content={"error": "Internal Server Error"},
+                status=500
+            )
+
+    def _search_candidates(self, jd_vector, k: int, exact: bool, user_id, timer: StageTimer) -> dict:
+        with timed(timer, "search"):
+            return resume_index.search(jd_vector, k, exact=exact, user_id=user_id)
+
+    async def candidates(self, request: Request) -> Response:
+        """
+        The resumes analysed for ``user_id`` (anonymous ones without it) closest to a
+        job description in the semantic space, best first. ``jd_text`` or ``jd_id``,
+        ``k`` (default 50) and ``exact=1`` to scan every stored resume instead of the
+        approximate index.
+        """
+        timer = StageTimer()
+        try:
+            if not resume_index.enabled:
+                raise ApiResponseError(details="The resume index is disabled", status=404)
+
+            async with admission.admit(self._check_content_length(request)):
+                params = await request.form() if request.method == "POST" else request.args
+                max_k = int(getattr(settings, "RESUME_INDEX_MAX_K", 500))
+                try:
+                    k = int(params.get("k") or 50)
+                except ValueError:
+                    raise ApiResponseError(details="k must be an integer", status=400)
+                if not 1 <= k <= max_k:
+                    raise ApiResponseError(details=f"k must be between 1 and {max_k}", status=400)
+                exact = (params.get("exact") or "").strip().lower() in ("1", "true", "yes")
+                user_id = params.get("user_id") or None
+
+                jd_id = params.get("jd_id") or None
+                if jd_id:
+                    jd = jd_store.get(jd_id)
+                    if jd is None:
+                        raise ApiResponseError(details="Unknown jd_id", status=404)
+                    jd_vector = jd.matrix.semantic_vectors()[0]
+                else:
+                    jd_text = clean_text(params.get("jd_text") or "")
+                    if not jd_text:
+                        raise ApiResponseError(details="No job description provided", status=400)
+                    jd_vector = project(jd_text)
+
+                loop = asyncio.get_running_loop()
+                content = await loop.run_in_executor(
+                    self.executor, self._search_candidates, jd_vector, k, exact, user_id, timer
+                )
+            return FastJsonResponse(content=content, status=200, headers=self._timing_headers(timer))
+
+        except ApiResponseError as e:
+            return JsonResponse(
+                content={"error": e.details},
+                status=e.status,
+                headers=e.headers
+            )
+
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse(
+                content={"error": "Internal Server Error"},
+                status=500
+            )
+
+    def _analyse_profiled(self, profile_enabled: bool, jd_text: str, resume_text: str = "",
+                          file_path: str = None, file_name: str = None, upload_name: str = None,
+                          timer: StageTimer = None, **options):
+        """
+        ``_analyse_document`` under ``profiled``. It runs on the executor thread so the
+        profiler sees the analysis; returns the output and the saved profile's path.
+        """
+        with profiled(profile_enabled) as profile:
+            if profile and file_path:
+                doc_format = pathlib.Path(file_name).suffix.lstrip(".").lower()
+                profile.hash_file(file_path, jd_text, format=doc_format, file_name=upload_name)
+            elif profile:
+                profile.hash_text(resume_text, jd_text, format="text")
+
+            output = self._analyse_document(
+                jd_text, resume_text=resume_text, file_path=file_path, file_name=file_name,
+                timer=timer, **options
+            )
+        return output, profile.path if profile else None
+
+    async def analyses(self, request: Request) -> Response:
+        """
+        Stored analyses of ``?user_id=`` (anonymous ones without it): ``?analysis_id=``
+        returns one result as it was sent, and ``?resume_sha256=`` or just the user id
+        page through summaries, newest first. ``user_id`` is taken on trust, so this is
+        for services that authenticate their users before calling it.
+        """
+        try:
+            user_id = request.args.get("user_id") or None
+            analysis_id = request.args.get("analysis_id")
+            if analysis_id:
+                document = await history.get(analysis_id, user_id)
+                if document is None:
+                    raise ApiResponseError(details="Unknown analysis_id", status=404)
+                return FastJsonResponse(content=document, status=200)
+
+            resume_sha256 = request.args.get("resume_sha256") or None
+            if not resume_sha256 and not user_id:
+                raise ApiResponseError(details="Provide analysis_id, resume_sha256 or user_id", status=400)
+
+            max_page_size = int(getattr(settings, "HISTORY_MAX_PAGE_SIZE", 100))
+            try:
+                page = max(int(request.args.get("page") or 1), 1)
+                per_page = min(max(int(request.args.get("per_page") or 20), 1), max_page_size)
+            except ValueError:
+                raise ApiResponseError(details="page and per_page must be integers", status=400)
+
+            content = await history.history(resume_sha256, user_id, page, per_page)
+            return FastJsonResponse(content=content, status=200)
+
+        except ApiResponseError as e:
+            return JsonResponse(
+                content={"error": e.details},
+                status=e.status,
+                headers=e.headers
+            )
+
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse(
+                content={"error": "Internal Server Error"},
+                status=500
+            )
+
+    def _timing_headers(self, timer: StageTimer) -> dict:
+        if not server_timing_enabled():
+            return {}
+        return {"Server-Timing": timer.server_timing()}
+
+    async def analyse(self, request: Request) -> Response:
+        timer = StageTimer()
+        status = 500
+        doc_format, doc_bytes, doc_words = None, 0, 0
+
+        try:
+            if request.method != "POST":
+                raise ApiResponseError(details="Method Not Allowed", status=404)
+
+            content_length = self._check_content_length(request)
+
+            async with admission.admit(content_length) as admitted:
+                form = await request.form()
+
+                resume_text = form.get("resume_text") or ""
+                jd_text, jd_options = self._resolve_jd(form)
+                file = form.get("resume_file")
+                previous_id = form.get("previous_analysis_id") or None
+                highlight_sections = [
+                    s.strip().lower() for s in (form.get("highlight_sections") or "").split(",") if s.strip()
+                ]
+                selection = FieldSelection.from_form(form)
+
+                if file and hasattr(file, "filename") and file.filename:
+                    resume_digest = hashlib.sha256()
+                    with timed(timer, "upload"):
+                        file_id, file_path, file_name = await self._process_file(file, digest=resume_digest)
+                    doc_format = pathlib.Path(file_name).suffix.lstrip(".").lower()
+                    doc_bytes = os.path.getsize(file_path)
+                    document = {"file_path": file_path, "file_name": file_name, "upload_name": file.filename}
+
+                elif resume_text.strip():
+                    doc_format = "text"
+                    doc_bytes = len(resume_text.encode("utf-8"))
+                    resume_digest = hashlib.sha256(resume_text.encode("utf-8"))
+                    document = {"resume_text": resume_text}
+
+                else:
+                    raise ApiResponseError(
+                        details="No resume text or file provided",
+                        status=400
+                    )
+
+                resume_sha256 = resume_digest.hexdigest()
+                user_id = form.get("user_id") or None
+                profile_enabled = profiling_requested(request)
+                task = functools.partial(
+                    self._analyse_profiled,
+                    profile_enabled,
+                    jd_text,
+                    timer=timer,
+                    previous_id=previous_id,
+                    highlight_sections=highlight_sections,
+                    selection=selection,
+                    resume_sha256=resume_sha256,
+                    user_id=user_id,
+                    **document,
+                    **jd_options,
+                )
+
+                # Identical requests in flight at the same time (typically client retries)
+                # wait for the first one's analysis instead of running their own.
+                key = flight_key(
+                    resume_sha256, doc_format, jd_text, jd_options.get("required_skills"), previous_id,
+                    highlight_sections, form.get("fields"), form.get("compact"), selection.level, selection.matching,
+                    profile_enabled,
+                    user_id,
+                )
+                def join():
+                    # This request's own analysis never runs: it waits for the first
+                    # request's without holding an admission slot, and its upload is
+                    # not needed.
+                    admitted.release()
+                    if "file_path" in document:
+                        try:
+                            os.remove(document["file_path"])
+                        except OSError:
+                            pass
+
+                loop = asyncio.get_running_loop()
+                waited = time.perf_counter()
+                (output, profile_path), shared = await flights.do(
+                    key, lambda: loop.run_in_executor(self.executor, task), on_join=join
+                )
+                if shared:
+                    timer.add("singleflight", time.perf_counter() - waited)
+
+            status = 200
+            doc_words = output.get("compute", {}).get("word_count", 0)
+            headers = self._timing_headers(timer)
+            headers["X-Resume-SHA256"] = resume_sha256
+            if profile_path:
+                headers["X-Profile-Id"] = os.path.basename(profile_path)
+            if shared:
+                headers["X-Singleflight"] = "shared"
+            return FastJsonResponse(content=output, status=200, headers=headers)
+
+        except ApiResponseError as e:
+            status = e.status
+            return JsonResponse(
+                content={"error": e.details},
+                status=e.status,
+                headers=e.headers
+            )
+
         except Exception as exc:
             import traceback
             traceback.print_exc()
@@ -133,4 +1015,10 @@ class ApiResponsev1:
                 status=500
             )
 
+        finally:
+            record_analysis(
+                "analyze", status, timer.total, timer.stages,
+                doc_format=doc_format, doc_bytes=doc_bytes, doc_words=doc_words,
+            )
+
 apiresponse = ApiResponsev1()
\ No newline at end of file
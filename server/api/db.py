@@ -1,6 +0,0 @@
-from electrus.asynchronous import Electrus
-
-client = Electrus()
-database = client["ResumeAnalyser"]
-
-collection = database["ResumeMetaCollection"]
\ No newline at end of file
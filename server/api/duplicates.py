@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from aquilify.settings import settings
+
+from analyzer.minhash import MinHasher, band_keys, similarity
+
+from .metrics import NEAR_DUPLICATES
+
+
+@dataclass(frozen=True, slots=True)
+class NearDuplicate:
+    analysis_id: str
+    similarity: float
+
+    def to_dict(self, reused: bool) -> Dict[str, Any]:
+        # The id is left out: it names an analysis the caller may not have made.
+        return {"similarity": round(self.similarity, 3), "reused": reused}
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures of analysed resumes with an LSH banding index over them, in one
+    SQLite file (WAL mode) that every worker process shares, like ``SharedCache``.
+
+    A lookup reads ``bands`` bucket keys through the primary-key index and compares the
+    signatures of at most ``bucket_limit`` recent documents per bucket. Its cost does
+    not depend on how many resumes are stored, even when a template mill fills one
+    bucket. A candidate counts when its estimated Jaccard similarity reaches
+    ``threshold``. When more than ``max_entries`` signatures are stored, the oldest
+    ones are dropped.
+
+    Every ``user_id`` (and anonymous analyses as one more) has bucket keys of its own,
+    so a lookup only finds resumes stored for the same user.
+    """
+
+    PRUNE_EVERY = 256  # inserts between size checks, per process
+
+    def __init__(self, path: str, enabled: bool = True, threshold: float = 0.9, num_perm: int = 128,
+                 bands: int = 16, bucket_limit: int = 8, max_entries: int = 100000):
+        self.path = path
+        self.enabled = enabled
+        self.threshold = threshold
+        self.bands = bands
+        self.bucket_limit = bucket_limit
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " analysis_id TEXT PRIMARY KEY, signature BLOB NOT NULL, stored REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS signatures_stored ON signatures (stored)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band_key INTEGER NOT NULL, analysis_id TEXT NOT NULL, stored REAL NOT NULL,"
+            " PRIMARY KEY (band_key, stored, analysis_id)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS bands_stored ON bands (stored)")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def signature(self, cleaned_text: str) -> Optional[np.ndarray]:
+        """The signature of a resume, or ``None`` when detection is off or it has no words."""
+        if not self.enabled or not cleaned_text.strip():
+            return None
+        return self.hasher.signature(cleaned_text)
+
+    def _band_keys(self, signature: np.ndarray, user_id: Optional[str]) -> List[int]:
+        keys = band_keys(signature, self.bands)
+        if not user_id:
+            return keys
+        scope = int.from_bytes(
+            hashlib.blake2b(user_id.encode("utf-8"), digest_size=8, person=b"user").digest(), "little", signed=True
+        )
+        return [key ^ scope for key in keys]
+
+    def find(self, signature: Optional[np.ndarray], user_id: Optional[str] = None) -> Optional[NearDuplicate]:
+        """The most similar resume stored for ``user_id`` at or above ``threshold``, if any."""
+        if signature is None:
+            return None
+        try:
+            conn = self._connection()
+            candidates = set()
+            for key in self._band_keys(signature, user_id):
+                rows = conn.execute(
+                    "SELECT analysis_id FROM bands WHERE band_key = ? ORDER BY stored DESC LIMIT ?",
+                    (key, self.bucket_limit),
+                ).fetchall()
+                candidates.update(row[0] for row in rows)
+
+            best: Optional[NearDuplicate] = None
+            for analysis_id in candidates:
+                row = conn.execute(
+                    "SELECT signature FROM signatures WHERE analysis_id = ?", (analysis_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                score = similarity(signature, np.frombuffer(row[0], dtype=np.uint32))
+                if score >= self.threshold and (best is None or score > best.similarity):
+                    best = NearDuplicate(analysis_id, score)
+        except sqlite3.Error:
+            return None
+
+        NEAR_DUPLICATES.inc(1, "found" if best else "unique")
+        return best
+
+    def add(self, analysis_id: Optional[str], signature: Optional[np.ndarray],
+            user_id: Optional[str] = None) -> None:
+        if signature is None or not analysis_id:
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT OR REPLACE INTO signatures (analysis_id, signature, stored) VALUES (?, ?, ?)",
+                    (analysis_id, signature.astype(np.uint32).tobytes(), now),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO bands (band_key, analysis_id, stored) VALUES (?, ?, ?)",
+                    [(key, analysis_id, now) for key in self._band_keys(signature, user_id)],
+                )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(conn)
+        except sqlite3.Error:
+            # An unrecorded signature only means a later copy is analysed in full.
+            pass
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM signatures").fetchone()
+        if count <= self.max_entries:
+            return
+        (cutoff,) = conn.execute(
+            "SELECT stored FROM signatures ORDER BY stored LIMIT 1 OFFSET ?", (count - self.max_entries,)
+        ).fetchone()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM signatures WHERE stored < ?", (cutoff,))
+            conn.execute("DELETE FROM bands WHERE stored < ?", (cutoff,))
+
+
+near_duplicates = NearDuplicateIndex(
+    str(getattr(settings, "NEAR_DUPLICATE_PATH", "cache/near_duplicates.sqlite3")),
+    bool(getattr(settings, "NEAR_DUPLICATE_ENABLED", True)),
+    float(getattr(settings, "NEAR_DUPLICATE_THRESHOLD", 0.9)),
+    bucket_limit=int(getattr(settings, "NEAR_DUPLICATE_BUCKET_LIMIT", 8)),
+    max_entries=int(getattr(settings, "NEAR_DUPLICATE_MAX_ENTRIES", 100000)),
+)
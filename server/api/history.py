@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import traceback
+from typing import Any, Dict, List, Optional
+
+from aquilify.settings import settings
+
+from .metrics import HISTORY_DROPPED, HISTORY_PENDING, HISTORY_WRITTEN
+from .serialization import dumps
+
+
+SUMMARY_FIELDS = ("analysis_id", "resume_sha256", "user_id", "doc_format", "final_score", "created")
+
+
+class AnalysisHistory:
+    """
+    Analysis results persisted to one SQLite file (WAL mode) off the request path,
+    shared by every worker process on the host like ``SharedCache``.
+
+    All of its calls run on one dedicated thread with its own event loop and
+    connection. Results are queued there and written ``batch_size`` at a time in a
+    single transaction; when the queue is full new results are dropped rather than
+    making a request wait. Once more than ``max_entries`` are stored the oldest are
+    deleted. Lookups are scoped to a ``user_id`` (``None`` for anonymous analyses):
+    an analysis is only found by the user it was stored for.
+    """
+
+    def __init__(self, path: str, enabled: bool = True, batch_size: int = 50,
+                 flush_interval: float = 1.0, max_pending: int = 1000, max_entries: int = 100000):
+        self.path = path
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_entries = max_entries
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+
+        # Everything below is only touched on the history thread.
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._unwritten: Dict[str, Dict[str, Any]] = {}
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                threading.Thread(
+                    target=self._run, args=(loop, ready), name="analysis-history", daemon=True
+                ).start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def _run(self, loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue(self.max_pending)
+        loop.create_task(self._writer())
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " analysis_id TEXT PRIMARY KEY, resume_sha256 TEXT, user_id TEXT, doc_format TEXT,"
+            " final_score REAL, created REAL NOT NULL, result BLOB NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created)")
+        conn.execute("CREATE INDEX IF NOT EXISTS analyses_user ON analyses (user_id, created)")
+        conn.execute("CREATE INDEX IF NOT EXISTS analyses_resume ON analyses (resume_sha256, user_id, created)")
+        self._conn = conn
+        return conn
+
+    def record(self, document: Dict[str, Any]) -> None:
+        """Queue an analysis for persistence; returns immediately."""
+        if not self.enabled:
+            return
+        self._ensure_started().call_soon_threadsafe(self._enqueue, document)
+
+    def _enqueue(self, document: Dict[str, Any]) -> None:
+        if self._queue.full():
+            HISTORY_DROPPED.inc(1, "queue_full")
+            return
+
+        # A JSON round trip gives the history its own copy in plain types.
+        document = json.loads(dumps(document))
+        document["created"] = document.get("created") or 0.0
+        self._queue.put_nowait(document)
+        self._unwritten[document["analysis_id"]] = document
+        HISTORY_PENDING.set(self._queue.qsize())
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO analyses"
+                " (analysis_id, resume_sha256, user_id, doc_format, final_score, created, result)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*(d.get(name) for name in SUMMARY_FIELDS), dumps(d.get("result"))) for d in batch],
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()
+            if self.max_entries and count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM analyses WHERE analysis_id IN"
+                    " (SELECT analysis_id FROM analyses ORDER BY created LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                self._write(batch)
+                HISTORY_WRITTEN.inc(len(batch))
+            except Exception:
+                traceback.print_exc()
+                HISTORY_DROPPED.inc(len(batch), "write_error")
+            finally:
+                for document in batch:
+                    self._unwritten.pop(document["analysis_id"], None)
+                HISTORY_PENDING.set(self._queue.qsize())
+
+    async def _call(self, coro):
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+        return await asyncio.wrap_future(future)
+
+    async def get(self, analysis_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The stored document (summary fields plus ``result``) of one analysis of ``user_id``."""
+        return await self._call(self._get(analysis_id, user_id))
+
+    async def _get(self, analysis_id: str, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        document = self._unwritten.get(analysis_id)
+        if document is not None:
+            return document if document.get("user_id") == user_id else None
+
+        row = self._connection().execute(
+            f"SELECT {', '.join(SUMMARY_FIELDS)}, result FROM analyses"
+            " WHERE analysis_id = ? AND user_id IS ?",
+            (analysis_id, user_id),
+        ).fetchone()
+        if row is None:
+            return None
+        return {**dict(zip(SUMMARY_FIELDS, row)), "result": json.loads(row[-1])}
+
+    async def history(self, resume_sha256: Optional[str] = None, user_id: Optional[str] = None,
+                      page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        """Summaries of the analyses of ``user_id``, of one resume if given, newest first."""
+        return await self._call(self._history(resume_sha256, user_id, page, per_page))
+
+    async def _history(self, resume_sha256, user_id, page, per_page) -> Dict[str, Any]:
+        where, params = "user_id IS ?", [user_id]
+        if resume_sha256:
+            where, params = f"resume_sha256 = ? AND {where}", [resume_sha256, *params]
+
+        # Results still queued are newer than anything written, so they come first.
+        pending = sorted(
+            (
+                {name: d.get(name) for name in SUMMARY_FIELDS}
+                for d in self._unwritten.values()
+                if d.get("user_id") == user_id
+                and (not resume_sha256 or d.get("resume_sha256") == resume_sha256)
+            ),
+            key=lambda summary: summary["created"],
+            reverse=True,
+        )
+
+        conn = self._connection()
+        (stored,) = conn.execute(f"SELECT COUNT(*) FROM analyses WHERE {where}", params).fetchone()
+        start = (page - 1) * per_page
+        items = pending[start:start + per_page]
+        if len(items) < per_page:
+            rows = conn.execute(
+                f"SELECT {', '.join(SUMMARY_FIELDS)} FROM analyses WHERE {where}"
+                " ORDER BY created DESC LIMIT ? OFFSET ?",
+                (*params, per_page - len(items), max(start - len(pending), 0)),
+            ).fetchall()
+            items += [dict(zip(SUMMARY_FIELDS, row)) for row in rows]
+
+        return {"items": items, "page": page, "per_page": per_page, "total": stored + len(pending)}
+
+
+history = AnalysisHistory(
+    str(getattr(settings, "HISTORY_PATH", "cache/history.sqlite3")),
+    bool(getattr(settings, "HISTORY_ENABLED", True)),
+    int(getattr(settings, "HISTORY_BATCH_SIZE", 50)),
+    float(getattr(settings, "HISTORY_FLUSH_INTERVAL", 1.0)),
+    int(getattr(settings, "HISTORY_MAX_PENDING", 1000)),
+    int(getattr(settings, "HISTORY_MAX_ENTRIES", 100000) or 0),
+)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from aquilify.settings import settings
+
+from analyzer.helpers import clean_text, extract_skills
+from analyzer.keywords import KeywordMatrix
+
+
+_JD_ID_RE = re.compile(r"[0-9a-f]{24}")
+
+
+@dataclass(frozen=True, slots=True)
+class JDProfile:
+    jd_id: str
+    title: str
+    text: str
+    created: float
+    matrix: KeywordMatrix
+    top_terms: List[str]
+    required_skills: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jd_id": self.jd_id,
+            "title": self.title,
+            "word_count": len(self.text.split()),
+            "top_terms": self.top_terms,
+            "required_skills": self.required_skills,
+            "created": self.created,
+        }
+
+
+class JDStore:
+    """
+    Job descriptions created once and referenced by ``jd_id`` afterwards.
+
+    The id is a digest of the normalised text, so creating the same JD twice returns
+    the same entry; a different non-empty title replaces the stored one. Records are
+    written to ``directory`` so every worker process can resolve an id; the derived
+    profile (term vector, top terms, required skills) is built once per process and
+    kept in a bounded LRU, and picks up a title changed by another process from the
+    record's modification time.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 512, top_terms: int = 20):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.top_terms = top_terms
+        self._profiles: "OrderedDict[str, Tuple[JDProfile, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, jd_id: str) -> str:
+        return os.path.join(self.directory, f"{jd_id}.json")
+
+    def _build(self, record: Dict[str, Any]) -> JDProfile:
+        matrix = KeywordMatrix([record["text"]])
+        return JDProfile(
+            jd_id=record["jd_id"],
+            title=record.get("title") or "",
+            text=record["text"],
+            created=record.get("created", 0.0),
+            matrix=matrix,
+            top_terms=matrix.top_terms(0, self.top_terms),
+            required_skills=extract_skills(record["text"]),
+        )
+
+    def _write(self, record: Dict[str, Any]) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(record["jd_id"])
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return os.stat(path).st_mtime_ns
+
+    def _remember(self, profile: JDProfile, mtime: int) -> JDProfile:
+        with self._lock:
+            self._profiles[profile.jd_id] = (profile, mtime)
+            self._profiles.move_to_end(profile.jd_id)
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def create(self, text: str, title: str = "") -> Tuple[Optional[JDProfile], bool]:
+        """
+        The profile for ``text`` and whether it was created by this call. An existing
+        entry keeps its id and ``created`` time; a non-empty ``title`` that differs from
+        its current one replaces it.
+        """
+        normalised = clean_text(text)
+        if not normalised:
+            return None, False
+
+        title = title.strip()
+        jd_id = hashlib.blake2b(normalised.encode("utf-8"), digest_size=12).hexdigest()
+        existing = self.get(jd_id)
+        if existing is not None:
+            if title and title != existing.title:
+                record = {"jd_id": jd_id, "title": title, "text": existing.text, "created": existing.created}
+                existing = self._remember(replace(existing, title=title), self._write(record))
+            return existing, False
+
+        record = {"jd_id": jd_id, "title": title, "text": normalised, "created": time.time()}
+        mtime = self._write(record)
+        return self._remember(self._build(record), mtime), True
+
+    def get(self, jd_id: Optional[str]) -> Optional[JDProfile]:
+        if not jd_id or not _JD_ID_RE.fullmatch(jd_id):
+            return None
+
+        try:
+            mtime = os.stat(self._path(jd_id)).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            cached = self._profiles.get(jd_id)
+            if cached is not None:
+                self._profiles.move_to_end(jd_id)
+                if mtime is None or cached[1] == mtime:
+                    return cached[0]
+
+        try:
+            with open(self._path(jd_id), encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        # Only the title of a record changes after it is written; keep the profile.
+        if cached is not None and cached[0].text == record["text"]:
+            return self._remember(replace(cached[0], title=record.get("title") or ""), mtime)
+        return self._remember(self._build(record), mtime)
+
+
+jd_store = JDStore(
+    str(getattr(settings, "JD_STORE_DIR", "jd_store")),
+    int(getattr(settings, "JD_CACHE_SIZE", 512)),
+    int(getattr(settings, "JD_TOP_TERMS", 20)),
+)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from aquilify.settings import settings
+
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], *extra: str) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(e for e in extra if e)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self, extra: str = "") -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = float(value)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[labels] = entry
+            entry[0][idx] += 1
+            entry[1][0] += value
+
+    def samples(self, extra: str = "") -> Iterable[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, extra, le)} {cumulative}"
+            label_str = _format_labels(self.labelnames, labels, extra)
+            yield f"{self.name}_sum{label_str} {_format_value(total)}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    The metrics of this process. With ``per_worker`` (set by ``serve.py`` when it forks
+    several workers) every sample carries a ``pid`` label: each worker only counts
+    what it served itself, and the label keeps their series apart so a scrape that
+    reaches another worker does not look like a counter reset. Sum over ``pid``.
+    """
+
+    def __init__(self, per_worker: bool = False) -> None:
+        self._metrics: List[object] = []
+        self.per_worker = per_worker
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        extra = f'pid="{os.getpid()}"' if self.per_worker else ""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(extra))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "resume_analyser_stage_seconds",
+    "Time spent in each analysis stage.",
+    labelnames=("stage",),
+))
+REQUEST_SECONDS = registry.register(Histogram(
+    "resume_analyser_request_seconds",
+    "End-to-end latency of analysis requests.",
+    labelnames=("endpoint", "status"),
+))
+DOCUMENTS = registry.register(Counter(
+    "resume_analyser_documents_total",
+    "Analysed documents by input format.",
+    labelnames=("format",),
+))
+DOCUMENT_BYTES = registry.register(Counter(
+    "resume_analyser_document_bytes_total",
+    "Bytes of analysed input by input format.",
+    labelnames=("format",),
+))
+DOCUMENT_WORDS = registry.register(Counter(
+    "resume_analyser_document_words_total",
+    "Words of extracted resume text by input format.",
+    labelnames=("format",),
+))
+ERRORS = registry.register(Counter(
+    "resume_analyser_errors_total",
+    "Failed analysis requests by HTTP status.",
+    labelnames=("endpoint", "status"),
+))
+
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "resume_analyser_admission_in_flight",
+    "Analyses currently running.",
+))
+ADMISSION_QUEUED = registry.register(Gauge(
+    "resume_analyser_admission_queued",
+    "Analyses waiting for a free slot.",
+))
+ADMISSION_BYTES = registry.register(Gauge(
+    "resume_analyser_admission_bytes",
+    "Request bytes of admitted analyses.",
+))
+ADMISSION_LIMIT = registry.register(Gauge(
+    "resume_analyser_admission_limit",
+    "Configured admission limits (0 = unlimited).",
+    labelnames=("limit",),
+))
+ADMISSION_REJECTED = registry.register(Counter(
+    "resume_analyser_admission_rejected_total",
+    "Analyses refused with 429 by the limit they hit.",
+    labelnames=("reason",),
+))
+SINGLEFLIGHT_SHARED = registry.register(Counter(
+    "resume_analyser_singleflight_shared_total",
+    "Analyses answered with the result of an identical analysis already in flight.",
+))
+HISTORY_PENDING = registry.register(Gauge(
+    "resume_analyser_history_pending",
+    "Analysis results queued for persistence.",
+))
+HISTORY_WRITTEN = registry.register(Counter(
+    "resume_analyser_history_written_total",
+    "Analysis results persisted to the history store.",
+))
+HISTORY_DROPPED = registry.register(Counter(
+    "resume_analyser_history_dropped_total",
+    "Analysis results not persisted, by reason.",
+    labelnames=("reason",),
+))
+SHARED_CACHE = registry.register(Counter(
+    "resume_analyser_shared_cache_total",
+    "Lookups in the cross-worker cache by cache and result.",
+    labelnames=("cache", "result"),
+))
+
+RESUME_INDEX = registry.register(Counter(
+    "resume_analyser_resume_index_total",
+    "Resume index operations by kind (added, skipped, search, exact_search).",
+    labelnames=("operation",),
+))
+
+NEAR_DUPLICATES = registry.register(Counter(
+    "resume_analyser_near_duplicates_total",
+    "Near-duplicate lookups at ingestion by result (found, unique).",
+    labelnames=("result",),
+))
+
+
+def metrics_enabled() -> bool:
+    return bool(getattr(settings, "METRICS_ENABLED", True))
+
+
+def server_timing_enabled() -> bool:
+    return bool(getattr(settings, "SERVER_TIMING", True))
+
+
+def record_analysis(
+    endpoint: str,
+    status: int,
+    seconds: float,
+    stages: Optional[Dict[str, float]] = None,
+    doc_format: Optional[str] = None,
+    doc_bytes: int = 0,
+    doc_words: int = 0,
+) -> None:
+    if not metrics_enabled():
+        return
+
+    code = str(status)
+    REQUEST_SECONDS.observe(seconds, endpoint, code)
+
+    for stage, stage_seconds in (stages or {}).items():
+        STAGE_SECONDS.observe(stage_seconds, stage)
+
+    if status >= 400:
+        ERRORS.inc(1, endpoint, code)
+    elif doc_format:
+        DOCUMENTS.inc(1, doc_format)
+        DOCUMENT_BYTES.inc(doc_bytes, doc_format)
+        DOCUMENT_WORDS.inc(doc_words, doc_format)
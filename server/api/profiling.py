@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import cProfile
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from aquilify.settings import settings
+
+
+def profiling_requested(request) -> bool:
+    """Profiling is only ever honoured on DEBUG deployments."""
+    if not getattr(settings, "DEBUG", False):
+        return False
+    if getattr(settings, "PROFILE_ANALYSES", False):
+        return True
+    header = getattr(settings, "PROFILE_HEADER", "X-Profile")
+    return request.headers.get(header, "").strip().lower() in ("1", "true", "yes")
+
+
+class AnalysisProfile:
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.profiler = cProfile.Profile()
+        self.input_digest: Optional[str] = None
+        self.meta: Dict[str, Any] = {}
+        self.path: Optional[str] = None
+
+    def hash_text(self, text: str, jd_text: str = "", **meta: Any) -> None:
+        self.input_digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.meta.update(meta, input_bytes=len(text.encode("utf-8")))
+        self._hash_jd(jd_text)
+
+    def hash_file(self, path: str, jd_text: str = "", **meta: Any) -> None:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        self.input_digest = digest.hexdigest()
+        self.meta.update(meta, input_bytes=os.path.getsize(path))
+        self._hash_jd(jd_text)
+
+    def _hash_jd(self, jd_text: str) -> None:
+        if jd_text:
+            self.meta["jd_sha256"] = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+
+    def save(self) -> Optional[str]:
+        if not self.input_digest:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"{self.input_digest[:16]}-{int(time.time())}")
+
+        self.path = stem + ".pstats"
+        self.profiler.dump_stats(self.path)
+
+        with open(stem + ".json", "w") as f:
+            json.dump({"input_sha256": self.input_digest, **self.meta}, f, indent=2)
+
+        return self.path
+
+
+@contextmanager
+def profiled(enabled: bool) -> Iterator[Optional[AnalysisProfile]]:
+    """
+    Run the enclosed block under cProfile when ``enabled``; the stats are written to
+    ``PROFILE_DIR`` as ``<input hash>-<timestamp>.pstats`` alongside a JSON sidecar.
+    """
+    if not enabled:
+        yield None
+        return
+
+    session = AnalysisProfile(str(getattr(settings, "PROFILE_DIR", "profiles")))
+    session.profiler.enable()
+    try:
+        yield session
+    finally:
+        session.profiler.disable()
+        session.save()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from aquilify.settings import settings
+
+from .serialization import dumps
+from .sharedcache import SharedCache, shared_cache
+
+
+class ProgressChannel:
+    """
+    Stage events of one running analysis.
+
+    Events are kept for the lifetime of the channel so a subscriber that connects late
+    (or reconnects with ``Last-Event-ID``) is replayed everything it missed. All state is
+    owned by the event loop; worker threads publish through ``publish_threadsafe``.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_publish=None):
+        self.loop = loop
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self.closed = False
+        self.task: Optional[asyncio.Future] = None
+        self._wakeup = asyncio.Event()
+        self._on_publish = on_publish
+
+    def publish(self, event: str, data: Dict[str, Any], final: bool = False) -> None:
+        if self.closed:
+            return
+        self.events.append((event, data))
+        self.closed = final
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+        if self._on_publish is not None:
+            self._on_publish(list(self.events), self.closed)
+
+    def publish_threadsafe(self, event: str, data: Dict[str, Any], final: bool = False) -> None:
+        self.loop.call_soon_threadsafe(self.publish, event, data, final)
+
+    async def subscribe(self, after: int = -1) -> AsyncIterator[Tuple[int, str, Dict[str, Any]]]:
+        index = after + 1
+        while True:
+            wakeup = self._wakeup
+            while index < len(self.events):
+                event, data = self.events[index]
+                yield index, event, data
+                index += 1
+            if self.closed:
+                return
+            await wakeup.wait()
+
+
+class SharedProgressChannel:
+    """
+    The events of an analysis running in another worker process, read back from the
+    shared cache every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, registry: "ProgressRegistry", analysis_id: str, snapshot: Dict[str, Any]):
+        self.registry = registry
+        self.analysis_id = analysis_id
+        self._snapshot = snapshot
+
+    async def subscribe(self, after: int = -1) -> AsyncIterator[Tuple[int, str, Dict[str, Any]]]:
+        loop = asyncio.get_running_loop()
+        index = after + 1
+        snapshot = self._snapshot
+        while True:
+            events = snapshot["events"]
+            while index < len(events):
+                event, data = events[index]
+                yield index, event, data
+                index += 1
+            if snapshot["closed"]:
+                return
+            await asyncio.sleep(self.registry.poll_interval)
+            snapshot = await loop.run_in_executor(None, self.registry._load, self.analysis_id)
+            if snapshot is None:
+                # Evicted from the shared cache before the analysis finished.
+                return
+
+
+class ProgressRegistry:
+    """
+    The most recent ``max_size`` channels of this process. With ``shared``, every
+    channel's events are also written there (on one background thread, in order), so
+    ``/analyze/events`` in any worker process can follow an analysis started in another.
+    """
+
+    def __init__(self, max_size: int, shared: Optional[SharedCache] = None, poll_interval: float = 0.25):
+        self.max_size = max(1, int(max_size))
+        self.shared = shared
+        self.poll_interval = poll_interval
+        self._channels: "OrderedDict[str, ProgressChannel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def open(self, analysis_id: str, loop: asyncio.AbstractEventLoop) -> ProgressChannel:
+        on_publish = functools.partial(self._write, analysis_id) if self._sharing() else None
+        channel = ProgressChannel(loop, on_publish)
+        with self._lock:
+            self._channels[analysis_id] = channel
+            while len(self._channels) > self.max_size:
+                self._channels.popitem(last=False)
+        return channel
+
+    def get(self, analysis_id: Optional[str]):
+        if not analysis_id:
+            return None
+        with self._lock:
+            channel = self._channels.get(analysis_id)
+        if channel is not None or not self._sharing():
+            return channel
+
+        snapshot = self._load(analysis_id)
+        return SharedProgressChannel(self, analysis_id, snapshot) if snapshot is not None else None
+
+    def _sharing(self) -> bool:
+        return self.shared is not None and self.shared.enabled
+
+    def _write(self, analysis_id: str, events: list, closed: bool) -> None:
+        # One thread keeps the snapshots of a channel in order; it is started lazily so
+        # none is running when serve.py forks.
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress")
+        self._writer.submit(
+            lambda: self.shared.set("progress", analysis_id, dumps({"events": events, "closed": closed}))
+        )
+
+    def _load(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        data = self.shared.get("progress", analysis_id)
+        return json.loads(data) if data is not None else None
+
+
+def format_event(index: int, event: str, data: Dict[str, Any]) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (index, event.encode("utf-8"), dumps(data))
+
+
+progress = ProgressRegistry(
+    getattr(settings, "PROGRESS_CHANNELS", 256),
+    shared_cache,
+    float(getattr(settings, "PROGRESS_POLL_INTERVAL", 0.25)),
+)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import fields as dataclass_fields
+from typing import Any, Dict, Iterable, Optional, Set
+
+from aquilify.settings import settings
+
+from analyzer.compute import ANALYSIS_LEVELS, KEYWORD_MATCHING, ATSScores
+
+from .exceptions import ApiResponseError
+
+
+RESPONSE_FIELDS = (
+    "analysis_id", "compute", "suggestions", "weak_phrases", "bullets", "sections", "file_out", "revision",
+    "near_duplicate", "truncated",
+)
+SCORE_FIELDS = tuple(f.name for f in dataclass_fields(ATSScores) if f.name != "explanation")
+
+# Scores ``generate_suggestions`` reads; computed whenever suggestions are requested.
+SUGGESTION_INPUTS = frozenset(
+    {"section_found", "keyword_score", "action_score", "metric_score", "length_score", "word_count"}
+)
+
+# Dropped in compact mode unless asked for by name: ``compute.bullets`` repeats the
+# top-level ``bullets``.
+COMPACT_OMITTED_SCORES = frozenset({"bullets"})
+
+# Response parts each ``analysis_level`` leaves out, on top of the scores it skips
+# (``analyzer.compute.ANALYSIS_LEVELS``): quick has no weak phrases, classification or
+# highlighting, standard no classification or highlighting.
+LEVEL_OMITTED_FIELDS = {
+    "quick": frozenset({"weak_phrases", "suggestions", "file_out"}),
+    "standard": frozenset({"suggestions", "file_out"}),
+    "full": frozenset(),
+}
+
+
+def keyword_matching_from_form(form) -> str:
+    """The ``keyword_matching`` of a request (see ``analyzer.compute.KEYWORD_MATCHING``)."""
+    matching = (form.get("keyword_matching") or getattr(settings, "KEYWORD_MATCHING_DEFAULT", "lexical"))
+    matching = matching.strip().lower()
+    if matching not in KEYWORD_MATCHING:
+        raise ApiResponseError(
+            details=f"keyword_matching must be one of: {', '.join(KEYWORD_MATCHING)}", status=400
+        )
+    return matching
+
+
+class FieldSelection:
+    """
+    The parts of an analysis response a client asked for through ``fields=``,
+    ``compact=`` and ``analysis_level=``, and the ``keyword_matching=`` to score them
+    with. Used up front to decide which stages run at all, then to shape the response,
+    so unrequested fields are never computed.
+    """
+
+    def __init__(self, fields: Optional[Iterable[str]] = None, compact: bool = False, level: str = "full",
+                 matching: str = "lexical"):
+        if level not in ANALYSIS_LEVELS:
+            raise ApiResponseError(
+                details=f"analysis_level must be one of: {', '.join(ANALYSIS_LEVELS)}", status=400
+            )
+        self.compact = compact
+        self.level = level
+        self.matching = matching
+        self.top: Optional[Set[str]] = None
+        self.scores: Optional[Set[str]] = None
+        explicit: Set[str] = set()
+
+        if fields is not None:
+            self.top, self.scores = set(), set()
+            for name in fields:
+                head, _, sub = name.partition(".")
+                if head not in RESPONSE_FIELDS or (sub and (head != "compute" or sub not in SCORE_FIELDS)):
+                    raise ApiResponseError(details=f"Unknown field: {name}", status=400)
+                self.top.add(head)
+                if sub:
+                    explicit.add(sub)
+                elif head == "compute":
+                    self.scores.update(SCORE_FIELDS)
+            self.scores |= explicit
+
+        if compact:
+            requested = self.scores if self.scores is not None else set(SCORE_FIELDS)
+            self.scores = requested - (COMPACT_OMITTED_SCORES - explicit)
+
+        self._apply_level(explicit)
+
+    def _apply_level(self, explicit: Set[str]) -> None:
+        omitted, level_scores = LEVEL_OMITTED_FIELDS[self.level], ANALYSIS_LEVELS[self.level]
+        beyond = sorted((self.top or set()) & omitted)
+        if level_scores is not None:
+            beyond += sorted(f"compute.{name}" for name in explicit - level_scores)
+        if beyond:
+            raise ApiResponseError(
+                details=f"Not computed at analysis_level={self.level}: {', '.join(beyond)}", status=400
+            )
+
+        if omitted:
+            self.top = (self.top if self.top is not None else set(RESPONSE_FIELDS)) - omitted
+        if level_scores is not None:
+            self.scores = (self.scores if self.scores is not None else set(SCORE_FIELDS)) & level_scores
+
+    @classmethod
+    def from_form(cls, form) -> "FieldSelection":
+        raw = form.get("fields")
+        fields = [f.strip() for f in raw.split(",") if f.strip()] if raw else None
+        compact = (form.get("compact") or "").strip().lower() in ("1", "true", "yes")
+        level = (form.get("analysis_level") or getattr(settings, "ANALYSIS_LEVEL_DEFAULT", "full")).strip().lower()
+        return cls(fields, compact, level, keyword_matching_from_form(form))
+
+    def wants(self, name: str) -> bool:
+        return self.top is None or name in self.top
+
+    @property
+    def needs_weak_phrases(self) -> bool:
+        return self.wants("weak_phrases") or self.wants("suggestions") or self.wants("file_out")
+
+    def score_fields(self) -> Optional[Set[str]]:
+        """The ``fields`` argument for ``compute_ats_scores`` (``None`` means all)."""
+        if self.scores is None:
+            return None
+        if self.wants("suggestions"):
+            return self.scores | SUGGESTION_INPUTS
+        return set(self.scores)
+
+    def project_scores(self, compute: Dict[str, Any]) -> Dict[str, Any]:
+        if self.scores is None:
+            return compute
+        return {k: v for k, v in compute.items() if k in self.scores}
+
+    def project(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in output.items() if self.wants(k)}
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import traceback
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from aquilify.settings import settings
+
+from analyzer.ann import VectorIndex
+from analyzer.semantic import default_model, project
+
+from .metrics import RESUME_INDEX
+
+
+class ResumeIndex:
+    """
+    The semantic projection of every analysed resume (``analyzer.semantic``), kept in a
+    ``VectorIndex`` so that "the best candidates for this JD" is an approximate
+    nearest-neighbour search rather than a scan of every stored resume.
+
+    Rows are keyed by the resume's SHA-256 and refer to the analysis that indexed it.
+    Every ``user_id`` has an index of its own (anonymous analyses share one), so a
+    search only ever sees the resumes its caller analysed, as with the history. Each
+    semantic model gets its own subdirectory, since projections from different models
+    are not comparable; retraining the model starts a fresh index. At most
+    ``max_open`` indexes are kept open per process.
+    """
+
+    def __init__(self, directory: str, enabled: bool = True, nprobe: int = 16, min_train: int = 4096,
+                 max_open: int = 64):
+        self.directory = directory
+        self.enabled = enabled
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.max_open = max_open
+        self._indexes: "OrderedDict[str, VectorIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scope(user_id: Optional[str]) -> str:
+        if not user_id:
+            return "anonymous"
+        return hashlib.blake2b(user_id.encode("utf-8"), digest_size=16).hexdigest()
+
+    def index(self, user_id: Optional[str] = None) -> VectorIndex:
+        scope = self._scope(user_id)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                model = default_model()
+                index = VectorIndex(
+                    os.path.join(self.directory, model.fingerprint(), scope),
+                    model.dimensions,
+                    min_train=self.min_train,
+                    nprobe=self.nprobe,
+                )
+                self._indexes[scope] = index
+                while len(self._indexes) > self.max_open:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(scope)
+            return index
+
+    def add(self, resume_sha256: str, analysis_id: str, cleaned_text: str, user_id: Optional[str] = None) -> bool:
+        """Index one analysed resume; never raises, a failed write only loses the row."""
+        if not self.enabled or not resume_sha256 or not analysis_id:
+            return False
+        try:
+            added = self.index(user_id).add(resume_sha256, analysis_id, project(cleaned_text))
+        except Exception:
+            traceback.print_exc()
+            return False
+        RESUME_INDEX.inc(1, "added" if added else "skipped")
+        return added
+
+    def search(self, jd_vector: np.ndarray, k: int = 50, exact: bool = False,
+               user_id: Optional[str] = None) -> Dict[str, Any]:
+        index = self.index(user_id)
+        results, scanned = index.search(jd_vector, k, exact=exact)
+        RESUME_INDEX.inc(1, "exact_search" if exact else "search")
+        candidates: List[Dict[str, Any]] = [
+            {"resume_sha256": key, "analysis_id": ref, "semantic_score": round(max(score, 0.0) * 100, 1)}
+            for key, ref, score in results
+        ]
+        return {"candidates": candidates, "indexed": len(index), "scanned": scanned, "exact": exact}
+
+
+resume_index = ResumeIndex(
+    str(getattr(settings, "RESUME_INDEX_DIR", "resume_index")),
+    bool(getattr(settings, "RESUME_INDEX_ENABLED", True)),
+    int(getattr(settings, "RESUME_INDEX_NPROBE", 16)),
+    int(getattr(settings, "RESUME_INDEX_MIN_TRAIN", 4096)),
+    int(getattr(settings, "RESUME_INDEX_MAX_OPEN", 64)),
+)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from aquilify.settings import settings
+
+from analyzer.incremental import AnalysisMemo, BulletFacts
+
+from .serialization import dumps
+from .sharedcache import SharedCache, shared_cache
+
+
+def _encode(memo: AnalysisMemo) -> bytes:
+    # A memo's own tables already hold what it reused, so the previous revision is left out.
+    return dumps({
+        "bullets": {key.hex(): [f.starts_with_action_verb, f.contains_metric, f.word_count]
+                    for key, f in memo.bullets.items()},
+        "segments": {key.hex(): hits for key, hits in memo.segments.items()},
+    })
+
+
+def _decode(data: bytes) -> AnalysisMemo:
+    tables = json.loads(data)
+    memo = AnalysisMemo()
+    memo.bullets = {bytes.fromhex(key): BulletFacts(*facts) for key, facts in tables["bullets"].items()}
+    memo.segments = {
+        bytes.fromhex(key): tuple(tuple(hit) for hit in hits) for key, hits in tables["segments"].items()
+    }
+    return memo
+
+
+class RevisionStore:
+    """
+    Analysis id -> memo, used to re-analyse edited resubmissions. Memos are written to
+    ``shared`` so a resubmission handled by another worker process finds them, and the
+    most recent ``max_entries`` are also kept decoded in a bounded LRU.
+    """
+
+    def __init__(self, max_entries: int = 256, shared: Optional[SharedCache] = None):
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: "OrderedDict[str, AnalysisMemo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, analysis_id: Optional[str]) -> Optional[AnalysisMemo]:
+        if not analysis_id:
+            return None
+        with self._lock:
+            memo = self._entries.get(analysis_id)
+            if memo is not None:
+                self._entries.move_to_end(analysis_id)
+                return memo
+
+        data = self.shared.get("revision", analysis_id) if self.shared is not None else None
+        if data is None:
+            return None
+        memo = _decode(data)
+        self._remember(analysis_id, memo)
+        return memo
+
+    def put(self, analysis_id: str, memo: AnalysisMemo) -> None:
+        self._remember(analysis_id, memo)
+        if self.shared is not None:
+            self.shared.set("revision", analysis_id, _encode(memo))
+
+    def _remember(self, analysis_id: str, memo: AnalysisMemo) -> None:
+        with self._lock:
+            self._entries[analysis_id] = memo
+            self._entries.move_to_end(analysis_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+revisions = RevisionStore(int(getattr(settings, "REVISION_CACHE_SIZE", 256)), shared_cache)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Sequence
+
+from aquilify.settings import settings
+
+from analyzer.keywords import KeywordMatrix
+
+
+class KeywordMatrixCache:
+    """
+    Bounded LRU of JD set -> ``KeywordMatrix``, keyed by a digest of the texts, so the
+    same set of open roles is only vectorised once.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, KeywordMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(jds: Sequence[str]) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for jd in jds:
+            digest.update(jd.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.digest()
+
+    def get(self, jds: Sequence[str]) -> KeywordMatrix:
+        key = self._key(jds)
+        with self._lock:
+            matrix = self._entries.get(key)
+            if matrix is not None:
+                self._entries.move_to_end(key)
+                return matrix
+
+        matrix = KeywordMatrix(jds)
+        with self._lock:
+            self._entries[key] = matrix
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return matrix
+
+
+jd_matrices = KeywordMatrixCache(int(getattr(settings, "JD_MATRIX_CACHE_SIZE", 8)))
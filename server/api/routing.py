@@ -14,4 +14,11 @@ from .app import apiresponse
 
 ROUTER = [
     rule("/analyze", apiresponse.analyse, methods = ["GET", "POST"]),
+    rule("/analyze/batch", apiresponse.analyse_batch, methods = ["POST"]),
+    rule("/analyze/roles", apiresponse.analyse_roles, methods = ["POST"]),
+    rule("/analyze/start", apiresponse.analyse_start, methods = ["POST"]),
+    rule("/analyze/events", apiresponse.analyse_events, methods = ["GET"]),
+    rule("/jds", apiresponse.jds, methods = ["GET", "POST"]),
+    rule("/analyses", apiresponse.analyses, methods = ["GET"]),
+    rule("/candidates", apiresponse.candidates, methods = ["GET", "POST"]),
 ]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from aquilify.wrappers import Response
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder produces the same documents
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # NumPy scalars / arrays that leak out of the scoring code.
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+class FastJsonResponse(Response):
+    """``JsonResponse`` for analysis payloads, encoded straight to bytes with ``dumps``."""
+
+    def __init__(
+        self,
+        content: Any,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        content_type: str = "application/json",
+    ):
+        super().__init__(content=dumps(content), status_code=status, headers=headers, content_type=content_type)
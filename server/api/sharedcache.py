@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from aquilify.settings import settings
+
+from .metrics import SHARED_CACHE
+
+
+class SharedCache:
+    """
+    A key -> bytes cache in one SQLite file that every worker process on the host
+    reads and writes, so a result computed by one worker is a hit in all of them.
+
+    The database runs in WAL mode, so readers never wait for the writer. Each thread
+    opens its own connection lazily; connections are keyed by pid as well, so a
+    worker forked from a parent that already used the cache opens fresh ones. When
+    the cache grows past ``max_entries`` the oldest entries are dropped.
+    """
+
+    PRUNE_EVERY = 64  # writes between size checks, per process
+
+    def __init__(self, path: str, max_entries: int = 10000, enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, stored REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_stored ON cache (stored)")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE key = ?", (f"{namespace}:{key}",)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        SHARED_CACHE.inc(1, namespace, "hit" if row else "miss")
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        if not self.enabled:
+            return
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored) VALUES (?, ?, ?)",
+                (f"{namespace}:{key}", value, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(conn)
+        except sqlite3.Error:
+            # A busy or unwritable cache only costs a recompute.
+            pass
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+
+shared_cache = SharedCache(
+    str(getattr(settings, "SHARED_CACHE_PATH", "cache/shared.sqlite3")),
+    int(getattr(settings, "SHARED_CACHE_MAX_ENTRIES", 10000)),
+    bool(getattr(settings, "SHARED_CACHE_ENABLED", True)),
+)
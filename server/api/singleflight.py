@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aquilify.settings import settings
+
+from .metrics import SINGLEFLIGHT_SHARED
+
+
+def flight_key(*parts: Any) -> str:
+    """Digest of the parts that decide an analysis' result."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one computation: the first caller
+    starts it and everyone arriving while it runs awaits the same result (or
+    exception). The computation runs as its own task, so a caller that goes away
+    does not cancel it for the others. Keys are forgotten as soon as it finishes,
+    so this is de-duplication, not a cache.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 on_join: Optional[Callable[[], None]] = None) -> Tuple[Any, bool]:
+        """
+        Result of ``fn()`` for ``key`` and whether it was shared with another call.
+        ``on_join`` is called before a shared call starts waiting, to give back what
+        it holds for a computation of its own.
+        """
+        if not self.enabled:
+            return await fn(), False
+
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if shared:
+            SINGLEFLIGHT_SHARED.inc()
+            if on_join is not None:
+                on_join()
+        else:
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+
+        return await asyncio.shield(flight), shared
+
+
+flights = SingleFlight(bool(getattr(settings, "SINGLEFLIGHT_ENABLED", True)))
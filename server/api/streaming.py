@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Callable, Dict, Optional, Union
+
+from aquilify.wrappers import Response
+
+
+class StreamingResponse(Response):
+    """
+    Sends each chunk of ``iterator`` as soon as it is produced.
+
+    The stock ``Response`` drains callable content once just to compute
+    ``Content-Length`` before sending it, which defeats streaming. The body here is
+    left empty so the compression middleware passes the response through untouched.
+    ``on_close`` is called once the response is over, however it ended.
+    """
+
+    def __init__(
+        self,
+        iterator: AsyncIterator[Union[bytes, str]],
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        content_type: str = "application/x-ndjson",
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(content=b"", status_code=status, headers=headers, content_type=content_type)
+        self.iterator = iterator
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self._send(send)
+        finally:
+            if self.on_close is not None:
+                self.on_close()
+
+    async def _send(self, send):
+        headers = {
+            "Content-Type": f"{self.content_type}; charset={self.encoding}",
+            "Cache-Control": "no-store",
+            **self.headers,
+        }
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": [
+                (k.encode("latin-1") if isinstance(k, str) else k, v.encode("latin-1") if isinstance(v, str) else v)
+                for k, v in headers.items()
+            ],
+        })
+
+        try:
+            async for chunk in self.iterator:
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk.encode("utf-8") if isinstance(chunk, str) else chunk,
+                    "more_body": True,
+                })
+        finally:
+            aclose = getattr(self.iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,245 @@
+"""
+Adversarial inputs: can one upload pin a core?
+
+Two checks over a set of pathological documents (megabytes of digits, bullet glyphs,
+whitespace, "was " chains, heading spam, a DOCX that inflates to tens of megabytes...):
+
+``scanners``
+    Runs every text scanner (bullets, metrics, passive voice, sections, weak phrases,
+    segments, skills, ...) on each input at ``--size`` and 4x ``--size`` characters
+    and fits the growth exponent ``log(t4 / t1) / log 4``. Anything above
+    ``--max-exponent`` (default 1.3) is superlinear and fails.
+
+``endpoint``
+    Posts each input, as large as the server accepts, to ``/api/v1/analyze`` one at a
+    time (in-process through the ASGI interface) and measures the CPU time the process
+    spends on it. Every request must be answered with 200, 400, 413 or 422 within
+    ``ANALYSIS_CPU_BUDGET`` plus ``--slack`` seconds of CPU.
+
+    cd server
+    python -m bench.adversarial
+    python -m bench.adversarial --check scanners --size 100000 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import resource
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .loadtest import SERVER_DIR, Sample, asgi_post, build_request
+
+# name -> n -> a document of about n characters
+INPUTS: Dict[str, Callable[[int], str]] = {
+    "digits": lambda n: "1" * n,
+    "digits_spaced": lambda n: "1 " * (n // 2),
+    "thousands": lambda n: "1,000" * (n // 5),
+    "decimals": lambda n: "1." * (n // 2),
+    "digits_then_letter": lambda n: ("9" * 99 + "a ") * (n // 101),
+    "dollars": lambda n: "$" + " " * n,
+    "bullet_glyphs": lambda n: "•" * n,
+    "bullets_spaced": lambda n: "• " * (n // 2),
+    "bullet_lines": lambda n: "- \n" * (n // 3),
+    "spaces": lambda n: " " * n,
+    "indented_lines": lambda n: ("\n" + " " * 63) * (n // 64),
+    "tabs": lambda n: "\n" + "\t" * n,
+    "newlines": lambda n: "\n" * n,
+    "passive_chain": lambda n: "was " * (n // 4),
+    "passive_long_word": lambda n: "was " + "a" * n,
+    "passive_near_miss": lambda n: ("was " + "a" * 60 + "e ") * (n // 66),
+    "one_word": lambda n: "a" * n,
+    "weak_phrases": lambda n: "responsible for very " * (n // 21),
+    "headings": lambda n: "experience\n" * (n // 11),
+    "sentences": lambda n: "I did. " * (n // 7),
+}
+
+
+def _scanners() -> Dict[str, Callable[[str], Any]]:
+    from analyzer import helpers
+    from analyzer.incremental import AnalysisMemo, split_segments
+    from analyzer.sections import build_section_index
+    from analyzer.skills import default_matcher
+
+    return {
+        "clean_text": helpers.clean_text,
+        "bullets": helpers.extract_bullet_spans,
+        "metric": helpers.contains_metric,
+        "passive_voice": helpers.passive_voice_ratio,
+        "first_person": helpers.first_person_ratio,
+        "readability": helpers.readability_scores,
+        "experience_years": helpers.estimate_experience_years,
+        "sections": build_section_index,
+        "weak_phrases": helpers.weak_phrases,
+        "segments": split_segments,
+        "memo_weak_phrases": lambda text: AnalysisMemo().weak_phrases(text, None),
+        "skills": lambda text: default_matcher().find(text),
+    }
+
+
+def _best_of(fn: Callable[[str], Any], text: str, repeats: int) -> float:
+    best = math.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_scanners(args) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for scanner, fn in _scanners().items():
+        for name, make in INPUTS.items():
+            small, large = make(args.size), make(args.size * 4)
+            t_small = _best_of(fn, small, args.repeats)
+            t_large = _best_of(fn, large, args.repeats)
+            # Below a few milliseconds the ratio is mostly noise, and nothing that fast
+            # can pin a core anyway.
+            exponent = math.log(t_large / t_small, 4) if t_large >= args.min_seconds and t_small > 0 else None
+            rows.append({
+                "scanner": scanner,
+                "input": name,
+                "small_ms": t_small * 1000,
+                "large_ms": t_large * 1000,
+                "exponent": exponent,
+                "ok": exponent is None or exponent <= args.max_exponent,
+            })
+    return rows
+
+
+def _docx_bomb(expanded_bytes: int) -> bytes:
+    """A DOCX of repeated text: a few hundred kilobytes that inflate to ``expanded_bytes``."""
+    from docx import Document
+
+    doc = Document()
+    paragraph = "word " * 20000
+    for _ in range(max(1, expanded_bytes // len(paragraph))):
+        doc.add_paragraph(paragraph)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def _post_all(app, samples: Sequence[Sample]) -> List[Dict[str, Any]]:
+    rows = []
+    for sample in samples:
+        body, content_type = build_request(sample, "", {"analysis_level": "full"})
+        cpu, start = _cpu_seconds(), time.perf_counter()
+        status = await asgi_post(app, "/api/v1/analyze", body, content_type)
+        rows.append({
+            "input": sample.name,
+            "bytes": len(sample.payload),
+            "status": status,
+            "cpu_s": _cpu_seconds() - cpu,
+            "wall_s": time.perf_counter() - start,
+        })
+    return rows
+
+
+def check_endpoint(args) -> List[Dict[str, Any]]:
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+    os.environ.setdefault("AQUILIFY_SETTINGS_MODULE", "settings")
+
+    import asgi
+    from aquilify.settings import settings
+    from api.duplicates import near_duplicates
+    from api.history import history
+
+    history.enabled = False
+    near_duplicates.enabled = False
+    budget = float(getattr(settings, "ANALYSIS_CPU_BUDGET", 0) or 0)
+    max_bytes = int(getattr(settings, "UPLOAD_MAX_BYTES", 0) or 0) or 10 * 1024 * 1024
+
+    samples = [Sample("text", name, make(max_bytes).encode("utf-8")[:max_bytes]) for name, make in INPUTS.items()]
+    samples.append(Sample("docx", "docx_bomb.docx", _docx_bomb(args.docx_expanded_bytes)))
+
+    # One small request first, so lazy imports are not charged to the first input.
+    asyncio.run(_post_all(asgi.application, [Sample("text", "warmup", b"Experience\n- Built things")]))
+    rows = asyncio.run(_post_all(asgi.application, samples))
+
+    limit = budget + args.slack if budget else None
+    for row in rows:
+        row["ok"] = row["status"] in (200, 400, 413, 422) and (limit is None or row["cpu_s"] <= limit)
+        row["limit_s"] = limit
+    return rows
+
+
+def format_report(scanners: Optional[List[Dict[str, Any]]], endpoint: Optional[List[Dict[str, Any]]],
+                  args) -> str:
+    lines: List[str] = []
+    if scanners is not None:
+        worst = sorted(scanners, key=lambda r: r["large_ms"], reverse=True)[:args.top]
+        failed = [r for r in scanners if not r["ok"]]
+        lines += [
+            f"scanners at {args.size} / {args.size * 4} characters "
+            f"({len(scanners)} pairs, max exponent {args.max_exponent}):",
+            f"  {'scanner':<18}{'input':<20}{'small ms':>10}{'large ms':>10}{'exponent':>10}",
+        ]
+        for r in failed + [r for r in worst if r["ok"]]:
+            exponent = f"{r['exponent']:.2f}" if r["exponent"] is not None else "-"
+            lines.append(
+                f"  {r['scanner']:<18}{r['input']:<20}{r['small_ms']:>10.1f}{r['large_ms']:>10.1f}{exponent:>10}"
+                + ("  SUPERLINEAR" if not r["ok"] else "")
+            )
+        lines.append("")
+
+    if endpoint is not None:
+        limit = endpoint[0]["limit_s"] if endpoint else None
+        lines += [
+            "endpoint, one request at a time" + (f" (CPU limit {limit:.1f}s):" if limit else ":"),
+            f"  {'input':<22}{'bytes':>10}{'status':>8}{'cpu s':>8}{'wall s':>8}",
+        ]
+        for r in endpoint:
+            lines.append(
+                f"  {r['input']:<22}{r['bytes']:>10}{r['status']:>8}{r['cpu_s']:>8.2f}{r['wall_s']:>8.2f}"
+                + ("" if r["ok"] else "  FAILED")
+            )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", choices=("all", "scanners", "endpoint"), default="all")
+    parser.add_argument("--size", type=int, default=50_000, help="characters in the smaller scanner input")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per scanner measurement; the fastest counts")
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="fail above this growth exponent")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="ignore the exponent when the larger input takes less than this")
+    parser.add_argument("--docx-expanded-bytes", type=int, default=100 * 1024 * 1024,
+                        help="what the DOCX bomb inflates to")
+    parser.add_argument("--slack", type=float, default=1.0,
+                        help="CPU seconds allowed over ANALYSIS_CPU_BUDGET (upload handling, the last stage)")
+    parser.add_argument("--top", type=int, default=10, help="slowest scanner rows to show")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+
+    scanners = check_scanners(args) if args.check in ("all", "scanners") else None
+    endpoint = check_endpoint(args) if args.check in ("all", "endpoint") else None
+
+    if args.json:
+        print(json.dumps({"scanners": scanners, "endpoint": endpoint}, indent=2))
+    else:
+        print(format_report(scanners, endpoint, args))
+    rows = (scanners or []) + (endpoint or [])
+    return 0 if all(r["ok"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
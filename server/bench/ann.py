@@ -0,0 +1,181 @@
+"""
+Recall and latency of the resume index (``analyzer.ann.VectorIndex``) against exact search.
+
+Builds an index of ``--size`` synthetic resumes in a temporary directory. Each resume
+mixes one to three categories of the skills taxonomy, and the vectors are their real
+projections in the semantic space. It then runs ``--queries`` job descriptions
+(``bench/jds`` plus generated ones) at each ``--nprobe``. For every query the top
+``--k`` of the approximate search is compared with an exact scan of all vectors.
+Reports recall@k, latency percentiles, vectors scanned, build time and the time to
+open the index in a fresh process state. Exits non-zero when recall at
+``RESUME_INDEX_NPROBE`` is below ``--min-recall``.
+
+    cd server
+    python -m bench.ann --size 200000
+    python -m bench.ann --size 1000000 --nprobe 8,16,32 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .loadtest import BENCH_DIR, SERVER_DIR, summarise
+
+
+def _documents(count: int, seed: int) -> List[str]:
+    from analyzer.train_semantic import FRAMES, taxonomy_categories
+
+    rng = random.Random(seed)
+    categories = taxonomy_categories()
+    documents = []
+    for _ in range(count):
+        lines = []
+        for heading, skills in rng.sample(categories, rng.randint(1, 3)):
+            picked = rng.sample(skills, min(len(skills), rng.randint(3, 10)))
+            lines.append(rng.choice(FRAMES).format(
+                heading=heading,
+                skills=", ".join(rng.choice(names) for names in picked),
+                years=rng.randint(1, 15),
+            ))
+        documents.append("\n".join(lines))
+    return documents
+
+
+def run(args) -> Dict[str, Any]:
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+
+    import numpy as np
+
+    from analyzer.ann import VectorIndex
+    from analyzer.semantic import default_model
+
+    model = default_model()
+    started = time.perf_counter()
+    vectors = model.project_many(_documents(args.size, args.seed))
+    project_s = time.perf_counter() - started
+
+    jds = [p.read_text(encoding="utf-8") for p in sorted(pathlib.Path(args.jds).glob("*.txt"))]
+    jds += _documents(max(0, args.queries - len(jds)), args.seed + 1)
+    queries = model.project_many(jds[:args.queries])
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        # Train once, explicitly, after the bulk load rather than in the background.
+        index = VectorIndex(directory, model.dimensions, min_train=args.size + 1)
+        started = time.perf_counter()
+        for start in range(0, args.size, args.chunk):
+            chunk = vectors[start:start + args.chunk]
+            index.add_many([(f"{start + i:064x}", f"{start + i:032x}", v) for i, v in enumerate(chunk)])
+        insert_s = time.perf_counter() - started
+
+        index.min_train = args.min_train
+        started = time.perf_counter()
+        index.train()
+        train_s = time.perf_counter() - started
+
+        reopened = VectorIndex(directory, model.dimensions)
+        started = time.perf_counter()
+        indexed = len(reopened)
+        open_s = time.perf_counter() - started
+
+        exact_latencies, truth = [], []
+        for q in queries:
+            t = time.perf_counter()
+            results, _ = reopened.search(q, args.k, exact=True)
+            exact_latencies.append(time.perf_counter() - t)
+            truth.append({key for key, _, _ in results})
+
+        sweeps = []
+        for nprobe in args.nprobe:
+            latencies, recalls, scanned = [], [], []
+            for q, expected in zip(queries, truth):
+                t = time.perf_counter()
+                results, count = reopened.search(q, args.k, nprobe=nprobe)
+                latencies.append(time.perf_counter() - t)
+                recalls.append(len({key for key, _, _ in results} & expected) / max(1, len(expected)))
+                scanned.append(count)
+            sweeps.append({
+                "nprobe": nprobe,
+                "recall": float(np.mean(recalls)),
+                "min_recall": float(np.min(recalls)),
+                "scanned": float(np.mean(scanned)),
+                "latency": summarise(latencies),
+            })
+
+    return {
+        "size": args.size,
+        "indexed": indexed,
+        "queries": len(queries),
+        "k": args.k,
+        "project_s": project_s,
+        "insert_s": insert_s,
+        "train_s": train_s,
+        "open_s": open_s,
+        "exact": summarise(exact_latencies),
+        "ann": sweeps,
+    }
+
+
+def format_report(report: Dict[str, Any], target_nprobe: int) -> str:
+    lines = [
+        f"{report['indexed']} vectors, {report['queries']} queries, recall@{report['k']} against exact search",
+        f"projected in {report['project_s']:.1f}s, inserted in {report['insert_s']:.1f}s, "
+        f"lists built in {report['train_s']:.1f}s, opened in {report['open_s'] * 1000:.0f}ms",
+        "",
+        f"{'search':<14}{'recall':>8}{'min':>8}{'scanned':>10}{'p50 ms':>9}{'p95 ms':>9}",
+    ]
+    e = report["exact"]
+    lines.append(f"{'exact':<14}{1.0:>8.3f}{1.0:>8.3f}{report['indexed']:>10}{e['p50_ms']:>9.2f}{e['p95_ms']:>9.2f}")
+    for sweep in report["ann"]:
+        s = sweep["latency"]
+        marker = "  <- RESUME_INDEX_NPROBE" if sweep["nprobe"] == target_nprobe else ""
+        lines.append(
+            f"{'nprobe=' + str(sweep['nprobe']):<14}{sweep['recall']:>8.3f}{sweep['min_recall']:>8.3f}"
+            f"{sweep['scanned']:>10.0f}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{marker}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="resumes in the index")
+    parser.add_argument("--queries", type=int, default=100, help="job descriptions to search for")
+    parser.add_argument("--k", type=int, default=50, help="candidates per search")
+    parser.add_argument("--nprobe", default="4,8,16,32", help="comma-separated lists scanned per search")
+    parser.add_argument("--min-train", type=int, default=4096, help="see RESUME_INDEX_MIN_TRAIN")
+    parser.add_argument("--min-recall", type=float, default=0.9, help="fail below this recall at RESUME_INDEX_NPROBE")
+    parser.add_argument("--jds", default=str(BENCH_DIR / "jds"), help="directory of .txt job descriptions")
+    parser.add_argument("--chunk", type=int, default=10_000, help="rows per insert")
+    parser.add_argument("--dir", default=None, help="where to create the temporary index")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.nprobe = [int(n) for n in args.nprobe.split(",") if n.strip()]
+
+    os.environ.setdefault("AQUILIFY_SETTINGS_MODULE", "settings")
+    sys.path.insert(0, str(SERVER_DIR))
+    from aquilify.settings import settings
+
+    target = int(getattr(settings, "RESUME_INDEX_NPROBE", 16))
+    if target not in args.nprobe:
+        args.nprobe.append(target)
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report, target))
+    at_target = next(s for s in report["ann"] if s["nprobe"] == target)
+    return 0 if at_target["recall"] >= args.min_recall else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
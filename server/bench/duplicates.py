@@ -0,0 +1,137 @@
+"""
+Detection rate, false positives and lookup latency of the near-duplicate index
+(``api.duplicates.NearDuplicateIndex``) as it fills up.
+
+Stores ``--size`` synthetic resumes (see ``bench.ann``) in a temporary SQLite file,
+measuring at each checkpoint of ``--checkpoints`` how long ``find`` takes for
+``--queries`` lookups: copies of stored resumes with ``--edits`` words changed, which
+must be found, and unseen resumes, which must not. Lookups should cost the same at
+every size. Exits non-zero when the detection rate is below ``--min-detection`` or
+any unseen resume is reported.
+
+    cd server
+    python -m bench.duplicates --size 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .ann import _documents
+from .loadtest import SERVER_DIR, summarise
+
+PARTS = 16
+
+
+def _resumes(count: int, seed: int) -> List[str]:
+    # bench.ann's documents are about 30 words; joined by PARTS they are resume-sized.
+    parts = iter(_documents(count * PARTS, seed))
+    return ["\n".join(group) for group in zip(*[parts] * PARTS)]
+
+
+def _edit(text: str, edits: int, rng: random.Random) -> str:
+    words = text.split(" ")
+    for _ in range(edits):
+        i = rng.randrange(len(words))
+        words[i] = words[i][::-1]
+    return " ".join(words)
+
+
+def run(args) -> Dict[str, Any]:
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+
+    from analyzer.helpers import clean_text
+    from api.duplicates import NearDuplicateIndex
+
+    rng = random.Random(args.seed)
+    documents = _resumes(args.size, args.seed)
+    unseen = _resumes(args.queries, args.seed + 1)
+
+    checkpoints = sorted({min(c, args.size) for c in args.checkpoints} | {args.size})
+    rows: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        index = NearDuplicateIndex(os.path.join(directory, "near_duplicates.sqlite3"),
+                                   threshold=args.threshold, max_entries=args.size)
+        started, stored = time.perf_counter(), 0
+        for checkpoint in checkpoints:
+            for i in range(stored, checkpoint):
+                index.add(f"{i:032x}", index.signature(clean_text(documents[i])))
+            stored = checkpoint
+            insert_s = time.perf_counter() - started
+
+            latencies, found, false_positives = [], 0, 0
+            for q in range(args.queries):
+                target = rng.randrange(stored)
+                signature = index.signature(clean_text(_edit(documents[target], args.edits, rng)))
+                t = time.perf_counter()
+                match = index.find(signature)
+                latencies.append(time.perf_counter() - t)
+                found += match is not None and match.analysis_id == f"{target:032x}"
+
+                signature = index.signature(clean_text(unseen[q]))
+                t = time.perf_counter()
+                false_positives += index.find(signature) is not None
+                latencies.append(time.perf_counter() - t)
+
+            rows.append({
+                "stored": stored,
+                "insert_s": insert_s,
+                "detection": found / args.queries,
+                "false_positives": false_positives,
+                "latency": summarise(latencies),
+            })
+            started = time.perf_counter()
+
+    return {"size": args.size, "queries": args.queries, "edits": args.edits, "checkpoints": rows}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['queries']} edited copies ({report['edits']} words changed) and "
+        f"{report['queries']} unseen resumes per checkpoint",
+        "",
+        f"{'stored':>10}{'detected':>10}{'false +':>9}{'p50 ms':>9}{'p95 ms':>9}{'insert s':>10}",
+    ]
+    for row in report["checkpoints"]:
+        s = row["latency"]
+        lines.append(
+            f"{row['stored']:>10}{row['detection']:>10.3f}{row['false_positives']:>9}"
+            f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{row['insert_s']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20_000, help="resumes stored by the end")
+    parser.add_argument("--checkpoints", default="1000,5000", help="comma-separated sizes to measure at")
+    parser.add_argument("--queries", type=int, default=200, help="lookups of each kind per checkpoint")
+    parser.add_argument("--edits", type=int, default=2, help="words changed in each copy")
+    parser.add_argument("--threshold", type=float, default=0.9, help="see NEAR_DUPLICATE_THRESHOLD")
+    parser.add_argument("--min-detection", type=float, default=0.95, help="fail below this detection rate")
+    parser.add_argument("--dir", default=None, help="where to create the temporary store")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.checkpoints = [int(n) for n in args.checkpoints.split(",") if n.strip()]
+    os.environ.setdefault("AQUILIFY_SETTINGS_MODULE", "settings")
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    ok = all(r["detection"] >= args.min_detection and not r["false_positives"] for r in report["checkpoints"])
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
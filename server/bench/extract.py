@@ -0,0 +1,166 @@
+"""
+Peak memory of text extraction, per document: the file read into ``bytes`` (how
+``extract_document`` used to work) against the file memory-mapped (how it works now).
+
+Each document is extracted ``--rounds`` times both ways, in this process, with the
+kernel's high-water mark reset before each run (``/proc/self/clear_refs``, Linux only).
+The peak is what RSS rose to above where it started. With mmap it includes the pages
+of the file that were touched: those belong to the page cache, are shared by every
+worker reading the file and can be dropped under memory pressure, so ``private`` (the
+peak less the file pages mapped in) is what limits how many workers fit on a node.
+``--scanned-pages`` adds a generated PDF of that many pages of incompressible images,
+like a large scan with no text layer.
+
+    cd server
+    python -m bench.extract --scanned-pages 40
+    python -m bench.extract path/to/a.pdf path/to/b.docx --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .loadtest import BENCH_DIR, SERVER_DIR
+
+
+def _status() -> Dict[str, int]:
+    """Memory counters of this process from ``/proc/self/status``, in bytes."""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("VmHWM", "VmRSS", "RssFile"):
+                values[name] = int(rest.split()[0]) * 1024
+    return values
+
+
+def _reset_peak() -> None:
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def _peak(extract: Callable[[], Optional[Dict[str, int]]]) -> Dict[str, float]:
+    """
+    Peak RSS reached by ``extract()`` above the RSS it started from. ``extract`` returns
+    ``/proc/self/status`` as it was just before it unmapped the file, if it mapped one.
+    """
+    _reset_peak()
+    before = _status()
+    started = time.perf_counter()
+    mapped = extract()
+    elapsed = time.perf_counter() - started
+    peak = _status()["VmHWM"] - before["VmRSS"]
+    file_pages = mapped["RssFile"] - before["RssFile"] if mapped else 0
+    return {"peak_bytes": peak, "private_bytes": max(0, peak - file_pages), "seconds": elapsed}
+
+
+def _scanned_pdf(path: str, pages: int) -> None:
+    import fitz
+
+    with fitz.open() as doc:
+        for _ in range(pages):
+            page = doc.new_page()
+            noise = fitz.Pixmap(fitz.csRGB, 600, 600, os.urandom(600 * 600 * 3), False)
+            page.insert_image(page.rect, pixmap=noise)
+        doc.save(path)
+
+
+def run(args) -> Dict[str, Any]:
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+
+    from analyzer.utils import _check_expanded_size, _mapped, _read_pdf, read_docx, read_text
+
+    # What extract_document does with the contents of a file, however they are held.
+    def parse(path: str, data) -> None:
+        if path.endswith(".pdf"):
+            _read_pdf(data, args.max_pages)
+        elif path.endswith(".docx"):
+            _check_expanded_size(data, None)
+            read_docx(data)
+        else:
+            read_text(data)
+
+    def read_into_bytes(path: str) -> None:
+        with open(path, "rb") as f:
+            parse(path, f.read())
+
+    def memory_map(path: str) -> Dict[str, int]:
+        with _mapped(path) as data:
+            parse(path, data)
+            return _status()
+
+    paths: List[str] = list(args.paths) or sorted(
+        str(p) for p in pathlib.Path(args.corpus).iterdir() if p.suffix.lower() in (".pdf", ".docx", ".txt")
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.scanned_pages:
+            scanned = os.path.join(directory, f"scanned_{args.scanned_pages}p.pdf")
+            _scanned_pdf(scanned, args.scanned_pages)
+            paths.append(scanned)
+
+        # Warm up the parsers and the page cache so neither shows up in the first document.
+        for path in paths:
+            read_into_bytes(path)
+            memory_map(path)
+
+        documents = []
+        for path in paths:
+            row: Dict[str, Any] = {"path": os.path.basename(path), "size_bytes": os.path.getsize(path)}
+            for mode, extract in (("bytes", read_into_bytes), ("mmap", memory_map)):
+                runs = [_peak(lambda: extract(path)) for _ in range(args.rounds)]
+                row[mode] = {key: max(r[key] for r in runs) for key in runs[0]}
+            documents.append(row)
+
+    return {"rounds": args.rounds, "documents": documents}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    mb = 2 ** 20
+    lines = [
+        f"peak RSS above baseline per document, worst of {report['rounds']} rounds",
+        "",
+        f"{'':<34}{'':>9}{'bytes':>10}{'mmap':>20}",
+        f"{'document':<34}{'size MB':>9}{'peak MB':>10}{'peak MB':>10}{'private':>10}{'bytes ms':>10}{'mmap ms':>9}",
+    ]
+    for row in report["documents"]:
+        b, m = row["bytes"], row["mmap"]
+        lines.append(
+            f"{row['path'][:33]:<34}{row['size_bytes'] / mb:>9.2f}{b['peak_bytes'] / mb:>10.2f}"
+            f"{m['peak_bytes'] / mb:>10.2f}{m['private_bytes'] / mb:>10.2f}"
+            f"{b['seconds'] * 1000:>10.1f}{m['seconds'] * 1000:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="documents to extract (default: the --corpus directory)")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "corpus"), help="directory of .pdf/.docx/.txt samples")
+    parser.add_argument("--scanned-pages", type=int, default=0, help="also extract a generated image-only PDF")
+    parser.add_argument("--max-pages", type=int, default=None, help="see EXTRACT_MAX_PAGES")
+    parser.add_argument("--rounds", type=int, default=3, help="extractions per document and mode")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not os.path.exists("/proc/self/clear_refs"):
+        print("bench.extract needs /proc/self/clear_refs (Linux) to reset the peak RSS", file=sys.stderr)
+        return 2
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
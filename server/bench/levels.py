@@ -0,0 +1,142 @@
+"""
+Latency per ``analysis_level`` for ``/api/v1/analyze``.
+
+Sends every document in the benchmark corpus, against every job description in
+``bench/jds``, once per round at each level (one request at a time, in-process through
+the ASGI interface), and compares the p95 latency of each level with its target in
+``LATENCY_TARGETS_MS``. Exits non-zero when a level misses its target, so the tiers
+keep their meaning as stages are added.
+
+    cd server
+    python -m bench.levels --rounds 5
+    python -m bench.levels --levels quick,standard --json
+
+The cross-worker extraction cache is bypassed unless ``--shared-cache`` is given (every
+request then pays for parsing its upload, as a first-time upload does), and results
+are not written to the analysis history.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .loadtest import BENCH_DIR, SERVER_DIR, asgi_post, build_request, load_corpus, summarise
+
+# p95 targets per level over this corpus on one core, with headroom over the measured
+# ~25 / ~30 / ~60 ms. The p95 of every level is set by the PDF and DOCX uploads, where
+# extraction (and, in ``full``, highlighting) outweighs scoring; on plain text quick
+# runs at ~5 ms p50 against ~13 ms for standard, which adds TF-IDF.
+LATENCY_TARGETS_MS = {
+    "quick": 40.0,
+    "standard": 60.0,
+    "full": 120.0,
+}
+
+
+def _load_jds(path: pathlib.Path) -> Dict[str, str]:
+    return {entry.stem: entry.read_text(encoding="utf-8") for entry in sorted(path.glob("*.txt"))}
+
+
+async def _run_level(app, level: str, samples, jds: Dict[str, str], rounds: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    by_kind: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+
+    for round_ in range(rounds + 1):
+        for sample in samples:
+            for jd_text in jds.values():
+                body, content_type = build_request(sample, jd_text, {"analysis_level": level})
+                start = time.perf_counter()
+                status = await asgi_post(app, "/api/v1/analyze", body, content_type)
+                elapsed = time.perf_counter() - start
+                if round_ == 0:
+                    continue  # warm-up: lazy imports and per-process caches
+                latencies.append(elapsed)
+                by_kind.setdefault(sample.kind, []).append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    target = LATENCY_TARGETS_MS[level]
+    latency = summarise(latencies)
+    return {
+        "level": level,
+        "target_p95_ms": target,
+        "latency": latency,
+        "latency_by_kind": {k: summarise(v) for k, v in sorted(by_kind.items())},
+        "statuses": statuses,
+        "ok": latency["p95_ms"] <= target and set(statuses) == {"200"},
+    }
+
+
+def run(args) -> List[Dict[str, Any]]:
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+    os.environ.setdefault("AQUILIFY_SETTINGS_MODULE", "settings")
+
+    import asgi
+    from api.duplicates import near_duplicates
+    from api.history import history
+    from api.sharedcache import shared_cache
+
+    # Every round resends the same documents: measure full analyses, not incremental ones.
+    history.enabled = False
+    near_duplicates.enabled = False
+    shared_cache.enabled = args.shared_cache
+
+    corpus = load_corpus(pathlib.Path(args.corpus))
+    samples = [sample for kind in sorted(corpus) for sample in corpus[kind]]
+    jds = _load_jds(pathlib.Path(args.jds))
+    if not samples or not jds:
+        raise SystemExit(f"need documents in {args.corpus} and job descriptions in {args.jds}")
+
+    return [asyncio.run(_run_level(asgi.application, level, samples, jds, args.rounds)) for level in args.levels]
+
+
+def format_report(reports: Sequence[Dict[str, Any]]) -> str:
+    lines = [f"{'level':<10}{'kind':<8}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'target':>10}"]
+    for report in reports:
+        verdict = "ok" if report["ok"] else "MISSED"
+        s = report["latency"]
+        lines.append(
+            f"{report['level']:<10}{'all':<8}{s['count']:>7}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+            f"{s['max_ms']:>10.1f}{report['target_p95_ms']:>10.0f}  {verdict}"
+        )
+        for kind, s in report["latency_by_kind"].items():
+            lines.append(
+                f"{'':<10}{kind:<8}{s['count']:>7}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}"
+            )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "corpus"), help="directory of .txt/.pdf/.docx resumes")
+    parser.add_argument("--jds", default=str(BENCH_DIR / "jds"), help="directory of .txt job descriptions")
+    parser.add_argument("--levels", default=",".join(LATENCY_TARGETS_MS),
+                        help="comma-separated levels to measure (default: all)")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the corpus per level, after a warm-up")
+    parser.add_argument("--shared-cache", action="store_true", help="let extraction hit the shared cache")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.levels = [level.strip() for level in args.levels.split(",") if level.strip()]
+    unknown = [level for level in args.levels if level not in LATENCY_TARGETS_MS]
+    if unknown:
+        raise SystemExit(f"unknown level(s): {', '.join(unknown)}")
+    args.rounds = max(1, args.rounds)
+
+    reports = run(args)
+    print(json.dumps(reports, indent=2) if args.json else format_report(reports))
+    return 0 if all(report["ok"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
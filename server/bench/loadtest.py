@@ -0,0 +1,351 @@
+"""
+In-process load test for ``/api/v1/analyze``.
+
+Drives ``asgi.application`` directly through the ASGI interface (no sockets), firing a
+weighted mix of text, PDF and DOCX uploads from a local corpus with a fixed number of
+concurrent requests per worker process. Reports throughput, latency percentiles and
+per-worker CPU / RSS, so concurrency changes can be compared against a baseline run.
+
+    cd server
+    python -m bench.loadtest --workers 2 --concurrency 8 --requests 200 --mix text=2,pdf=1,docx=1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import pathlib
+import random
+import resource
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+SERVER_DIR = pathlib.Path(__file__).resolve().parent.parent
+BENCH_DIR = pathlib.Path(__file__).resolve().parent
+
+KINDS = {".txt": "text", ".pdf": "pdf", ".docx": "docx"}
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+@dataclass(frozen=True)
+class Sample:
+    kind: str
+    name: str
+    payload: bytes
+
+
+def load_corpus(path: pathlib.Path) -> Dict[str, List[Sample]]:
+    corpus: Dict[str, List[Sample]] = {}
+    for entry in sorted(path.iterdir()):
+        kind = KINDS.get(entry.suffix.lower())
+        if kind is None or not entry.is_file():
+            continue
+        corpus.setdefault(kind, []).append(Sample(kind, entry.name, entry.read_bytes()))
+    return corpus
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition("=")
+        kind = kind.strip().lower()
+        if kind not in CONTENT_TYPES and kind != "text":
+            raise argparse.ArgumentTypeError(f"unknown document kind in mix: {kind!r}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def encode_multipart(fields: Dict[str, str], sample: Optional[Sample] = None) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts: List[bytes] = []
+
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+            + value.encode("utf-8") + b"\r\n"
+        )
+
+    if sample is not None:
+        parts.append(
+            (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="resume_file"; '
+                f'filename="{sample.name}"\r\nContent-Type: {CONTENT_TYPES[sample.kind]}\r\n\r\n'
+            ).encode()
+            + sample.payload + b"\r\n"
+        )
+
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_request(sample: Sample, jd_text: str, extra_fields: Optional[Dict[str, str]] = None) -> Tuple[bytes, str]:
+    fields = {"jd_text": jd_text} if jd_text else {}
+    fields.update(extra_fields or {})
+    if sample.kind == "text":
+        fields["resume_text"] = sample.payload.decode("utf-8", errors="ignore")
+        return encode_multipart(fields)
+    return encode_multipart(fields, sample)
+
+
+async def asgi_post(
+    app,
+    path: str,
+    body: bytes,
+    content_type: str,
+    extra_headers: Sequence[Tuple[str, str]] = (),
+) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+            *((k.lower().encode(), v.encode()) for k, v in extra_headers),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    done = asyncio.Event()
+    delivered = False
+    status = 0
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status
+
+
+async def _drive(app, plan: List[Sample], args) -> List[Tuple[str, int, float]]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for sample in plan:
+        queue.put_nowait(sample)
+
+    results: List[Tuple[str, int, float]] = []
+
+    async def client():
+        while True:
+            try:
+                sample = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            body, content_type = build_request(sample, args.jd_text)
+            start = time.perf_counter()
+            try:
+                status = await asgi_post(app, args.path, body, content_type, args.header)
+            except Exception:
+                status = 0
+            results.append((sample.kind, status, time.perf_counter() - start))
+
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return results
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _worker(index: int, plan: List[Sample], args, barrier, conn) -> None:
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, str(SERVER_DIR))
+    os.environ.setdefault("AQUILIFY_SETTINGS_MODULE", "settings")
+
+    import asgi
+
+    if plan:
+        # warm imports and lazy caches outside the measured window
+        asyncio.run(_drive(asgi.application, plan[:1], args))
+
+    barrier.wait()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    results = asyncio.run(_drive(asgi.application, plan, args))
+    elapsed = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    conn.send({
+        "worker": index,
+        "pid": os.getpid(),
+        "elapsed": elapsed,
+        "cpu_user": usage_after.ru_utime - usage_before.ru_utime,
+        "cpu_system": usage_after.ru_stime - usage_before.ru_stime,
+        "max_rss_bytes": usage_after.ru_maxrss * 1024,
+        "rss_bytes": _rss_bytes(),
+        "results": results,
+    })
+    conn.close()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarise(latencies: Sequence[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (max(latencies) if latencies else 0.0) * 1000,
+    }
+
+
+def build_plans(corpus: Dict[str, List[Sample]], mix: Dict[str, float], args) -> List[List[Sample]]:
+    kinds = [k for k in mix if corpus.get(k)]
+    if not kinds:
+        raise SystemExit(f"corpus {args.corpus} has no documents for mix {args.mix!r}")
+
+    rng = random.Random(args.seed)
+    weights = [mix[k] for k in kinds]
+    per_worker = max(1, args.requests // args.workers)
+
+    return [
+        [rng.choice(corpus[kind]) for kind in rng.choices(kinds, weights, k=per_worker)]
+        for _ in range(args.workers)
+    ]
+
+
+def run(args) -> Dict[str, Any]:
+    corpus = load_corpus(pathlib.Path(args.corpus))
+    plans = build_plans(corpus, parse_mix(args.mix), args)
+
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(len(plans))
+    pipes, procs = [], []
+    for index, plan in enumerate(plans):
+        parent, child = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_worker, args=(index, plan, args, barrier, child))
+        proc.start()
+        pipes.append(parent)
+        procs.append(proc)
+
+    workers = [pipe.recv() for pipe in pipes]
+    for proc in procs:
+        proc.join()
+
+    results = [r for w in workers for r in w.pop("results")]
+    ok = [lat for _, status, lat in results if 200 <= status < 300]
+    wall = max(w["elapsed"] for w in workers)
+
+    by_kind: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    for kind, status, lat in results:
+        by_kind.setdefault(kind, []).append(lat)
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        "config": {
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "requests": len(results),
+            "mix": args.mix,
+            "path": args.path,
+        },
+        "throughput_rps": len(ok) / wall if wall else 0.0,
+        "wall_seconds": wall,
+        "statuses": statuses,
+        "latency": summarise([lat for _, _, lat in results]),
+        "latency_by_kind": {k: summarise(v) for k, v in sorted(by_kind.items())},
+        "workers": [
+            {
+                **w,
+                "cpu_utilisation": (w["cpu_user"] + w["cpu_system"]) / w["elapsed"] if w["elapsed"] else 0.0,
+            }
+            for w in workers
+        ],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    cfg = report["config"]
+    lines = [
+        f"requests={cfg['requests']} workers={cfg['workers']} concurrency={cfg['concurrency']} mix={cfg['mix']}",
+        f"throughput: {report['throughput_rps']:.2f} req/s over {report['wall_seconds']:.2f}s  statuses={report['statuses']}",
+        "",
+        f"{'kind':<8}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    rows = [("all", report["latency"]), *report["latency_by_kind"].items()]
+    for kind, s in rows:
+        lines.append(
+            f"{kind:<8}{s['count']:>7}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}"
+        )
+
+    lines += ["", f"{'worker':<8}{'pid':>8}{'cpu s':>9}{'cpu %':>8}{'max rss MB':>12}{'rss MB':>9}"]
+    for w in report["workers"]:
+        lines.append(
+            f"{w['worker']:<8}{w['pid']:>8}{w['cpu_user'] + w['cpu_system']:>9.2f}"
+            f"{w['cpu_utilisation'] * 100:>8.1f}{w['max_rss_bytes'] / 2**20:>12.1f}{w['rss_bytes'] / 2**20:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="In-process ASGI load test for /api/v1/analyze.")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "corpus"), help="directory of .txt/.pdf/.docx resumes")
+    parser.add_argument("--mix", default="text=1,pdf=1,docx=1", help="weighted document mix, e.g. text=2,pdf=1")
+    parser.add_argument("--requests", type=int, default=60, help="total requests across all workers")
+    parser.add_argument("--concurrency", type=int, default=4, help="in-flight requests per worker")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, each with its own app")
+    parser.add_argument("--jd-file", default=str(BENCH_DIR / "jds" / "backend_engineer.txt"),
+                        help="job description sent with every request ('' for none)")
+    parser.add_argument("--path", default="/api/v1/analyze")
+    parser.add_argument("--header", action="append", default=[], metavar="NAME:VALUE",
+                        help="extra request header, may be repeated")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.jd_text = pathlib.Path(args.jd_file).read_text(encoding="utf-8") if args.jd_file else ""
+    args.header = [tuple(p.strip() for p in h.split(":", 1)) for h in args.header if ":" in h]
+    args.workers = max(1, args.workers)
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""
+Startup-time budget for the server.
+
+Imports ``asgi`` in a fresh interpreter under ``python -X importtime`` (best of
+``--runs``), then reports the total, the slowest modules and the cost per top-level
+package. Exits non-zero when the total is over ``--budget-ms``, or when a module
+that is meant to load lazily (format readers, scikit-learn) is imported
+at startup. Run it in CI, or before and after a change that touches imports.
+
+    cd server
+    python -m bench.startup --budget-ms 800
+    python -m bench.startup --module analyzer.compute --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+SERVER_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+# Imported on first use; pulling any of these in at startup is a regression.
+LAZY_MODULES = ("sklearn", "scipy", "fitz", "pymupdf", "PyPDF2", "docx", "joblib", "pandas")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ModuleCost:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure(module: str) -> List[ModuleCost]:
+    """One cold import of ``module`` in a child interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{proc.stderr}")
+
+    costs: List[ModuleCost] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            costs.append(ModuleCost(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return costs
+
+
+def summarise(costs: Sequence[ModuleCost], module: str, top: int) -> Dict[str, object]:
+    total_us = next((c.cumulative_us for c in costs if c.name == module and c.depth == 0), 0)
+
+    packages: Dict[str, int] = {}
+    for cost in costs:
+        root = cost.name.split(".")[0]
+        packages[root] = packages.get(root, 0) + cost.self_us
+
+    slowest = sorted(costs, key=lambda c: c.self_us, reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": total_us / 1000,
+        "modules": len(costs),
+        "slowest": [{"module": c.name, "self_ms": c.self_us / 1000, "cumulative_ms": c.cumulative_us / 1000}
+                    for c in slowest],
+        "packages": [{"package": name, "self_ms": us / 1000}
+                     for name, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]],
+        "lazy_violations": sorted({c.name.split(".")[0] for c in costs if c.name.split(".")[0] in LAZY_MODULES}),
+    }
+
+
+def format_report(report: Dict[str, object], budget_ms: float) -> str:
+    lines = [
+        f"import {report['module']}: {report['total_ms']:.1f} ms over {report['modules']} modules "
+        f"(budget {budget_ms:.0f} ms)",
+        "",
+        "slowest modules (self / cumulative ms):",
+    ]
+    for row in report["slowest"]:
+        lines.append(f"  {row['self_ms']:8.1f} {row['cumulative_ms']:9.1f}  {row['module']}")
+    lines += ["", "by top-level package (self ms):"]
+    for row in report["packages"]:
+        lines.append(f"  {row['self_ms']:8.1f}  {row['package']}")
+    if report["lazy_violations"]:
+        lines += ["", "imported at startup but meant to load lazily: " + ", ".join(report["lazy_violations"])]
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="asgi", help="module to import (default: asgi)")
+    parser.add_argument("--runs", type=int, default=3, help="cold imports to run; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="fail above this total import time")
+    parser.add_argument("--top", type=int, default=15, help="rows in the module and package tables")
+    parser.add_argument("--allow-eager", action="store_true", help="do not fail on lazily loaded modules")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    reports = [summarise(measure(args.module), args.module, args.top) for _ in range(max(1, args.runs))]
+    report = min(reports, key=lambda r: r["total_ms"])
+    over_budget = report["total_ms"] > args.budget_ms
+    report["budget_ms"] = args.budget_ms
+    report["ok"] = not over_budget and (args.allow_eager or not report["lazy_violations"])
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report, args.budget_ms))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
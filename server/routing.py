@@ -14,6 +14,7 @@ import views
 
 ROUTER = [
     rule("/api/v1", include = include("api.routing"), methods = ["GET", "POST"], name = "Analyser | API_V1"),
+    rule("/metrics", views.metricsview, methods = ["GET"], name = "Analyser | METRICS"),
     rule("/", views.homeview)
     # rule("/api/v1", include = include("api.routing"))
 ]
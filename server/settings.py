@@ -256,6 +256,216 @@ STORAGE_BACKEND = [
 
 MESSAGE_STORAGE = 'aquilify.core.messages.storage.fallback.FallbackStorage'
 
+### Observability Configuration...
+
+# METRICS_ENABLED: Record per-stage latency histograms, document counters and error counts
+# exposed in Prometheus text format at `/metrics`. Disable to skip all bookkeeping.
+
+# SERVER_TIMING: Attach a `Server-Timing` header with per-stage durations to analysis responses.
+
+METRICS_ENABLED = True
+SERVER_TIMING = True
+
+# PROFILE_ANALYSES / PROFILE_HEADER: Run `/api/v1/analyze` under cProfile, either for every request
+# or only for requests sending `PROFILE_HEADER: 1`. Both are ignored unless DEBUG is enabled.
+# The pstats dump is written to PROFILE_DIR as `<sha256 of the input>-<timestamp>.pstats`
+# next to a JSON sidecar describing the input, so slow uploads can be studied without the file.
+
+PROFILE_ANALYSES = False
+PROFILE_HEADER = "X-Profile"
+PROFILE_DIR = BASE_DIR / "profiles"
+
+### Incremental Re-analysis...
+
+# REVISION_CACHE_SIZE: Number of recent analyses whose per-bullet and per-segment results are kept
+# in memory. Clients resubmitting an edited resume send `previous_analysis_id` and only the changed
+# bullets / segments are recomputed. The results are also written to the shared cache, so a
+# resubmission served by another worker process finds them there.
+
+REVISION_CACHE_SIZE = 256
+
+### Batch & Background Analysis...
+
+# ANALYSIS_WORKERS: Threads used to run batch and background analyses off the event loop (None = Python's default).
+# BATCH_CONCURRENCY: Documents of one `/api/v1/analyze/batch` request analysed at the same time. In
+# streaming mode this also bounds the results held in memory, since only in-flight ones are kept.
+# BATCH_MAX_DOCUMENTS: Largest number of resumes accepted in a single batch request.
+# BATCH_MAX_BYTES: Largest batch request body, by Content-Length (required when this is set). The
+# whole body is parsed before the first document is analysed, so this, not BATCH_CONCURRENCY,
+# bounds what one batch request holds in memory and temporary files.
+
+ANALYSIS_WORKERS = None
+BATCH_CONCURRENCY = 4
+BATCH_MAX_DOCUMENTS = 50
+BATCH_MAX_BYTES = 64 * 1024 * 1024
+
+# PROGRESS_CHANNELS: Number of analyses started via `/api/v1/analyze/start` whose stage events are
+# kept for `/api/v1/analyze/events` subscribers; the oldest are dropped first.
+# PROGRESS_POLL_INTERVAL: The events are also written to the shared cache. A subscriber connected to
+# a different worker process than the one running the analysis reads them from there this often
+# (seconds).
+
+PROGRESS_CHANNELS = 256
+PROGRESS_POLL_INTERVAL = 0.25
+
+### Role Matching...
+
+# ROLE_MATCH_MAX_JDS: Largest number of job descriptions `/api/v1/analyze/roles` scores a resume against.
+# JD_MATRIX_CACHE_SIZE: Number of distinct JD sets whose vectorised term matrix is kept, so repeated
+# matches against the same open roles skip vectorising the JDs.
+
+ROLE_MATCH_MAX_JDS = 2000
+JD_MATRIX_CACHE_SIZE = 8
+
+### Job Description Library...
+
+# JD_STORE_DIR: Where job descriptions created via `POST /api/v1/jds` are stored; analysis requests
+# reference them with `jd_id` instead of resending `jd_text`.
+# JD_CACHE_SIZE: Number of stored JDs whose derived profile (term vector, top terms, required skills)
+# is kept in memory per process.
+# JD_TOP_TERMS: Number of top terms reported for each stored JD.
+
+JD_STORE_DIR = BASE_DIR / "jd_store"
+JD_CACHE_SIZE = 512
+JD_TOP_TERMS = 20
+
+### Upload & Extraction Limits...
+
+# UPLOAD_MAX_BYTES: Largest resume file accepted. Enforced against Content-Length before the body of
+# any upload endpoint is read, and again while each file is written to disk; larger uploads get a 413.
+# EXTRACT_MAX_PAGES: Pages of a PDF that are extracted, scored and highlighted.
+# EXTRACT_MAX_EXPANDED_BYTES: Largest total a DOCX may decompress to; larger archives get a 413 before
+# they are parsed.
+# ANALYSIS_MAX_CHARS: Characters of resume text (typed or extracted) that are analysed.
+# OVERSIZE_MODE: What happens to a PDF longer than EXTRACT_MAX_PAGES or a text longer than
+# ANALYSIS_MAX_CHARS. "truncate" analyses the first pages / characters and adds
+# `truncated: {"pages", "total_pages"}` or `{"characters", "total_characters"}` to the response;
+# "reject" answers 413 instead. A cap of 0 disables it.
+# ANALYSIS_CPU_BUDGET: CPU seconds one document's extraction and analysis may use. Checked between
+# stages, so with the caps above no upload can hold a worker thread much longer; an analysis over
+# budget gets a 422.
+
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+EXTRACT_MAX_PAGES = 20
+EXTRACT_MAX_EXPANDED_BYTES = 64 * 1024 * 1024
+ANALYSIS_MAX_CHARS = 200_000
+OVERSIZE_MODE = "truncate"
+ANALYSIS_CPU_BUDGET = 5.0
+
+### Admission Control...
+
+# ADMISSION_MAX_IN_FLIGHT: Requests to `/api/v1/analyze`, `/analyze/batch`, `/analyze/start`,
+# `/analyze/roles`, `/candidates` and `POST /jds` served at the same time. These limits are for the
+# host: `serve.py --workers N` gives each worker 1/N of every one (rounded up). A batch holds one
+# slot until its last result is sent; an `/analyze/start` job holds one until it finishes.
+# ADMISSION_MAX_QUEUED: Requests allowed to wait for a free slot; beyond that they are refused.
+# ADMISSION_MAX_BYTES: Upper bound on the summed request bodies (by Content-Length) of admitted analyses.
+# ADMISSION_RETRY_AFTER: Seconds sent in the `Retry-After` header of a refused request.
+# Requests over a limit get an immediate `429 Too Many Requests`; a limit of 0 disables it.
+
+ADMISSION_MAX_IN_FLIGHT = 8
+ADMISSION_MAX_QUEUED = 32
+ADMISSION_MAX_BYTES = 256 * 1024 * 1024
+ADMISSION_RETRY_AFTER = 1
+
+# SINGLEFLIGHT_ENABLED: Let identical `/api/v1/analyze` requests (same resume bytes, JD and options)
+# arriving while one is still running share its result instead of each running the analysis.
+
+SINGLEFLIGHT_ENABLED = True
+
+### Analysis History...
+
+# HISTORY_ENABLED: Persist every result of `/api/v1/analyze`, `/analyze/batch` and `/analyze/start`
+# to HISTORY_PATH, readable again through `/api/v1/analyses` without recomputing it.
+# HISTORY_PATH: SQLite file (WAL mode) holding the stored analyses, shared by every worker.
+# HISTORY_MAX_ENTRIES: Stored analyses kept; past that the oldest are deleted. 0 keeps every one.
+# HISTORY_BATCH_SIZE / HISTORY_FLUSH_INTERVAL: Results are written by a background thread in batches
+# of up to HISTORY_BATCH_SIZE, at most HISTORY_FLUSH_INTERVAL seconds after the first one is queued.
+# HISTORY_MAX_PENDING: Results waiting to be written; further results are dropped (and counted)
+# rather than delaying responses.
+# HISTORY_MAX_PAGE_SIZE: Largest `per_page` accepted by the history listing.
+
+HISTORY_ENABLED = True
+HISTORY_PATH = BASE_DIR / "cache" / "history.sqlite3"
+HISTORY_MAX_ENTRIES = 100_000
+HISTORY_BATCH_SIZE = 50
+HISTORY_FLUSH_INTERVAL = 1.0
+HISTORY_MAX_PENDING = 1000
+HISTORY_MAX_PAGE_SIZE = 100
+
+### Shared Cache...
+
+# SHARED_CACHE_PATH: SQLite file (WAL mode) shared by every worker process on the host. It holds the
+# text extracted from uploaded documents, keyed by their content hash, so a document parsed by one
+# worker is a cache hit in all of them, however many workers `serve.py` runs. It also carries the
+# revision memos and progress events between workers; with the cache disabled, `serve.py` refuses
+# to start more than one worker.
+# SHARED_CACHE_MAX_ENTRIES: Entries kept; the oldest are dropped first.
+
+SHARED_CACHE_ENABLED = True
+SHARED_CACHE_PATH = BASE_DIR / "cache" / "shared.sqlite3"
+SHARED_CACHE_MAX_ENTRIES = 10000
+
+### Analysis Levels...
+
+# ANALYSIS_LEVEL_DEFAULT: Level used when a request sends no `analysis_level`: "quick" (length,
+# sections, bullets, action verbs and metrics), "standard" (adds keyword/skill matching and weak
+# phrases) or "full" (adds readability, classification and highlighting).
+
+ANALYSIS_LEVEL_DEFAULT = "full"
+
+### Semantic Keyword Matching...
+
+# KEYWORD_MATCHING_DEFAULT: What the keyword part of `final_score` is built from when a request sends
+# no `keyword_matching`: "lexical" (TF-IDF overlap, `keyword_score`), "semantic" (similarity in the
+# latent space of analyzer/data/semantic_lsa.npz, `semantic_score`) or "hybrid" (the higher of the
+# two). Both scores are reported whichever is chosen; retrain the space with
+# `python -m analyzer.train_semantic`.
+
+KEYWORD_MATCHING_DEFAULT = "lexical"
+
+### Resume Index...
+
+# RESUME_INDEX_ENABLED: Add the semantic projection of every resume stored in the analysis history
+# (from `/api/v1/analyze`, `/analyze/batch` and `/analyze/start`) to an on-disk nearest-neighbour index, so
+# `/api/v1/candidates` can find the stored resumes closest to a job description.
+# RESUME_INDEX_DIR: Where the index lives: memory-mapped, append-only files shared by every worker,
+# in one subdirectory per semantic model and, below that, one per `user_id`.
+# RESUME_INDEX_MAX_OPEN: Per-user indexes each worker keeps open.
+# RESUME_INDEX_MIN_TRAIN: Below this many resumes every search is exact; from here on they are
+# clustered into inverted lists (rebuilt in the background each time the index grows 4x).
+# RESUME_INDEX_NPROBE: Lists scanned per search. More lists: higher recall, slower searches.
+# RESUME_INDEX_MAX_K: Most candidates one search may return.
+
+RESUME_INDEX_ENABLED = True
+RESUME_INDEX_DIR = BASE_DIR / "resume_index"
+RESUME_INDEX_MIN_TRAIN = 4096
+RESUME_INDEX_NPROBE = 16
+RESUME_INDEX_MAX_K = 500
+RESUME_INDEX_MAX_OPEN = 64
+
+### Near-Duplicate Detection...
+
+# NEAR_DUPLICATE_ENABLED: Compare every resume sent to `/api/v1/analyze`, `/analyze/batch` or
+# `/analyze/start` with the ones stored before it for the same `user_id` (including earlier documents
+# of the same batch), through MinHash signatures of its five-word shingles and an LSH band index, at a
+# constant cost per document however many are stored. Signatures are added for every analysis stored
+# in the history.
+# NEAR_DUPLICATE_PATH: SQLite file (WAL mode) holding the signatures, shared by every worker.
+# NEAR_DUPLICATE_THRESHOLD: Estimated Jaccard similarity from which two resumes count as near-duplicates.
+# NEAR_DUPLICATE_MODE: "reuse" re-analyses a near-duplicate incrementally from the cached analysis
+# of the earlier one; "flag" only reports it. Either way the response carries a `near_duplicate`
+# block.
+# NEAR_DUPLICATE_BUCKET_LIMIT: Most recent resumes compared per LSH bucket.
+# NEAR_DUPLICATE_MAX_ENTRIES: Signatures kept; the oldest are dropped first.
+
+NEAR_DUPLICATE_ENABLED = True
+NEAR_DUPLICATE_PATH = BASE_DIR / "cache" / "near_duplicates.sqlite3"
+NEAR_DUPLICATE_THRESHOLD = 0.9
+NEAR_DUPLICATE_MODE = "reuse"
+NEAR_DUPLICATE_BUCKET_LIMIT = 8
+NEAR_DUPLICATE_MAX_ENTRIES = 100000
+
 ENVIROMENT = {
     'lxenviroment': ['packlib'] # add all the .lxe file in this list
 }
@@ -0,0 +1,10 @@
+import os
+import pathlib
+import sys
+
+SERVER_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+# The application modules read their settings (and relative paths) from server/.
+os.chdir(SERVER_DIR)
+sys.path.insert(0, str(SERVER_DIR))
+os.environ.setdefault("AQUILIFY_SETTINGS_MODULE", "settings")
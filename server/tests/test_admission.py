@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from api.admission import AdmissionController
+from api.exceptions import ApiResponseError
+
+
+def test_refuses_with_retry_after_once_the_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queued=1, retry_after=7)
+        running = controller.reserve()
+        await running.acquire()
+        waiting = controller.reserve()
+
+        with pytest.raises(ApiResponseError) as e:
+            controller.reserve()
+        assert e.value.status == 429
+        assert e.value.headers == {"Retry-After": "7"}
+
+        running.release()
+        await waiting.acquire()
+        assert (controller.in_flight, controller.queued) == (1, 0)
+        waiting.release()
+
+    asyncio.run(scenario())
+
+
+def test_byte_budget_lets_a_lone_request_through():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=0, max_queued=0, max_bytes=100)
+        big = controller.reserve(500)
+        with pytest.raises(ApiResponseError):
+            controller.reserve(1)
+        big.release()
+        async with controller.admit(60):
+            with pytest.raises(ApiResponseError):
+                controller.reserve(60)
+        assert controller.bytes_in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queued=1, max_bytes=10)
+        async with controller.admit(5) as admitted:
+            admitted.release()
+            admitted.release()
+            assert (controller.in_flight, controller.bytes_in_flight) == (0, 0)
+        queued = controller.reserve(3)
+        queued.release()
+        queued.release()
+        assert (controller.queued, controller.bytes_in_flight) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_split_shares_the_limits_between_workers():
+    controller = AdmissionController(max_in_flight=8, max_queued=32, max_bytes=1000)
+    controller.split(3)
+    assert (controller.max_in_flight, controller.max_queued, controller.max_bytes) == (3, 11, 334)
+
+    disabled = AdmissionController(max_in_flight=0, max_queued=0, max_bytes=0)
+    disabled.split(4)
+    assert (disabled.max_in_flight, disabled.max_queued, disabled.max_bytes) == (0, 0, 0)
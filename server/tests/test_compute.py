@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from conftest import SERVER_DIR
+from analyzer.compute import ANALYSIS_LEVELS, KEYWORD_MATCHING, compute_ats_scores, compute_ats_scores_batch
+
+BENCH_DIR = SERVER_DIR / "bench"
+
+
+def _documents():
+    return [p.read_text(encoding="utf-8") for p in sorted((BENCH_DIR / "corpus").glob("*.txt"))]
+
+
+def _jds():
+    return [p.read_text(encoding="utf-8") for p in sorted((BENCH_DIR / "jds").glob("*.txt"))]
+
+
+def _resumes(seed: int = 0):
+    """The corpus plus edge cases: empty, stop words only, and shuffled corpus words."""
+    rng = random.Random(seed)
+    documents = _documents()
+    words = " ".join(documents).split()
+    return documents + [
+        "",
+        "the and of to a in is it",
+        *(" ".join(rng.choice(words) for _ in range(rng.randint(1, 800))) for _ in range(6)),
+    ]
+
+
+@pytest.mark.parametrize("jd_text", _jds() + ["", "the and of to a in is"])
+def test_batch_scores_equal_scalar(jd_text):
+    resumes = _resumes()
+    batch = compute_ats_scores_batch(resumes, jd_text, required_skills=["python", "aws"])
+    scalar = [compute_ats_scores(r, jd_text, required_skills=["python", "aws"]) for r in resumes]
+    assert batch == scalar
+
+
+def test_batch_explanations_equal_scalar():
+    resumes, jd_text = _resumes(1), _jds()[0]
+    for batch, scalar in zip(compute_ats_scores_batch(resumes, jd_text, include_explanation=True),
+                             [compute_ats_scores(r, jd_text, include_explanation=True) for r in resumes]):
+        # One vectorizer pass over the batch can round the raw cosine differently.
+        assert batch["explanation"]["raw_scores"].pop("keyword_score_raw") == pytest.approx(
+            scalar["explanation"]["raw_scores"].pop("keyword_score_raw"), abs=1e-9
+        )
+        assert batch == scalar
+
+
+@pytest.mark.parametrize("level", list(ANALYSIS_LEVELS))
+@pytest.mark.parametrize("matching", KEYWORD_MATCHING)
+def test_batch_levels_equal_scalar(level, matching):
+    resumes, jd_text = _documents(), _jds()[1]
+    batch = compute_ats_scores_batch(resumes, jd_text, analysis_level=level, keyword_matching=matching)
+    scalar = [compute_ats_scores(r, jd_text, analysis_level=level, keyword_matching=matching) for r in resumes]
+    assert batch == scalar
+
+    if ANALYSIS_LEVELS[level] is not None:
+        for scores in batch:
+            assert set(scores) <= ANALYSIS_LEVELS[level] | {"final_score"}
+
+
+def test_empty_batch():
+    assert compute_ats_scores_batch([], "Python") == []
@@ -0,0 +1,59 @@
+import pytest
+
+from analyzer.compute import ANALYSIS_LEVELS
+from api.app import ApiResponsev1
+from api.exceptions import ApiResponseError
+from api.projection import LEVEL_OMITTED_FIELDS, RESPONSE_FIELDS, FieldSelection
+
+from test_sections import RESUME
+
+JD = "Backend engineer: Python, Django, PostgreSQL, AWS."
+
+
+def _analyse(selection, **options):
+    return ApiResponsev1()._analyse_document(JD, resume_text=RESUME, selection=selection, **options)
+
+
+def test_fields_limit_the_response():
+    output = _analyse(FieldSelection(["compute.final_score", "bullets"]))
+    assert set(output) == {"compute", "bullets"}
+    assert set(output["compute"]) == {"final_score"}
+
+
+def test_unknown_fields_are_rejected():
+    for name in ("nope", "compute.nope", "bullets.count"):
+        with pytest.raises(ApiResponseError) as e:
+            FieldSelection([name])
+        assert e.value.status == 400
+
+
+def test_compact_drops_repeated_bullets_unless_asked_for():
+    assert "bullets" not in _analyse(FieldSelection(compact=True))["compute"]
+    assert "bullets" in _analyse(FieldSelection(["compute.bullets"], compact=True))["compute"]
+
+
+@pytest.mark.parametrize("level", list(ANALYSIS_LEVELS))
+def test_levels_leave_out_what_they_do_not_compute(level):
+    output = _analyse(FieldSelection(level=level))
+    assert not set(output) & LEVEL_OMITTED_FIELDS[level]
+    assert set(output) <= set(RESPONSE_FIELDS)
+    if ANALYSIS_LEVELS[level] is not None:
+        assert set(output["compute"]) <= ANALYSIS_LEVELS[level]
+
+
+def test_fields_beyond_the_level_are_rejected():
+    with pytest.raises(ApiResponseError) as e:
+        FieldSelection(["suggestions"], level="quick")
+    assert e.value.status == 400
+    with pytest.raises(ApiResponseError):
+        FieldSelection(["compute.keyword_score"], level="quick")
+
+
+def test_truncated_follows_fields():
+    app = ApiResponsev1()
+    app.max_chars = 200
+    output = app._analyse_document(JD, resume_text=RESUME, selection=FieldSelection(["compute.final_score"]))
+    assert set(output) == {"compute"}
+
+    output = app._analyse_document(JD, resume_text=RESUME, selection=FieldSelection(["truncated"]))
+    assert output == {"truncated": {"characters": 200, "total_characters": len(RESUME)}}
@@ -0,0 +1,45 @@
+from api.app import ApiResponsev1
+from api.revisions import RevisionStore, _decode, _encode, revisions
+
+from test_sections import RESUME
+
+JD = "Backend engineer: Python, Django, PostgreSQL, AWS."
+
+
+def test_resubmission_reuses_the_previous_memo_and_scores_the_same():
+    app = ApiResponsev1()
+    first = app._build_result(resume_text=RESUME, jd_text=JD)
+    edited = RESUME.replace("three teams", "four teams")
+
+    revised = app._build_result(resume_text=edited, jd_text=JD, previous_id=first["analysis_id"])
+    fresh = app._build_result(resume_text=edited, jd_text=JD)
+
+    assert revised["revision"]["previous_found"] is True
+    assert revised["revision"]["reused"] > 0
+    for key in ("compute", "weak_phrases", "bullets", "sections", "suggestions"):
+        assert revised[key] == fresh[key]
+
+
+def test_unknown_previous_id_is_analysed_in_full():
+    output = ApiResponsev1()._build_result(resume_text=RESUME, jd_text=JD, previous_id="missing")
+    assert output["revision"]["previous_found"] is False
+    assert output["revision"]["reused"] == 0
+
+
+def test_memos_survive_the_shared_cache_encoding():
+    app = ApiResponsev1()
+    output = app._build_result(resume_text=RESUME, jd_text=JD)
+    memo = revisions.get(output["analysis_id"])
+
+    decoded = _decode(_encode(memo))
+    assert decoded.bullets == memo.bullets
+    assert decoded.segments == memo.segments
+
+
+def test_store_keeps_the_most_recent_entries():
+    store = RevisionStore(max_entries=2)
+    memos = [_decode(b'{"bullets": {}, "segments": {}}') for _ in range(3)]
+    for i, memo in enumerate(memos):
+        store.put(str(i), memo)
+    assert store.get("0") is None
+    assert store.get("1") is memos[1] and store.get("2") is memos[2]
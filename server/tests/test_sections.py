@@ -0,0 +1,47 @@
+from analyzer.helpers import clean_text
+from api.app import ApiResponsev1
+
+RESUME = """Jane Doe
+Summary
+Backend engineer with six years of Python services.
+
+Experience
+• Responsible for the deployment pipeline on AWS
+• Reduced p95 latency by 40% by caching hot queries
+
+Education
+B.Sc. Computer Science
+
+Skills
+Python, Django, PostgreSQL
+
+Projects
+• Built a job queue that was used by three teams
+"""
+
+
+def test_clean_text_keep_lines_preserves_offsets():
+    text = "a \t\n\n b\x00c\r\n  Skills  "
+    lines = clean_text(text, keep_lines=True)
+    assert lines == "a\nb c\nSkills"
+    assert lines.replace("\n", " ") == clean_text(text)
+
+
+def test_build_result_finds_every_section():
+    output = ApiResponsev1()._build_result(resume_text=RESUME, jd_text="Python backend engineer")
+
+    names = [s["name"] for s in output["sections"]]
+    assert names == ["summary", "experience", "education", "skills", "projects"]
+
+    cleaned = clean_text(RESUME)
+    for span in output["sections"]:
+        assert cleaned[span["start"]:].lower().startswith(span["name"])
+
+    compute = output["compute"]
+    assert set(compute["section_scores"]) == set(names)
+    assert compute["section_scores"]["experience"]["bullets_count"] == 2
+    assert compute["section_scores"]["projects"]["bullets_count"] == 1
+    assert {s for s, found in compute["section_found"].items() if found} == set(names)
+
+    tagged = {p["phrase"].lower(): p["section"] for p in output["weak_phrases"]}
+    assert tagged["responsible for"] == "experience"
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from api.singleflight import SingleFlight, flight_key
+
+
+def test_concurrent_calls_share_one_computation():
+    async def scenario():
+        flights, calls, joined = SingleFlight(), [], []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(
+            flights.do("key", compute, on_join=lambda: joined.append(1)) for _ in range(3)
+        ))
+        assert results == [("result", False), ("result", True), ("result", True)]
+        assert len(calls) == 1 and len(joined) == 2
+        assert not flights._flights
+
+        # Finished keys are forgotten: the next call computes again.
+        assert await flights.do("key", compute) == ("result", False)
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_errors_are_shared_and_forgotten():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flights.do("key", fail), flights.do("key", fail), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert not flights._flights
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return 42
+
+        first = asyncio.ensure_future(flights.do("key", compute))
+        second = asyncio.ensure_future(flights.do("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == (42, True)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
+
+
+def test_disabled_never_shares():
+    async def scenario():
+        flights = SingleFlight(enabled=False)
+
+        async def compute():
+            return 1
+
+        assert await asyncio.gather(flights.do("k", compute), flights.do("k", compute)) == [(1, False), (1, False)]
+
+    asyncio.run(scenario())
+
+
+def test_flight_key_separates_parts():
+    assert flight_key("ab", "c") != flight_key("a", "bc")
+    assert flight_key("a", None) == flight_key("a", None)
@@ -1,6 +1,12 @@
 from aquilify.shortcuts import render
+from aquilify.responses import PlainTextResponse
+
+from api.metrics import registry
 
 # Define all your views here.
 
 async def homeview(request):
-    return await render(request, "index.html")
\ No newline at end of file
+    return await render(request, "index.html")
+
+async def metricsview(request):
+    return PlainTextResponse(content=registry.render(), content_type="text/plain; version=0.0.4")